@@ -1,8 +1,9 @@
 from rest_framework import serializers
-from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
-from rest_framework.validators import UniqueValidator
-from rest_framework.authtoken.models import Token
+from django.db.models import Q
+from tasklist.models import ExpiringToken
+from tasklist.usernames import create_user_with_unique_username, username_base
 from django.utils.translation import gettext_lazy as _
 
 User = get_user_model()
@@ -14,12 +15,9 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'username', 'email')
 
 class RegisterSerializer(serializers.ModelSerializer):
+    # Unicidade de email e username é verificada numa só consulta em validate()
     email = serializers.EmailField(
         required=True,
-        validators=[UniqueValidator(
-            queryset=User.objects.all(),
-            message=_("This email is already in use.")
-        )],
         error_messages={
             'required': _("Email is required."),
             'invalid': _("Enter a valid email address.")
@@ -65,7 +63,8 @@ class RegisterSerializer(serializers.ModelSerializer):
                  'first_name', 'last_name')
         extra_kwargs = {
             'username': {
-                'required': False  # Vamos gerar automaticamente
+                'required': False,  # Vamos gerar automaticamente
+                'validators': [],
             }
         }
 
@@ -78,13 +77,22 @@ class RegisterSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 {"password2": _("Passwords do not match.")})
         
-        # Gera username automaticamente se não fornecido
-        if not attrs.get('username'):
-            attrs['username'] = attrs['email'].split('@')[0]
-            
-            # Verifica se username já existe
-            if User.objects.filter(username=attrs['username']).exists():
-                attrs['username'] = attrs['username'] + str(User.objects.count())
+        # Sem username, create() gera um a partir do email (ver tasklist.usernames)
+        username = attrs.get('username')
+
+        # Uma única consulta cobre email e username
+        conflict = Q(email=attrs['email'])
+        if username:
+            conflict |= Q(username=username)
+        taken = list(User.objects.filter(conflict).values_list('username', 'email')[:2])
+
+        if any(email == attrs['email'] for _, email in taken):
+            raise serializers.ValidationError(
+                {"email": _("This email is already in use.")})
+
+        if taken:
+            raise serializers.ValidationError(
+                {"username": _("A user with that username already exists.")})
                 
         return attrs
 
@@ -92,16 +100,27 @@ class RegisterSerializer(serializers.ModelSerializer):
         """Cria o usuário com os dados validados"""
         validated_data.pop('password2')  # Remove campo de confirmação
         
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password'],
-            first_name=validated_data['first_name'],
-            last_name=validated_data.get('last_name', '')
-        )
+        fields = {
+            'email': validated_data['email'],
+            'first_name': validated_data['first_name'],
+            'last_name': validated_data.get('last_name', ''),
+        }
+        if validated_data.get('username'):
+            user = User.objects.create_user(
+                username=validated_data['username'],
+                password=validated_data['password'],
+                **fields
+            )
+        else:
+            # Username derivado do email, com sufixo de contador se já existir
+            user = create_user_with_unique_username(
+                username_base(validated_data['email']),
+                validated_data['password'],
+                **fields
+            )
         
-        # Cria token automaticamente
-        Token.objects.create(user=user)
+        # Cria token automaticamente (usado pela RegisterView)
+        self.token = ExpiringToken.objects.create(user=user)
         
         return user
 
@@ -125,19 +144,14 @@ class LoginSerializer(serializers.Serializer):
         email = attrs.get('email').lower().strip()
         password = attrs.get('password')
         
-        # Verifica se usuário existe
-        if not User.objects.filter(email=email).exists():
+        # Uma consulta: busca o usuário e verifica a senha em memória
+        # (check_password também atualiza o hash se o hasher mudou)
+        user = User.objects.filter(email=email).first()
+        if user is None:
             raise serializers.ValidationError(
                 {"email": _("User with this email does not exist.")})
         
-        # Autentica o usuário
-        user = authenticate(
-            request=self.context.get('request'),
-            username=email,
-            password=password
-        )
-        
-        if not user:
+        if not user.check_password(password):
             raise serializers.ValidationError(
                 {"password": _("Invalid password.")})
                 
@@ -2,11 +2,7 @@ import logging  # <-- Adicione esta linha
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.authtoken.models import Token
-from django.contrib.auth import authenticate, login
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.contrib.auth import login
 from django.conf import settings
 from django.http import JsonResponse
 from .models import CustomUser
@@ -15,28 +11,38 @@ from .serializers import (
     PasswordResetRequestSerializer, PasswordResetConfirmSerializer
 )
 from django.contrib.auth import get_user_model
+from tasklist.mail import enqueue_email
+from tasklist.models import ExpiringToken
+from tasklist.throttling import (
+    LoginEmailThrottle, LoginIPThrottle, PasswordResetEmailThrottle, PasswordResetIPThrottle
+)
 
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+
+def _email_user_context(user):
+    """JSON-serializable user fields for email templates rendered by the outbox"""
+    return {
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+    }
+
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
 
     def create(self, request, *args, **kwargs):
-        data = request.data.copy() if hasattr(request.data, 'copy') else dict(request.data)
-        
-        # Generate username if not provided
-        if 'username' not in data:
-            email = data.get('email', '')
-            data['username'] = email.split('@')[0] if email else ''
-        
         try:
-            serializer = self.get_serializer(data=data)
+            # The serializer derives the username from the email when it's missing
+            serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
             user = serializer.save()
             
-            token, created = Token.objects.get_or_create(user=user)
+            # Created by RegisterSerializer.create, no need to look it up again
+            token = serializer.token
             
             # Send welcome email
             self._send_welcome_email(user)
@@ -55,42 +61,29 @@ class RegisterView(generics.CreateAPIView):
             )
 
     def _send_welcome_email(self, user):
-        subject = 'Welcome to Our Platform'
-        html_message = render_to_string('emails/welcome.html', {
-            'user': user,
-        })
-        plain_message = strip_tags(html_message)
-        
-        send_mail(
-            subject,
-            plain_message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            html_message=html_message,
-            fail_silently=False
+        # Rendering and SMTP happen in the outbox worker (manage.py send_outbox)
+        enqueue_email(
+            'Welcome to Our Platform',
+            user.email,
+            template='emails/welcome.html',
+            context={'user': _email_user_context(user)},
         )
 
 class LoginView(APIView):
+    # Rejects credential-stuffing bursts before LoginSerializer hashes anything
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
+
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            user = authenticate(
-                request,
-                username=serializer.validated_data['email'],
-                password=serializer.validated_data['password']
-            )
-            
-            if not user:
-                return Response(
-                    {'error': 'Invalid credentials'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
+            # Already authenticated by LoginSerializer.validate
+            user = serializer.validated_data['user']
             
             login(request, user)
-            token, created = Token.objects.get_or_create(user=user)
+            token = ExpiringToken.objects.create(user=user)
             
             response_data = {
                 'token': token.key,
@@ -110,7 +103,7 @@ class LoginView(APIView):
                     httponly=True,
                     samesite='Lax',
                     secure=request.is_secure(),
-                    max_age=3600 * 24 * 7  # 1 week
+                    max_age=int(settings.AUTH_TOKEN_TTL.total_seconds())
                 )
                 return response
                 
@@ -123,6 +116,7 @@ class LoginView(APIView):
 
 class PasswordResetRequestView(generics.GenericAPIView):
     serializer_class = PasswordResetRequestSerializer
+    throttle_classes = [PasswordResetIPThrottle, PasswordResetEmailThrottle]
 
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -157,21 +151,16 @@ class PasswordResetRequestView(generics.GenericAPIView):
     def _send_reset_email(self, user, token):
         subject = 'Password Reset Request'
         reset_link = f"{settings.FRONTEND_URL}/reset-password?token={token}"
-        
-        html_message = render_to_string('emails/password_reset.html', {
-            'user': user,
-            'reset_link': reset_link,
-            'token': token,
-        })
-        plain_message = strip_tags(html_message)
-        
-        send_mail(
+
+        enqueue_email(
             subject,
-            plain_message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            html_message=html_message,
-            fail_silently=False
+            user.email,
+            template='emails/password_reset.html',
+            context={
+                'user': _email_user_context(user),
+                'reset_link': reset_link,
+                'token': token,
+            },
         )
 
 class PasswordResetConfirmView(generics.GenericAPIView):
@@ -200,7 +189,7 @@ class PasswordResetConfirmView(generics.GenericAPIView):
             user.save()
             
             # Invalidate all existing tokens
-            Token.objects.filter(user=user).delete()
+            ExpiringToken.objects.filter(user=user).delete()
             
             return Response({'message': 'Password reset successfully'})
             
@@ -0,0 +1,201 @@
+"""
+Versões async (ASGI) dos endpoints mais acessados, servidas em /api/async/.
+
+São views Django puras: o DRF não executa views async, então a
+autenticação por token, o parsing e as respostas de erro são feitos aqui,
+no mesmo formato das views síncronas. O acesso ao banco usa o ORM async
+e o hash de senha roda no pool limitado de tasklist.hashers.
+"""
+import functools
+import math
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.request import Request
+
+from . import counters, sync
+from .authentication import ExpiringTokenAuthentication
+from .availability import aemail_taken, ausername_taken
+from .hashers import acheck_password, amake_password
+from .models import ExpiringToken, Task
+from .pagination import KeysetPagination
+from .serializers import TaskSerializer, row_serializer
+from .throttling import CheckUsernameThrottle, LoginIPThrottle, LoginUsernameThrottle, get_store
+from .views import _filter_tasks, _parse_task_fields, login_payload
+
+
+def _api_request(request):
+    return Request(request, parsers=[JSONParser(), FormParser(), MultiPartParser()])
+
+
+def _error(exc):
+    response = JsonResponse(
+        exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail},
+        status=exc.status_code, safe=False,
+    )
+    if getattr(exc, 'wait', None):
+        response['Retry-After'] = str(math.ceil(exc.wait))
+    return response
+
+
+def async_api_view(view):
+    """Converte a requisição para um Request do DRF e exceções da API em JSON"""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(_api_request(request), *args, **kwargs)
+        except APIException as exc:
+            return _error(exc)
+    return csrf_exempt(wrapper)
+
+
+def token_required(view):
+    """Autentica com ExpiringTokenAuthentication (ORM async) antes da view"""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        authenticator = ExpiringTokenAuthentication()
+        result = await authenticator.aauthenticate(request)
+        if result is None:
+            return JsonResponse(
+                {'detail': 'As credenciais de autenticação não foram fornecidas.'},
+                status=status.HTTP_401_UNAUTHORIZED,
+                headers={'WWW-Authenticate': authenticator.authenticate_header(request)},
+            )
+        request.user, request.auth = result
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def throttled(*throttle_classes):
+    """Aplica os throttles do DRF antes da view (equivale a @throttle_classes)"""
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if get_store().remote:
+                # Store remoto (Redis) é I/O bloqueante: roda fora do event loop
+                await sync_to_async(_check_throttles, thread_sensitive=False)(request, throttle_classes)
+            else:
+                _check_throttles(request, throttle_classes)
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _check_throttles(request, throttle_classes):
+    waits = []
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, None):
+            waits.append(throttle.wait())
+    if waits:
+        raise Throttled(max(waits))
+
+
+@require_http_methods(['GET', 'POST'])
+async def test_view(request):
+    return JsonResponse({
+        'status': 'success',
+        'message': 'API está funcionando!',
+        'method': request.method
+    })
+
+
+async def _authenticate(username, password):
+    user = await User.objects.filter(username=username).afirst()
+    if user is None:
+        # Mesmo custo de um login válido, como o ModelBackend faz
+        await amake_password(password)
+        return None
+    if await acheck_password(user, password) and user.is_active:
+        return user
+    return None
+
+
+@require_POST
+@async_api_view
+@throttled(LoginIPThrottle, LoginUsernameThrottle)
+async def login_view(request):
+    username = request.data.get('username')
+    password = request.data.get('password')
+
+    if not username or not password:
+        return JsonResponse({
+            'message': 'Nome de usuário e senha são obrigatórios'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    user = await _authenticate(username, password)
+    if user is None:
+        return JsonResponse({
+            'message': 'Credenciais inválidas'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    token = await ExpiringToken.objects.acreate(user=user)
+    return JsonResponse(login_payload(user, token), status=status.HTTP_200_OK)
+
+
+@require_http_methods(['GET', 'POST'])
+@async_api_view
+@throttled(CheckUsernameThrottle)
+async def check_username_view(request):
+    username = request.query_params.get('username') or request.data.get('username')
+    email = request.query_params.get('email') or request.data.get('email')
+    if email and not username:
+        exists = await aemail_taken(email)
+        return JsonResponse({
+            'available': not exists,
+            'message': 'Email disponível' if not exists else 'Email já está em uso'
+        })
+    if not username:
+        return JsonResponse({'message': 'Username obrigatório'}, status=400)
+
+    exists = await ausername_taken(username)
+    return JsonResponse({
+        'available': not exists,
+        'message': 'Username disponível' if not exists else 'Username já existe'
+    })
+
+
+@require_GET
+@async_api_view
+@token_required
+async def list_tasks_view(request):
+    fields = _parse_task_fields(request)
+    queryset = _filter_tasks(request, Task.objects.filter(owner=request.user))
+
+    paginator = KeysetPagination()
+    serializer = row_serializer(TaskSerializer, tuple(fields) if fields is not None else None)
+    queryset = queryset.values(*set(serializer.columns) | set(paginator.cursor_fields(request)))
+
+    page = await paginator.apaginate_queryset(queryset, request)
+    return JsonResponse({
+        'next': paginator.next_cursor,
+        'results': serializer.serialize(page),
+    })
+
+
+@sync_to_async
+def _save_task(serializer, user):
+    # O ORM async não abre transações: a sequência e o INSERT precisam da mesma
+    with transaction.atomic():
+        task = serializer.save(owner=user, change_seq=sync.allocate(user))
+        counters.adjust(user, total=1, completed=int(task.completed))
+    return serializer.data
+
+
+@require_POST
+@async_api_view
+@token_required
+async def create_task_view(request):
+    serializer = TaskSerializer(data=request.data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = await _save_task(serializer, request.user)
+    return JsonResponse(data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,183 @@
+import copy
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from .lru import LRUCache
+from .models import ExpiringToken
+
+
+class TokenCache:
+    """
+    Cache token -> (usuário, token) em dois níveis.
+
+    O nível local é um LRU por processo com TTL; o nível compartilhado
+    (opcional) é um alias de CACHES, de modo que a invalidação feita por um
+    processo vale para os demais. Cada entrada guarda a versão do usuário
+    no nível compartilhado, e um acerto local só vale se ela ainda for a
+    atual: invalidar um usuário incrementa a versão e derruba as cópias
+    locais de todos os processos na leitura seguinte.
+    """
+
+    def __init__(self):
+        options = settings.TOKEN_AUTH_CACHE
+        self.local = LRUCache(max_size=options['MAX_SIZE'], ttl=options['TTL'])
+        self.ttl = options['TTL']
+        self.shared_alias = options.get('SHARED_CACHE')
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    def shared_key(self, key):
+        # Nunca usa a chave do token em texto puro fora do processo
+        return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+    def version_key(self, user_id):
+        return f'auth-user-version:{user_id}'
+
+    def is_current(self, shared, entry):
+        user, _, version = entry
+        return shared.get(self.version_key(user.pk), 0) == version
+
+    def get(self, key):
+        shared = self.shared
+        entry = self.local.get(key)
+        if entry is not None and shared is not None and not self.is_current(shared, entry):
+            # Invalidada por outro processo depois de entrar no LRU local
+            self.local.delete(key)
+            entry = None
+        if entry is None and shared is not None:
+            entry = shared.get(self.shared_key(key))
+            if entry is not None and not self.is_current(shared, entry):
+                entry = None
+            if entry is not None:
+                self.local.set(key, entry)
+        if entry is None:
+            return None
+        user, token, _ = entry
+        # Cópia para que alterações feitas na view não vazem para o cache
+        return copy.copy(user), token
+
+    def set(self, key, user, token):
+        shared = self.shared
+        version = shared.get(self.version_key(user.pk), 0) if shared is not None else 0
+        self.local.set(key, (user, token, version))
+        if shared is not None:
+            shared.set(self.shared_key(key), (user, token, version), self.ttl)
+
+    def invalidate(self, *keys, user_id=None):
+        """Remove as chaves; com `user_id`, invalida o usuário também nos outros processos"""
+        for key in keys:
+            self.local.delete(key)
+        shared = self.shared
+        if shared is None:
+            return
+        if keys:
+            shared.delete_many([self.shared_key(key) for key in keys])
+        if user_id is not None:
+            version_key = self.version_key(user_id)
+            shared.add(version_key, 0, None)
+            try:
+                shared.incr(version_key)
+            except ValueError:
+                # Removida entre o add e o incr (eviction)
+                shared.set(version_key, 1, None)
+
+    def clear(self):
+        self.local.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication que evita o JOIN token/usuário a cada requisição.
+
+    As entradas são invalidadas pelos sinais em tasklist.signals quando o
+    token é excluído ou o usuário é alterado (ex.: desativado).
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return user, token
+
+    async def aauthenticate(self, request):
+        """Equivalente de authenticate() para views async, com o ORM async"""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed(_('Invalid token header. Token string should not contain invalid characters.'))
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        model = self.get_model()
+        try:
+            token = await model.objects.select_related('user').aget(key=key)
+        except model.DoesNotExist:
+            raise AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+
+        token_cache.set(key, token.user, token)
+        return token.user, token
+
+
+# Tokens cujo last_seen_at foi gravado recentemente (expira após o intervalo)
+recently_seen = LRUCache(max_size=settings.TOKEN_AUTH_CACHE['MAX_SIZE'],
+                         ttl=settings.AUTH_TOKEN_LAST_SEEN_INTERVAL)
+
+
+class ExpiringTokenAuthentication(CachedTokenAuthentication):
+    """
+    Autenticação por ExpiringToken com cache.
+
+    Tokens vencidos são recusados mesmo se ainda estiverem em cache, e
+    last_seen_at é gravado no máximo uma vez por intervalo por processo.
+    """
+    model = ExpiringToken
+
+    def authenticate_credentials(self, key):
+        user, token = super().authenticate_credentials(key)
+        self.check_expired(key, token)
+        if self.should_mark_seen(key):
+            ExpiringToken.objects.filter(pk=key).update(last_seen_at=timezone.now())
+        return user, token
+
+    async def aauthenticate_credentials(self, key):
+        user, token = await super().aauthenticate_credentials(key)
+        self.check_expired(key, token)
+        if self.should_mark_seen(key):
+            await ExpiringToken.objects.filter(pk=key).aupdate(last_seen_at=timezone.now())
+        return user, token
+
+    def check_expired(self, key, token):
+        if token.is_expired():
+            token_cache.invalidate(key)
+            raise AuthenticationFailed('Token expirado.')
+
+    def should_mark_seen(self, key):
+        if recently_seen.get(key) is not None:
+            return False
+        recently_seen.set(key, True)
+        return True
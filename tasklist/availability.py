@@ -0,0 +1,178 @@
+"""
+Disponibilidade de username/email consultando primeiro um Bloom filter.
+
+O filtro guarda todos os usernames e emails já usados. Se o valor não está
+nele, está livre com certeza e a resposta sai sem consulta. Só os prováveis
+positivos (usados de fato ou falso positivo) vão ao banco.
+
+O filtro é montado por uma thread em segundo plano, disparada na subida do
+servidor (wsgi.py/asgi.py) ou no primeiro uso; até ele ser publicado, as
+consultas vão direto ao banco. Os usuários criados ou alterados neste
+processo entram pelo sinal post_save, e os criados por outros processos
+entram a cada AVAILABILITY_INDEX['REFRESH_INTERVAL'] segundos, lidos pelo
+id a partir do maior já indexado. Essa leitura por id não vê renomeações
+feitas em outros processos nem ids menores confirmados depois de um maior;
+por isso o filtro é reconstruído do zero a cada REBUILD_INTERVAL segundos
+e trocado pelo novo só quando este fica completo.
+"""
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from .bloom import BloomFilter
+from .models import users_by_email
+from .perf import registry
+
+logger = logging.getLogger(__name__)
+
+
+class TakenIndex:
+    def __init__(self):
+        self.filter = None
+        # Filtro em reconstrução: também recebe os add() feitos durante a varredura
+        self.building = None
+        self.last_id = 0
+        self.last_sync = 0.0
+        self.last_build = None
+        # Incrementada pelo reset(): uma reconstrução antiga não publica seu filtro
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._build_thread = None
+
+    def username_key(self, username):
+        return f'u:{username}'
+
+    def email_key(self, email):
+        return f'e:{email.strip().lower()}'
+
+    def add(self, username, email, bloom=None):
+        # building antes de filter: na troca, o filtro novo aparece em um dos dois
+        targets = [bloom] if bloom is not None else [self.building, self.filter]
+        for target in targets:
+            if target is None:
+                continue
+            if username:
+                target.add(self.username_key(username))
+            if email:
+                target.add(self.email_key(email))
+
+    def index_since(self, bloom, last_id):
+        """Indexa os usuários com id acima de `last_id`; retorna o maior id visto"""
+        users = get_user_model().objects.filter(id__gt=last_id).order_by('id')
+        for user_id, username, email in users.values_list('id', 'username', 'email').iterator(chunk_size=10000):
+            self.add(username, email, bloom)
+            last_id = user_id
+        return last_id
+
+    def build(self):
+        """Varredura completa em um filtro novo, publicado só depois de completo"""
+        options = settings.AVAILABILITY_INDEX
+        generation = self.generation
+        self.last_build = time.monotonic()
+        # Um item por username e outro por email
+        bloom = BloomFilter(options['CAPACITY'] * 2, options['ERROR_RATE'])
+        self.building = bloom
+        try:
+            last_id = self.index_since(bloom, 0)
+            with self._lock:
+                if generation != self.generation:
+                    return
+                self.filter = bloom
+                self.last_id = last_id
+                self.last_sync = time.monotonic()
+        finally:
+            self.building = None
+
+    def build_in_background(self):
+        try:
+            self.build()
+        except Exception:
+            logger.exception('Falha ao montar o índice de disponibilidade')
+        finally:
+            connection.close()
+
+    def start_build(self):
+        """Dispara a reconstrução em uma thread, se nenhuma estiver em andamento"""
+        with self._build_lock:
+            if self._build_thread is not None and self._build_thread.is_alive():
+                return
+            self._build_thread = threading.Thread(
+                target=self.build_in_background, name='taken-index-build', daemon=True,
+            )
+            self._build_thread.start()
+
+    def sync(self):
+        self.last_id = self.index_since(self.filter, self.last_id)
+        self.last_sync = time.monotonic()
+
+    def ensure_fresh(self):
+        options = settings.AVAILABILITY_INDEX
+        if self.last_build is None or time.monotonic() - self.last_build >= options['REBUILD_INTERVAL']:
+            self.start_build()
+        if self.filter is None or time.monotonic() - self.last_sync < options['REFRESH_INTERVAL']:
+            return
+        # Uma thread sincroniza; as demais seguem com o filtro como está
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self.last_sync >= options['REFRESH_INTERVAL']:
+                self.sync()
+        finally:
+            self._lock.release()
+
+    def might_contain(self, key):
+        bloom = self.filter
+        if bloom is None:
+            # Ainda em construção: quem decide é o banco
+            registry.incr('availability.filter_unavailable')
+            return True
+        if key in bloom:
+            registry.incr('availability.filter_positive')
+            return True
+        registry.incr('availability.filter_negative')
+        return False
+
+    def reset(self):
+        with self._lock:
+            self.generation += 1
+            self.filter = None
+            self.last_id = 0
+            self.last_sync = 0.0
+            self.last_build = None
+
+
+taken_index = TakenIndex()
+
+
+def username_taken(username):
+    taken_index.ensure_fresh()
+    if not taken_index.might_contain(taken_index.username_key(username)):
+        return False
+    return get_user_model().objects.filter(username=username).exists()
+
+
+def email_taken(email):
+    taken_index.ensure_fresh()
+    if not taken_index.might_contain(taken_index.email_key(email)):
+        return False
+    return users_by_email(email).exists()
+
+
+async def ausername_taken(username):
+    await sync_to_async(taken_index.ensure_fresh)()
+    if not taken_index.might_contain(taken_index.username_key(username)):
+        return False
+    return await get_user_model().objects.filter(username=username).aexists()
+
+
+async def aemail_taken(email):
+    await sync_to_async(taken_index.ensure_fresh)()
+    if not taken_index.might_contain(taken_index.email_key(email)):
+        return False
+    return await users_by_email(email).aexists()
@@ -0,0 +1,26 @@
+import time
+
+from django.db import transaction
+
+
+def delete_in_batches(queryset, batch_size=1000, pause=0):
+    """
+    Exclui as linhas do queryset em lotes de `batch_size` chaves primárias.
+
+    Cada lote é uma transação curta, então o lock de escrita do SQLite é
+    liberado entre lotes (e `pause` dá espaço para outras escritas).
+    Retorna o total de linhas excluídas.
+    """
+    model = queryset.model
+    total = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return total
+        with transaction.atomic():
+            deleted, _ = model._base_manager.filter(pk__in=pks).delete()
+        total += deleted
+        if len(pks) < batch_size:
+            return total
+        if pause:
+            time.sleep(pause)
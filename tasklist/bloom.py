@@ -0,0 +1,49 @@
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    """
+    Conjunto probabilístico de tamanho fixo: `in` nunca dá falso negativo
+    e dá falso positivo com probabilidade ~error_rate até `capacity` itens.
+
+    A memória é definida na criação (≈ 9,6 bits por item para 1%) e não
+    cresce; acima da capacidade só a taxa de falsos positivos aumenta.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, item):
+        # Double hashing: k posições a partir de dois hashes de 64 bits
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        positions = self._positions(item)
+        # Leitura-modificação-escrita de bytes: serializa as gravações
+        with self._lock:
+            for position in positions:
+                self.bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def memory_bytes(self):
+        return len(self.bits)
+
+    def estimated_error_rate(self):
+        """Taxa de falsos positivos esperada com o número atual de itens"""
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
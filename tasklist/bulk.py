@@ -0,0 +1,150 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import counters, sync
+from .models import Task, TaskTombstone
+from .serializers import TaskSerializer
+
+MAX_OPERATIONS = 500
+BATCH_SIZE = 250
+
+OPERATIONS = ('create', 'update', 'toggle', 'delete')
+
+# "completed" do toggle: aceita os mesmos valores que o campo no serializer
+COMPLETED_FIELD = serializers.BooleanField()
+
+
+class BulkPayloadError(Exception):
+    pass
+
+
+def _error(index, op, message, status='error'):
+    return {'index': index, 'op': op, 'status': status, 'errors': message}
+
+
+def apply_operations(user, operations):
+    """
+    Aplica um lote de operações de tarefas do usuário numa única transação.
+
+    Cada item é validado isoladamente; os inválidos voltam com status
+    'error' e os válidos são gravados com bulk_create/bulk_update e um
+    único DELETE. Retorna um resultado por item, na ordem recebida.
+    """
+    if not isinstance(operations, list):
+        raise BulkPayloadError('"operations" deve ser uma lista.')
+    if len(operations) > MAX_OPERATIONS:
+        raise BulkPayloadError(f'Máximo de {MAX_OPERATIONS} operações por requisição.')
+
+    ids = set()
+    for item in operations:
+        if isinstance(item, dict) and item.get('op') != 'create':
+            try:
+                ids.add(int(item.get('id')))
+            except (TypeError, ValueError):
+                pass
+    tasks = Task.objects.filter(owner=user).in_bulk(ids) if ids else {}
+    # Estado antes do lote, para as variações de TaskCounters
+    was_completed = {task_id: task.completed for task_id, task in tasks.items()}
+
+    results = []
+    to_create = []      # (índice do resultado, instância)
+    to_update = {}      # id -> instância
+    update_fields = set()
+    to_delete = set()
+    now = timezone.now()
+
+    for index, item in enumerate(operations):
+        op = item.get('op') if isinstance(item, dict) else None
+        if op not in OPERATIONS:
+            results.append(_error(index, op, 'Operação inválida.'))
+            continue
+
+        if op == 'create':
+            serializer = TaskSerializer(data=item.get('data') or {})
+            if not serializer.is_valid():
+                results.append(_error(index, op, serializer.errors))
+                continue
+            to_create.append((index, Task(owner=user, **serializer.validated_data)))
+            results.append({'index': index, 'op': op, 'status': 'created', 'ref': item.get('ref')})
+            continue
+
+        try:
+            task_id = int(item.get('id'))
+        except (TypeError, ValueError):
+            results.append(_error(index, op, 'Campo "id" obrigatório.'))
+            continue
+
+        task = tasks.get(task_id)
+        if task is None or task_id in to_delete:
+            results.append(_error(index, op, 'Tarefa não encontrada.', status='not_found'))
+            continue
+
+        if op == 'delete':
+            to_delete.add(task_id)
+            to_update.pop(task_id, None)
+            results.append({'index': index, 'op': op, 'status': 'deleted', 'id': task_id})
+            continue
+
+        if op == 'toggle':
+            completed = item.get('completed')
+            if completed is None:
+                task.completed = not task.completed
+            else:
+                try:
+                    task.completed = COMPLETED_FIELD.to_internal_value(completed)
+                except serializers.ValidationError as e:
+                    results.append(_error(index, op, {'completed': e.detail}))
+                    continue
+            update_fields.add('completed')
+        else:
+            serializer = TaskSerializer(task, data=item.get('data') or {}, partial=True)
+            if not serializer.is_valid():
+                results.append(_error(index, op, serializer.errors))
+                continue
+            for field, value in serializer.validated_data.items():
+                setattr(task, field, value)
+            update_fields.update(serializer.validated_data)
+
+        task.updated_at = now
+        to_update[task_id] = task
+        results.append({'index': index, 'op': op, 'status': 'updated', 'id': task_id})
+
+    changes = len(to_create) + len(to_update) + len(to_delete)
+    if not changes:
+        return results
+
+    with transaction.atomic():
+        seq = sync.allocate(user, changes)
+        for _, task in to_create:
+            task.change_seq, seq = seq, seq + 1
+        for task in to_update.values():
+            task.change_seq, seq = seq, seq + 1
+        tombstones = []
+        for task_id in sorted(to_delete):
+            tombstones.append(TaskTombstone(owner=user, task_id=task_id, change_seq=seq))
+            seq += 1
+
+        if to_create:
+            Task.objects.bulk_create([task for _, task in to_create], batch_size=BATCH_SIZE)
+        if to_update:
+            Task.objects.bulk_update(
+                list(to_update.values()), sorted(update_fields | {'updated_at', 'change_seq'}),
+                batch_size=BATCH_SIZE,
+            )
+        if to_delete:
+            Task.objects.filter(owner=user, id__in=to_delete).delete()
+            TaskTombstone.objects.bulk_create(tombstones, batch_size=BATCH_SIZE)
+
+        counters.adjust(
+            user,
+            total=len(to_create) - len(to_delete),
+            completed=sum(task.completed for _, task in to_create)
+            + sum(task.completed - was_completed[task_id] for task_id, task in to_update.items())
+            - sum(was_completed[task_id] for task_id in to_delete),
+        )
+
+    for index, task in to_create:
+        results[index]['id'] = task.pk
+
+    return results
@@ -0,0 +1,76 @@
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Task, TaskCounters
+
+
+def count_tasks(user_ids):
+    """Contagens reais por usuário, {user_id: (total, completed)}, numa só consulta"""
+    rows = Task.objects.filter(owner_id__in=user_ids).values('owner_id').annotate(
+        total=Count('id'), completed=Count('id', filter=Q(completed=True)),
+    ).order_by()
+    return {row['owner_id']: (row['total'], row['completed']) for row in rows}
+
+
+def adjust(user, total=0, completed=0):
+    """
+    Aplica variações aos contadores do usuário.
+
+    Deve ser chamada dentro de transaction.atomic(), depois das escritas
+    das tarefas: o contador e as tarefas são confirmados juntos, e se a
+    linha ainda não existir ela é criada já com as contagens reais.
+    """
+    changes = {name: F(name) + delta for name, delta in (('total', total), ('completed', completed)) if delta}
+    if not changes:
+        return
+    counters = TaskCounters.objects.filter(user=user)
+    if counters.update(**changes):
+        return
+
+    actual_total, actual_completed = count_tasks([user.pk]).get(user.pk, (0, 0))
+    _, created = TaskCounters.objects.get_or_create(
+        user=user, defaults={'total': actual_total, 'completed': actual_completed},
+    )
+    if not created:
+        counters.update(**changes)
+
+
+def get_counts(user):
+    row = TaskCounters.objects.filter(user=user).values_list('total', 'completed').first()
+    total, completed = row or (0, 0)
+    return {'total': total, 'pending': total - completed, 'completed': completed}
+
+
+def reconcile(user_ids, dry_run=False):
+    """
+    Recalcula os contadores de `user_ids` e corrige os divergentes.
+
+    Roda numa transação que trava as linhas de contador antes de contar:
+    escritas concorrentes ou já entraram na contagem, ou aplicam sua
+    variação depois da correção. Retorna [(user_id, antes, depois)].
+    """
+    drift = []
+    with transaction.atomic():
+        stored = {
+            row.user_id: row
+            for row in TaskCounters.objects.select_for_update().filter(user_id__in=user_ids)
+        }
+        actual = count_tasks(user_ids)
+
+        to_update, to_create = [], []
+        for user_id in user_ids:
+            total, completed = actual.get(user_id, (0, 0))
+            row = stored.get(user_id)
+            if row is None:
+                if total:
+                    drift.append((user_id, None, (total, completed)))
+                    to_create.append(TaskCounters(user_id=user_id, total=total, completed=completed))
+            elif (row.total, row.completed) != (total, completed):
+                drift.append((user_id, (row.total, row.completed), (total, completed)))
+                row.total, row.completed = total, completed
+                to_update.append(row)
+
+        if not dry_run:
+            TaskCounters.objects.bulk_update(to_update, ['total', 'completed'])
+            TaskCounters.objects.bulk_create(to_create, ignore_conflicts=True)
+    return drift
@@ -0,0 +1,39 @@
+"""
+ETags fracos para GETs condicionais, derivados do contador de versão do
+usuário (ChangeSequence.value).
+
+Toda alteração de tarefa reserva uma sequência (sync.allocate), então o
+contador só fica igual enquanto nenhuma tarefa mudou. Calcular o ETag custa uma
+consulta pela chave primária; com If-None-Match igual, @condition devolve
+304 antes da view rodar a consulta da lista e o serializer.
+"""
+import hashlib
+
+from .sync import current_version
+
+
+def request_version(request):
+    """Versão do usuário da requisição, lida uma vez (ETag e cache de respostas)"""
+    if not hasattr(request, '_user_version'):
+        request._user_version = current_version(request.user)
+    return request._user_version
+
+
+def query_digest(request, scope):
+    # Filtros, cursor e ?fields= mudam o corpo: entram na chave
+    query = '&'.join(f'{key}={value}' for key, value in sorted(request.GET.lists()))
+    return hashlib.md5(f'{scope}?{query}'.encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+def user_etag(request, scope):
+    if not request.user.is_authenticated:
+        return None
+    return f'W/"{request.user.pk}-{request_version(request)}-{query_digest(request, scope)}"'
+
+
+def task_list_etag(request, *args, **kwargs):
+    return user_etag(request, 'tasks')
+
+
+def task_stats_etag(request, *args, **kwargs):
+    return user_etag(request, 'stats')
@@ -0,0 +1,80 @@
+"""
+Export em streaming (NDJSON ou CSV) de tarefas e usuários.
+
+As linhas vêm de `.values_list().iterator(chunk_size=...)`, sem instanciar
+models nem carregar o queryset inteiro, e saem em blocos de até
+FLUSH_BYTES: a memória fica constante qualquer que seja o total de linhas.
+O primeiro bloco (cabeçalho do CSV ou primeira linha) sai assim que existe.
+Os valores têm a mesma representação da API (tasklist.serializers.RowSerializer).
+"""
+import csv
+import io
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+CHUNK_SIZE = 2000
+FLUSH_BYTES = 64 * 1024
+# Início de célula que planilhas interpretam como fórmula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def parse_format(value):
+    if value not in CONTENT_TYPES:
+        raise ValidationError({'output': f'Use {" ou ".join(CONTENT_TYPES)}.'})
+    return value
+
+
+def csv_cell(value):
+    """Valor de uma célula do CSV; texto que viraria fórmula ganha um ' na frente"""
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def export_rows(queryset, serializer, output, chunk_size=CHUNK_SIZE):
+    """Gera o export em blocos de bytes, lendo `chunk_size` linhas por vez do banco"""
+    names = serializer.names
+    buffer = io.StringIO()
+
+    if output == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        # Cabeçalho antes da consulta: o cliente recebe o primeiro byte na hora
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+        def write(values):
+            writer.writerow([csv_cell(value) for value in values])
+    else:
+        def write(values):
+            buffer.write(json.dumps(dict(zip(names, values)), ensure_ascii=False, separators=(',', ':')))
+            buffer.write('\n')
+
+    first = True
+    for row in queryset.values_list(*serializer.columns).iterator(chunk_size=chunk_size):
+        write(serializer.to_values(row))
+        if first or buffer.tell() >= FLUSH_BYTES:
+            first = False
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def export_response(queryset, serializer, output, filename):
+    response = StreamingHttpResponse(export_rows(queryset, serializer, output), content_type=CONTENT_TYPES[output])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+    return response
@@ -0,0 +1,59 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, make_password
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 com iterações configuráveis (PASSWORD_PBKDF2_ITERATIONS).
+
+    Usa o mesmo identificador do hasher padrão, então hashes existentes
+    continuam válidos; no login, check_password regrava o hash com o
+    número de iterações configurado (must_update compara as iterações).
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS or PBKDF2PasswordHasher.iterations
+
+
+_executor = None
+
+
+def get_hashing_executor():
+    """Pool de PASSWORD_HASHING_WORKERS threads, criado no primeiro uso"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING_WORKERS, thread_name_prefix='password',
+        )
+    return _executor
+
+
+def _verify(user, password):
+    outdated = []
+    valid = check_password(password, user.password, setter=outdated.append)
+    if valid and outdated:
+        user.set_password(password)
+    return valid, bool(outdated)
+
+
+async def acheck_password(user, password):
+    """
+    user.check_password() para views async.
+
+    O hash roda no pool limitado, fora do event loop; se o hash precisar
+    ser regravado (outro hasher ou iterações), a gravação usa o ORM async.
+    """
+    loop = asyncio.get_running_loop()
+    valid, outdated = await loop.run_in_executor(get_hashing_executor(), _verify, user, password)
+    if outdated:
+        await user.asave(update_fields=['password'])
+    return valid
+
+
+async def amake_password(password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hashing_executor(), make_password, password)
@@ -0,0 +1,210 @@
+"""
+Harness de carga usado pelos comandos de benchmark.
+
+`serve` sobe a aplicação WSGI num servidor com um pool fixo de threads
+(como os workers gthread do gunicorn): cada thread mantém suas conexões
+de banco entre requisições, então CONN_MAX_AGE e pools fazem efeito.
+`serve_asgi` sobe a aplicação ASGI no uvicorn (opcional, `pip install uvicorn`).
+`run_load` dispara requisições concorrentes e mede req/s e latências;
+`run_mix` faz o mesmo sorteando entre vários endpoints por peso.
+"""
+import http.client
+import math
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+
+from .perf import Histogram
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class PooledWSGIServer(WSGIServer):
+    threads = 8
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='wsgi')
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def close_connections(self):
+        connections.close_all()
+
+    def server_close(self):
+        super().server_close()
+        # Fecha as conexões de banco de cada thread do pool antes de encerrá-lo
+        for future in [self.executor.submit(self.close_connections) for _ in range(self.threads)]:
+            future.result()
+        self.executor.shutdown(wait=True)
+
+
+@contextmanager
+def serve(threads=8, application=None):
+    """Serve a aplicação em 127.0.0.1 numa porta livre; produz (host, porta)"""
+    server_class = type('Server', (PooledWSGIServer,), {'threads': threads})
+    server = make_server(
+        '127.0.0.1', 0, application or get_wsgi_application(),
+        server_class=server_class, handler_class=QuietHandler,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@contextmanager
+def serve_asgi(application=None):
+    """Serve a aplicação ASGI no uvicorn, num único event loop; produz (host, porta)"""
+    import uvicorn
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('127.0.0.1', 0))
+    config = uvicorn.Config(
+        application or get_asgi_application(), lifespan='off', log_level='warning', access_log=False,
+    )
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True)
+    thread.start()
+    while not server.started and thread.is_alive():
+        time.sleep(0.01)
+    try:
+        yield sock.getsockname()
+    finally:
+        server.should_exit = True
+        thread.join()
+        sock.close()
+
+
+class LoadResult:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = Histogram()
+        self.samples = []
+        self.statuses = {}
+        self.errors = 0
+        self.seconds = 0.0
+
+    @property
+    def requests(self):
+        return self.latency.count
+
+    @property
+    def rps(self):
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def record(self, status, ms):
+        with self.lock:
+            self.latency.record(ms)
+            self.samples.append(ms)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if status >= 400:
+                self.errors += 1
+
+    def percentile(self, p):
+        """Percentil exato (ms) das latências medidas, para comparar execuções"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, math.ceil(len(ordered) * p / 100) - 1)]
+
+
+def send(host, port, method, path, body=None, headers=None):
+    """Uma requisição numa conexão nova; retorna (status, ms). Falhas de rede viram 599"""
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        response.read()
+        status = response.status
+    except OSError:
+        status = 599
+    finally:
+        conn.close()
+    return status, (time.perf_counter() - start) * 1000
+
+
+def run_clients(concurrency, seconds, client):
+    """Roda `client(deadline)` em `concurrency` threads; retorna a duração real"""
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(deadline,)) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run_load(address, make_request, concurrency=8, seconds=5.0):
+    """
+    Dispara requisições por `seconds` segundos com `concurrency` clientes.
+
+    `make_request(n)` retorna (método, caminho, corpo, headers) da n-ésima
+    requisição de cada cliente.
+    """
+    host, port = address
+    result = LoadResult()
+
+    def client(deadline):
+        n = 0
+        while time.perf_counter() < deadline:
+            result.record(*send(host, port, *make_request(n)))
+            n += 1
+
+    result.seconds = run_clients(concurrency, seconds, client)
+    return result
+
+
+def run_mix(address, scenarios, concurrency=8, seconds=5.0, seed=0):
+    """
+    Como run_load, mas cada requisição sorteia um cenário pelo peso.
+
+    `scenarios` é uma lista de (nome, peso, make_request); retorna
+    {nome: LoadResult}, todos com a duração total da medição.
+    """
+    host, port = address
+    results = {name: LoadResult() for name, _, _ in scenarios}
+    names = [name for name, _, _ in scenarios]
+    weights = [weight for _, weight, _ in scenarios]
+    factories = {name: make_request for name, _, make_request in scenarios}
+    seeds = iter(range(seed, seed + concurrency))
+
+    def client(deadline):
+        rng = random.Random(next(seeds))
+        n = 0
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            results[name].record(*send(host, port, *factories[name](n)))
+            n += 1
+
+    seconds = run_clients(concurrency, seconds, client)
+    for result in results.values():
+        result.seconds = seconds
+    return results
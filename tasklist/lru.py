@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Cache LRU thread-safe em memória, limitado em itens e com TTL opcional.
+
+    Com `max_bytes`, também limita a soma dos tamanhos informados em set().
+    """
+
+    def __init__(self, max_size=1024, ttl=None, max_bytes=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value, size = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._pop(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, size=0):
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (expires_at, value, size)
+            self.bytes += size
+            while len(self._data) > self.max_size or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+
+    def _pop(self, key):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.bytes -= item[2]
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
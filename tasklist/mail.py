@@ -0,0 +1,163 @@
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, to, template='', context=None, body=''):
+    """
+    Grava o email na outbox em vez de enviar durante a requisição.
+
+    Como o INSERT participa da transação corrente, o email só existe se a
+    operação que o originou for confirmada.
+    """
+    return EmailOutbox.objects.create(
+        subject=subject,
+        to=to,
+        template=template,
+        context=context or {},
+        body=body,
+    )
+
+
+def build_message(entry, connection=None):
+    if entry.template:
+        html_message = render_to_string(entry.template, entry.context)
+        message = EmailMultiAlternatives(
+            entry.subject, strip_tags(html_message), settings.DEFAULT_FROM_EMAIL, [entry.to],
+            connection=connection,
+        )
+        message.attach_alternative(html_message, 'text/html')
+        return message
+    return EmailMultiAlternatives(
+        entry.subject, entry.body, settings.DEFAULT_FROM_EMAIL, [entry.to], connection=connection,
+    )
+
+
+def retry_delay(attempts):
+    """Backoff exponencial a partir de EMAIL_OUTBOX_RETRY_BASE_SECONDS"""
+    return timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+class OutboxWorker:
+    """
+    Drena a outbox com um pool de threads.
+
+    A thread principal reserva lotes e grava os resultados (todo acesso ao
+    banco fica nela); cada thread do pool renderiza e envia usando sua
+    própria conexão SMTP, aberta uma vez e reutilizada entre lotes.
+    """
+    lease = timedelta(minutes=5)
+
+    def __init__(self, workers=None, batch_size=None, backend=None, queryset=None):
+        self.queryset = EmailOutbox.objects.all() if queryset is None else queryset
+        self.workers = workers or settings.EMAIL_OUTBOX_WORKERS
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.backend = backend
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='outbox')
+
+    def claim(self, limit):
+        """Reserva até `limit` emails vencidos; itens de um worker que caiu voltam após o lease"""
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        due = self.queryset.filter(status='pending', next_attempt_at__lte=now)
+        ids = list(due.order_by('next_attempt_at').values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        due.filter(id__in=ids).update(claim=token, next_attempt_at=now + self.lease)
+        return list(EmailOutbox.objects.filter(claim=token))
+
+    def get_connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = get_connection(backend=self.backend)
+            connection.open()
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return connection
+
+    def reset_connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+            self.local.connection = None
+
+    def send_batch(self, entries):
+        results = []
+        for entry in entries:
+            try:
+                build_message(entry, connection=self.get_connection()).send()
+            except Exception as e:
+                # Conexão possivelmente quebrada: a próxima mensagem reconecta
+                self.reset_connection()
+                results.append((entry, str(e) or e.__class__.__name__))
+            else:
+                results.append((entry, None))
+        return results
+
+    def record(self, results):
+        now = timezone.now()
+        sent = [entry.id for entry, error in results if error is None]
+        if sent:
+            EmailOutbox.objects.filter(id__in=sent).update(status='sent', sent_at=now, claim='')
+
+        for entry, error in results:
+            if error is None:
+                continue
+            attempts = entry.attempts + 1
+            logger.warning(f"Outbox email {entry.id} failed (attempt {attempts}): {error}")
+            if attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                changes = {'status': 'failed'}
+            else:
+                changes = {'next_attempt_at': now + retry_delay(attempts)}
+            EmailOutbox.objects.filter(id=entry.id).update(attempts=attempts, last_error=error, claim='', **changes)
+
+        return len(sent), len(results) - len(sent)
+
+    def run_once(self):
+        """Processa uma rodada (até workers * batch_size emails); retorna (enviados, falhas)"""
+        entries = self.claim(self.workers * self.batch_size)
+        if not entries:
+            return 0, 0
+
+        chunks = [entries[i:i + self.batch_size] for i in range(0, len(entries), self.batch_size)]
+        results = []
+        for chunk_results in self.executor.map(self.send_batch, chunks):
+            results.extend(chunk_results)
+        return self.record(results)
+
+    def drain(self):
+        """Executa rodadas até não haver emails vencidos"""
+        sent = failed = 0
+        while True:
+            batch_sent, batch_failed = self.run_once()
+            if not batch_sent and not batch_failed:
+                return sent, failed
+            sent += batch_sent
+            failed += batch_failed
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for connection in self.connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
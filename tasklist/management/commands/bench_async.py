@@ -0,0 +1,95 @@
+import json
+import random
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from tasklist.loadtest import run_load, serve, serve_asgi
+from tasklist.management.commands.seed import create_user_tasks
+from tasklist.models import ExpiringToken
+from tasklist.throttling import throttling_disabled
+
+BENCH_USERNAME = 'bench-async'
+BENCH_PASSWORD = 'senha-de-benchmark-123'
+
+
+class Command(BaseCommand):
+    help = 'Compara req/s e p99 das views síncronas sob WSGI com as views async sob uvicorn'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=3.0, help='Duração de cada medição')
+        parser.add_argument(
+            '--concurrency', type=str, default='1,8,32,64',
+            help='Níveis de concorrência a medir, separados por vírgula'
+        )
+        parser.add_argument('--threads', type=int, default=8, help='Threads do servidor WSGI')
+        parser.add_argument('--tasks', type=int, default=200, help='Tarefas do usuário de benchmark')
+        parser.add_argument('--keep-throttles', action='store_true', help='Mantém o rate limiting ativo')
+        parser.add_argument('--skip-login', action='store_true', help='Não mede o login (dominado pelo hash)')
+
+    def get_endpoints(self, token, skip_login):
+        auth = {'Authorization': f'Token {token}'}
+        login_body = json.dumps({'username': BENCH_USERNAME, 'password': BENCH_PASSWORD})
+        json_headers = {'Content-Type': 'application/json'}
+
+        endpoints = [
+            ('test', lambda prefix: lambda n: ('GET', f'/api/{prefix}test/', None, None)),
+            ('check-username', lambda prefix: lambda n: (
+                'POST', f'/api/{prefix}auth/check-username/', json.dumps({'username': f'user{n}'}), json_headers,
+            )),
+            ('tasks/list', lambda prefix: lambda n: ('GET', f'/api/{prefix}tasks/list/', None, auth)),
+        ]
+        if not skip_login:
+            endpoints.append(('login', lambda prefix: lambda n: (
+                'POST', f'/api/{prefix}auth/login/', login_body, json_headers,
+            )))
+        return endpoints
+
+    def handle(self, *args, **options):
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            raise CommandError('uvicorn não está instalado: pip install uvicorn')
+
+        levels = [int(level) for level in options['concurrency'].split(',')]
+
+        user = User.objects.filter(username=BENCH_USERNAME).first()
+        if user is None:
+            user = User.objects.create_user(BENCH_USERNAME, password=BENCH_PASSWORD)
+            create_user_tasks(random.Random(0), [(user.pk, options['tasks'])], date.today())
+        token = ExpiringToken.objects.create(user=user)
+        connections.close_all()
+
+        self.stdout.write(
+            f'🔄 WSGI ({options["threads"]} threads, views síncronas) x uvicorn (1 event loop, /api/async/), '
+            f'{options["seconds"]:.1f}s por medição'
+        )
+        self.stdout.write(
+            f'{"endpoint":<16} {"clientes":>8} {"wsgi req/s":>11} {"wsgi p99":>9} '
+            f'{"asgi req/s":>11} {"asgi p99":>9}'
+        )
+
+        try:
+            # Mede o custo das rotas, não as respostas 429 do rate limiting
+            with throttling_disabled(not options['keep_throttles']), \
+                    serve(threads=options['threads']) as wsgi, serve_asgi() as asgi:
+                for name, factory in self.get_endpoints(token.key, options['skip_login']):
+                    for level in levels:
+                        sync_result = run_load(wsgi, factory(''), level, options['seconds'])
+                        async_result = run_load(asgi, factory('async/'), level, options['seconds'])
+                        self.stdout.write(
+                            f'{name:<16} {level:>8} {sync_result.rps:>11.1f} '
+                            f'{sync_result.latency.percentile(99):>9.1f} {async_result.rps:>11.1f} '
+                            f'{async_result.latency.percentile(99):>9.1f}'
+                        )
+                        for label, result in (('wsgi', sync_result), ('asgi', async_result)):
+                            if result.errors:
+                                self.stdout.write(self.style.WARNING(
+                                    f'⚠️  {label} {name}: {result.errors} erros {result.statuses}'
+                                ))
+        finally:
+            connections.close_all()
+            # Remove o usuário de benchmark, suas tarefas e os tokens criados
+            user.delete()
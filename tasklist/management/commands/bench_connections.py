@@ -0,0 +1,81 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasklist.loadtest import run_load, serve
+from tasklist.throttling import throttling_disabled
+
+BENCH_USERNAME = 'bench-connections'
+BENCH_PASSWORD = 'senha-de-benchmark-123'
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede req/s em /api/test/ e no login com e sem conexões persistentes/pool '
+        'para o DATABASE_PROFILE atual'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duração de cada medição')
+        parser.add_argument('--concurrency', type=int, default=8, help='Clientes simultâneos')
+        parser.add_argument('--threads', type=int, default=8, help='Threads do servidor WSGI')
+        parser.add_argument('--keep-throttles', action='store_true', help='Mantém o rate limiting ativo')
+
+    def get_modes(self):
+        configured = settings.DATABASES['default']
+        # Linha de base: conexão nova a cada requisição, sem pool
+        baseline = {'CONN_MAX_AGE': 0, 'OPTIONS': {
+            key: value for key, value in configured.get('OPTIONS', {}).items() if key != 'pool'
+        }}
+        yield 'conexão por requisição', baseline
+
+        if configured.get('OPTIONS', {}).get('pool'):
+            yield 'pool psycopg', {}
+        else:
+            yield f'persistente ({configured.get("CONN_MAX_AGE", 0)}s)', {}
+
+    def get_endpoints(self):
+        login_body = json.dumps({'username': BENCH_USERNAME, 'password': BENCH_PASSWORD})
+        yield '/api/test/', lambda n: ('GET', '/api/test/', None, None)
+        yield '/api/auth/login/', lambda n: (
+            'POST', '/api/auth/login/', login_body, {'Content-Type': 'application/json'},
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=BENCH_USERNAME).first()
+        if user is None:
+            user = User.objects.create_user(BENCH_USERNAME, password=BENCH_PASSWORD)
+        connections.close_all()
+
+        db = connections.settings['default']
+        original = dict(db)
+        modes = list(self.get_modes())
+        self.stdout.write(
+            f'🔄 DATABASE_PROFILE={settings.DATABASE_PROFILE}, {options["concurrency"]} clientes, '
+            f'{options["threads"]} threads, {options["seconds"]:.1f}s por medição'
+        )
+        self.stdout.write(f'{"modo":<28} {"endpoint":<18} {"req/s":>9} {"p50 ms":>8} {"p99 ms":>8} {"erros":>7}')
+
+        try:
+            for label, overrides in modes:
+                # As conexões de cada thread leem este dict ao serem criadas
+                db.clear()
+                db.update(original, **overrides)
+                # Mede o custo das rotas, não as respostas 429 do rate limiting
+                with throttling_disabled(not options['keep_throttles']), serve(threads=options['threads']) as address:
+                    for endpoint, make_request in self.get_endpoints():
+                        result = run_load(address, make_request, options['concurrency'], options['seconds'])
+                        self.stdout.write(
+                            f'{label:<28} {endpoint:<18} {result.rps:>9.1f} '
+                            f'{result.latency.percentile(50):>8.1f} {result.latency.percentile(99):>8.1f} '
+                            f'{result.errors:>7}'
+                        )
+        finally:
+            db.clear()
+            db.update(original)
+            connections.close_all()
+            # Remove o usuário de benchmark e os tokens criados pelos logins
+            user.delete()
@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = 'Mede logins/s por core (verificação de senha) para cada hasher configurável'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=2.0, help='Duração da medição por hasher')
+        parser.add_argument(
+            '--pbkdf2-iterations',
+            type=str,
+            default='260000,600000,1000000',
+            help='Lista de iterações PBKDF2 a comparar, separadas por vírgula'
+        )
+
+    def get_hashers(self, options):
+        for iterations in options['pbkdf2_iterations'].split(','):
+            iterations = int(iterations)
+            hasher_class = type('PBKDF2', (PBKDF2PasswordHasher,), {'iterations': iterations})
+            yield f'pbkdf2 ({iterations} iterações)', hasher_class()
+
+        for name, path in settings.PASSWORD_HASHER_PROFILES.items():
+            if name == 'pbkdf2':
+                continue
+            hasher = import_string(path)()
+            try:
+                if hasher.library:
+                    hasher._load_library()
+            except ValueError as e:
+                self.stdout.write(self.style.WARNING(f'⚠️  {name}: {e}'))
+                continue
+            yield name, hasher
+
+    def handle(self, *args, **options):
+        password = 'senha-de-benchmark-123'
+        self.stdout.write(f'🔄 Medindo verificação de senha ({options["seconds"]:.1f}s por hasher, 1 thread)')
+        self.stdout.write(f'{"hasher":<32} {"ms/login":>10} {"logins/s/core":>15}')
+
+        for label, hasher in self.get_hashers(options):
+            encoded = hasher.encode(password, hasher.salt())
+            count = 0
+            start = time.perf_counter()
+            deadline = start + options['seconds']
+            while True:
+                assert hasher.verify(password, encoded)
+                count += 1
+                if time.perf_counter() >= deadline:
+                    break
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'{label:<32} {elapsed / count * 1000:>10.1f} {count / elapsed:>15.1f}')
+
+        self.stdout.write(
+            f'Configuração atual: PASSWORD_HASHER={settings.PASSWORD_HASHER}, '
+            f'PASSWORD_PBKDF2_ITERATIONS={settings.PASSWORD_PBKDF2_ITERATIONS or PBKDF2PasswordHasher.iterations}'
+        )
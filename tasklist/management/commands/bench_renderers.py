@@ -0,0 +1,84 @@
+import gzip
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from accounts.serializers import UserSerializer
+from tasklist.middleware import brotli
+from tasklist.models import Task
+from tasklist.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+from tasklist.serializers import TaskSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compara tempo e tamanho da serialização de tarefas e usuários em cada renderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Objetos por payload')
+        parser.add_argument('--seconds', type=float, default=1.0, help='Duração de cada medição')
+
+    def build_payloads(self, rows):
+        # Objetos em memória: mede só serialização e renderização, sem banco
+        now = timezone.now()
+        tasks = [
+            Task(
+                id=i, owner_id=1, title=f'Tarefa {i} — revisar relatório', description='Descrição ' * 8,
+                priority='medium', due_date=(now + timedelta(days=i % 30)).date(), completed=i % 3 == 0,
+                created_at=now, updated_at=now,
+            )
+            for i in range(rows)
+        ]
+        users = [
+            User(id=i, username=f'usuario{i}', email=f'usuario{i}@example.com', first_name='João', last_name='Silva')
+            for i in range(rows)
+        ]
+        return [
+            ('TaskSerializer', TaskSerializer, tasks),
+            ('UserSerializer', UserSerializer, users),
+        ]
+
+    def get_renderers(self):
+        yield 'json (DRF)', JSONRenderer()
+        if orjson is not None:
+            yield 'orjson', ORJSONRenderer()
+        else:
+            self.stdout.write(self.style.WARNING('⚠️  orjson não está instalado: pip install orjson'))
+        if msgpack is not None:
+            yield 'msgpack', MessagePackRenderer()
+        else:
+            self.stdout.write(self.style.WARNING('⚠️  msgpack não está instalado: pip install msgpack'))
+
+    def measure(self, func, seconds):
+        count = 0
+        start = time.perf_counter()
+        deadline = start + seconds
+        while True:
+            result = func()
+            count += 1
+            if time.perf_counter() >= deadline:
+                break
+        return (time.perf_counter() - start) / count * 1000, result
+
+    def handle(self, *args, **options):
+        rows, seconds = options['rows'], options['seconds']
+        renderers = list(self.get_renderers())
+        self.stdout.write(f'🔄 {rows} objetos por payload, {seconds:.1f}s por medição')
+        self.stdout.write(
+            f'{"payload":<16} {"renderer":<12} {"ms":>8} {"bytes":>10} {"gzip":>9} {"brotli":>9}'
+        )
+
+        for label, serializer_class, objects in self.build_payloads(rows):
+            serialize_ms, data = self.measure(lambda: serializer_class(objects, many=True).data, seconds)
+            self.stdout.write(f'{label:<16} {"serializer":<12} {serialize_ms:>8.2f}')
+
+            for name, renderer in renderers:
+                render_ms, body = self.measure(lambda: renderer.render(data), seconds)
+                gzip_size = len(gzip.compress(body, compresslevel=6))
+                brotli_size = f'{len(brotli.compress(body, quality=5)):>9}' if brotli is not None else f'{"-":>9}'
+                self.stdout.write(
+                    f'{label:<16} {name:<12} {render_ms:>8.2f} {len(body):>10} {gzip_size:>9} {brotli_size}'
+                )
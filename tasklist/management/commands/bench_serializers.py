@@ -0,0 +1,63 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from tasklist.models import Task
+from tasklist.serializers import TaskSerializer, UserSerializer, row_serializer
+
+BENCH_USERNAME = 'bench-serializers'
+
+
+class Command(BaseCommand):
+    help = 'Compara ModelSerializer sobre instâncias com RowSerializer sobre .values() (consulta incluída)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Linhas por listagem')
+        parser.add_argument('--seconds', type=float, default=2.0, help='Duração de cada medição')
+
+    def measure(self, func, seconds):
+        count = 0
+        start = time.perf_counter()
+        deadline = start + seconds
+        while True:
+            func()
+            count += 1
+            if time.perf_counter() >= deadline:
+                break
+        return (time.perf_counter() - start) / count * 1000
+
+    def handle(self, *args, **options):
+        rows, seconds = options['rows'], options['seconds']
+        user = User.objects.filter(username=BENCH_USERNAME).first()
+        if user is None:
+            user = User.objects.create_user(BENCH_USERNAME)
+            Task.objects.bulk_create(
+                Task(owner=user, title=f'Tarefa {i}', description='Descrição ' * 8) for i in range(rows)
+            )
+
+        tasks = Task.objects.filter(owner=user).order_by('-id')[:rows]
+        users = User.objects.order_by('-id')[:rows]
+        task_rows, user_rows = row_serializer(TaskSerializer), row_serializer(UserSerializer)
+        cases = [
+            # .all() a cada chamada: sem reaproveitar o cache de resultados do queryset
+            ('tarefas', lambda: TaskSerializer(list(tasks.all()), many=True).data,
+             lambda: task_rows.serialize(tasks.values(*task_rows.columns))),
+            ('usuários', lambda: UserSerializer(list(users.all()), many=True).data,
+             lambda: user_rows.serialize(users.values(*user_rows.columns))),
+        ]
+
+        self.stdout.write(f'🔄 Até {rows} linhas por listagem, {seconds:.1f}s por medição')
+        self.stdout.write(f'{"listagem":<10} {"linhas":>7} {"model ms":>9} {"rows ms":>9} {"ganho":>7}')
+        try:
+            for label, model_path, rows_path in cases:
+                assert model_path() == rows_path(), f'{label}: saídas diferentes'
+                model_ms = self.measure(model_path, seconds)
+                rows_ms = self.measure(rows_path, seconds)
+                count = len(rows_path())
+                self.stdout.write(
+                    f'{label:<10} {count:>7} {model_ms:>9.2f} {rows_ms:>9.2f} {model_ms / rows_ms:>6.1f}x'
+                )
+        finally:
+            # Remove o usuário de benchmark e suas tarefas
+            user.delete()
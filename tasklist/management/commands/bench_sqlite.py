@@ -0,0 +1,149 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasklist.perf import Histogram
+
+
+class Command(BaseCommand):
+    help = 'Compara a configuração padrão do SQLite com a ajustada sob leituras e escritas concorrentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duração da medição por configuração')
+        parser.add_argument('--writers', type=int, default=4, help='Threads fazendo transações de escrita')
+        parser.add_argument('--readers', type=int, default=8, help='Threads fazendo leituras')
+
+    def get_configs(self):
+        options = settings.DATABASES['default'].get('OPTIONS', {})
+        # Padrão do Django antes do ajuste: journal DELETE, timeout de 5s, BEGIN DEFERRED
+        yield 'padrão', {'init_command': '', 'timeout': 5, 'transaction_mode': 'DEFERRED'}
+        yield 'ajustado', {
+            'init_command': options.get('init_command', ''),
+            'timeout': options.get('timeout', 5),
+            'transaction_mode': options.get('transaction_mode') or 'DEFERRED',
+        }
+
+    def connect(self, path, config):
+        conn = sqlite3.connect(path, timeout=config['timeout'], isolation_level=None, check_same_thread=False)
+        for statement in config['init_command'].split(';'):
+            if statement.strip():
+                conn.execute(statement)
+        return conn
+
+    def setup(self, path, config):
+        conn = self.connect(path, config)
+        conn.execute(
+            'CREATE TABLE task (id INTEGER PRIMARY KEY, owner_id INTEGER, title TEXT, completed INTEGER)'
+        )
+        conn.execute('CREATE INDEX task_owner_idx ON task (owner_id, completed)')
+        conn.executemany(
+            'INSERT INTO task (owner_id, title, completed) VALUES (?, ?, 0)',
+            [(i % 100, f'Tarefa {i}') for i in range(10000)],
+        )
+        conn.close()
+
+    def writer(self, path, config, stop, stats, number):
+        conn = self.connect(path, config)
+        begin = f'BEGIN {config["transaction_mode"]}'
+        owner = number
+        while not stop.is_set():
+            owner = (owner + 7) % 100
+            start = time.perf_counter()
+            try:
+                # Lê e depois escreve na mesma transação, como get_or_create/registro
+                conn.execute(begin)
+                conn.execute('SELECT COUNT(*) FROM task WHERE owner_id = ?', (owner,)).fetchone()
+                conn.execute('INSERT INTO task (owner_id, title, completed) VALUES (?, ?, 0)', (owner, 'Nova'))
+                conn.execute('UPDATE task SET completed = 1 WHERE id = last_insert_rowid()')
+                conn.execute('COMMIT')
+            except sqlite3.OperationalError as e:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                stats.error('write', e)
+            else:
+                stats.record('write', (time.perf_counter() - start) * 1000)
+        conn.close()
+
+    def reader(self, path, config, stop, stats, number):
+        conn = self.connect(path, config)
+        owner = number
+        while not stop.is_set():
+            owner = (owner + 13) % 100
+            start = time.perf_counter()
+            try:
+                conn.execute(
+                    'SELECT id, title FROM task WHERE owner_id = ? AND completed = 0 ORDER BY id DESC LIMIT 50',
+                    (owner,),
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                stats.error('read', e)
+            else:
+                stats.record('read', (time.perf_counter() - start) * 1000)
+        conn.close()
+
+    def run(self, config, options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'bench.sqlite3')
+            self.setup(path, config)
+
+            stats = Stats()
+            stop = threading.Event()
+            threads = [
+                threading.Thread(target=self.writer, args=(path, config, stop, stats, i))
+                for i in range(options['writers'])
+            ] + [
+                threading.Thread(target=self.reader, args=(path, config, stop, stats, i))
+                for i in range(options['readers'])
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(options['seconds'])
+            stop.set()
+            for thread in threads:
+                thread.join()
+            return stats
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'🔄 {options["writers"]} escritores + {options["readers"]} leitores, '
+            f'{options["seconds"]:.1f}s por configuração'
+        )
+        self.stdout.write(
+            f'{"configuração":<12} {"operação":<9} {"ok":>8} {"locked":>8} {"erro %":>7} {"p50 ms":>8} {"p99 ms":>8}'
+        )
+        for label, config in self.get_configs():
+            stats = self.run(config, options)
+            for kind in ('write', 'read'):
+                histogram = stats.histograms[kind]
+                ok, locked = histogram.count, stats.locked[kind]
+                rate = locked / (ok + locked) * 100 if ok + locked else 0.0
+                self.stdout.write(
+                    f'{label:<12} {kind:<9} {ok:>8} {locked:>8} {rate:>7.2f} '
+                    f'{histogram.percentile(50):>8.1f} {histogram.percentile(99):>8.1f}'
+                )
+            for message in stats.other_errors:
+                self.stdout.write(self.style.WARNING(f'⚠️  {label}: {message}'))
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {'write': Histogram(), 'read': Histogram()}
+        self.locked = {'write': 0, 'read': 0}
+        self.other_errors = set()
+
+    def record(self, kind, ms):
+        with self.lock:
+            self.histograms[kind].record(ms)
+
+    def error(self, kind, exc):
+        with self.lock:
+            if 'locked' in str(exc) or 'busy' in str(exc):
+                self.locked[kind] += 1
+            else:
+                self.other_errors.add(str(exc))
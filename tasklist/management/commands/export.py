@@ -0,0 +1,40 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasklist.export import CHUNK_SIZE, CONTENT_TYPES, export_rows
+from tasklist.models import Task
+from tasklist.serializers import TaskSerializer, UserSerializer, row_serializer
+
+
+class Command(BaseCommand):
+    help = 'Exporta tarefas (de um usuário ou de todos) ou usuários em NDJSON ou CSV, em streaming'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=('tasks', 'users'), help='O que exportar')
+        parser.add_argument('--format', choices=list(CONTENT_TYPES), default='ndjson', help='Formato de saída')
+        parser.add_argument('--user', type=str, help='Username dono das tarefas (padrão: todos)')
+        parser.add_argument('--output', type=str, help='Arquivo de saída (padrão: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Linhas lidas do banco por vez')
+
+    def handle(self, *args, **options):
+        if options['kind'] == 'users':
+            queryset, serializer = User.objects.order_by('id'), row_serializer(UserSerializer)
+        else:
+            queryset, serializer = Task.objects.order_by('id'), row_serializer(TaskSerializer)
+            if options['user']:
+                owner = User.objects.filter(username=options['user']).first()
+                if owner is None:
+                    raise CommandError(f'Usuário não encontrado: {options["user"]}')
+                queryset = queryset.filter(owner=owner)
+
+        chunks = export_rows(queryset, serializer, options['format'], chunk_size=options['chunk_size'])
+        if options['output']:
+            size = 0
+            with open(options['output'], 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            self.stderr.write(self.style.SUCCESS(f'✅ {size} bytes gravados em {options["output"]}'))
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending='')
@@ -0,0 +1,352 @@
+import itertools
+import json
+import random
+import re
+import subprocess
+import threading
+from datetime import date
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+
+from tasklist.loadtest import run_mix, serve, serve_asgi
+from tasklist.management.commands.seed import create_user_tasks
+from tasklist.models import EmailOutbox, ExpiringToken, Task
+from tasklist.throttling import throttling_disabled
+
+PREFIX = 'loadbench-'
+EMAIL_DOMAIN = 'loadbench.invalid'
+PASSWORD = 'senha-de-benchmark-123'
+
+# URLconfs cujas rotas são exercitadas (as não incluídas no ROOT_URLCONF são ignoradas)
+URLCONFS = ('tasklist.urls', 'accounts.urls')
+
+
+class BenchContext:
+    """Usuários sintéticos, seus tokens e tarefas, compartilhados pelos cenários"""
+
+    def __init__(self, users, tokens, task_ids, staff_token, refresh_tokens, seed=0):
+        self.users = users
+        self.tokens = tokens
+        self.task_ids = task_ids
+        self.staff_token = staff_token
+        self.refresh_tokens = iter(refresh_tokens)
+        self.unique = itertools.count()
+        self.seed = seed
+        self.streams = itertools.count()
+        self.local = threading.local()
+
+    @property
+    def random(self):
+        """Random do cliente (thread) corrente, semeado a partir de --seed como em run_mix"""
+        rng = getattr(self.local, 'rng', None)
+        if rng is None:
+            rng = self.local.rng = random.Random(f'{self.seed}:{next(self.streams)}')
+        return rng
+
+    def pick(self):
+        user = self.random.choice(self.users)
+        return user, {'Authorization': f'Token {self.tokens[user.pk]}'}
+
+
+def json_request(method, body=None, headers=None, **kwargs):
+    headers = dict(headers or {})
+    if body is not None:
+        headers['Content-Type'] = 'application/json'
+        body = json.dumps(body)
+    return method, kwargs, body, headers
+
+
+class Command(BaseCommand):
+    help = (
+        'Semeia usuários e tarefas sintéticos e mede req/s e p50/p95/p99 de cada rota de '
+        'tasklist.urls e accounts.urls com uma mistura de clientes concorrentes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Usuários sintéticos')
+        parser.add_argument('--tasks', type=int, default=200, help='Tarefas por usuário')
+        parser.add_argument(
+            '--concurrency', type=str, default='8,32',
+            help='Níveis de concorrência a medir, separados por vírgula'
+        )
+        parser.add_argument('--seconds', type=float, default=10.0, help='Duração de cada medição')
+        parser.add_argument('--threads', type=int, default=8, help='Threads do servidor WSGI')
+        parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi', help='Servidor local a usar')
+        parser.add_argument(
+            '--mix', type=str, default='',
+            help='Pesos por rota, ex.: "tasklist:list_tasks=50,tasklist:create_task=5" (só as listadas rodam)'
+        )
+        parser.add_argument('--keep-throttles', action='store_true', help='Mantém o rate limiting ativo')
+        parser.add_argument('--seed', type=int, default=0, help='Semente dos sorteios (reprodutibilidade)')
+        parser.add_argument('--output', type=str, help='Grava os resultados em JSON neste arquivo')
+        parser.add_argument('--baseline', type=str, help='JSON de uma execução anterior para comparar o p95')
+        parser.add_argument(
+            '--regression', type=float, default=20.0,
+            help='Aumento percentual de p95 sobre o baseline marcado como regressão'
+        )
+        parser.add_argument('--keep-data', action='store_true', help='Não remove os dados sintéticos ao final')
+
+    def mounted_routes(self):
+        """{'app:nome': caminho} das rotas de URLCONFS incluídas no ROOT_URLCONF"""
+        routes = {}
+
+        def walk(patterns, prefix):
+            for pattern in patterns:
+                if not isinstance(pattern, URLResolver):
+                    continue
+                route = prefix + str(pattern.pattern)
+                module = getattr(pattern.urlconf_module, '__name__', None)
+                if module in URLCONFS:
+                    app = module.split('.')[0]
+                    for child in pattern.url_patterns:
+                        if child.name:
+                            routes[f'{app}:{child.name}'] = route + str(child.pattern)
+                else:
+                    walk(pattern.url_patterns, route)
+
+        walk(get_resolver().url_patterns, '/')
+        return routes
+
+    def get_scenarios(self, ctx):
+        """{'app:nome': (peso, status esperados, fábrica(n) -> (método, kwargs da rota, corpo, headers))}"""
+
+        staff = {'Authorization': f'Token {ctx.staff_token}'}
+
+        def authed(method, body=None, **kwargs):
+            def factory(n):
+                _, headers = ctx.pick()
+                return json_request(method, body, headers, **kwargs)
+            return factory
+
+        def login(field):
+            def factory(n):
+                user, _ = ctx.pick()
+                return json_request('POST', {field: getattr(user, field), 'password': PASSWORD})
+            return factory
+
+        def register(n):
+            name = f'{PREFIX}r{next(ctx.unique)}-{ctx.random.getrandbits(32):x}'
+            return json_request('POST', {
+                'username': name, 'email': f'{name}@{EMAIL_DOMAIN}',
+                'password': PASSWORD, 'password2': PASSWORD, 'first_name': 'Carga', 'last_name': 'Sintética',
+            })
+
+        def forgot(n):
+            user, _ = ctx.pick()
+            return json_request('POST', {'email': user.email})
+
+        def refresh(n):
+            # Cada token só pode ser rotacionado uma vez: usa um do pool
+            key = next(ctx.refresh_tokens, 'esgotado')
+            return json_request('POST', None, {'Authorization': f'Token {key}'})
+
+        def bulk(n):
+            user, headers = ctx.pick()
+            task_id = ctx.random.choice(ctx.task_ids[user.pk])
+            return json_request('POST', {'operations': [
+                {'op': 'update', 'id': task_id, 'data': {'completed': ctx.random.random() < 0.5}},
+            ]}, headers)
+
+        def search(n):
+            _, headers = ctx.pick()
+            method, kwargs, body, headers = json_request('GET', None, headers)
+            query = urlencode({'q': ctx.random.choice(['relat', 'reunião', 'comprar', 'projeto'])})
+            return method, {'query': query}, body, headers
+
+        def check_username(n):
+            return json_request('POST', {'username': f'livre{ctx.random.getrandbits(40):x}'})
+
+        def change_password(n):
+            user, _ = ctx.pick()
+            return json_request('POST', {'new_password': PASSWORD}, staff, user_id=user.pk)
+
+        return {
+            'tasklist:test': (2, {200}, lambda n: json_request('GET')),
+            'tasklist:login': (1, {200}, login('username')),
+            'tasklist:register': (1, {201}, register),
+            'tasklist:forgot_password': (1, {200}, forgot),
+            'tasklist:reset_password': (1, {400}, lambda n: json_request('POST', {'token': 'invalido'})),
+            'tasklist:check_username': (5, {200}, check_username),
+            'tasklist:refresh_token': (1, {200}, refresh),
+            'tasklist:create_user': (1, {200}, lambda n: json_request('POST', {}, staff)),
+            'tasklist:list_users': (2, {200}, lambda n: json_request('GET', None, staff)),
+            'tasklist:change_user_password': (1, {200}, change_password),
+            'tasklist:delete_user': (1, {200}, lambda n: json_request('DELETE', None, staff, user_id=0)),
+            'tasklist:list_tasks': (30, {200}, authed('GET')),
+            'tasklist:create_task': (5, {201}, lambda n: authed('POST', {
+                'title': f'Tarefa de carga {n}', 'priority': ctx.random.choice(['low', 'medium', 'high']),
+            })(n)),
+            'tasklist:bulk_tasks': (3, {200}, bulk),
+            'tasklist:sync_tasks': (10, {200}, authed('GET')),
+            'tasklist:task_stats': (10, {200}, authed('GET')),
+            'tasklist:search_tasks': (8, {200}, search),
+            'tasklist:export_tasks': (1, {200}, authed('GET', query='output=ndjson')),
+            'tasklist:async_test': (1, {200}, lambda n: json_request('GET')),
+            'tasklist:async_login': (1, {200}, login('username')),
+            'tasklist:async_check_username': (2, {200}, check_username),
+            'tasklist:async_list_tasks': (5, {200}, authed('GET')),
+            'tasklist:async_create_task': (2, {201}, lambda n: authed('POST', {'title': f'Tarefa async {n}'})(n)),
+            'accounts:register': (1, {201}, register),
+            'accounts:login': (1, {200}, login('email')),
+            'accounts:password-reset': (1, {200}, forgot),
+            'accounts:password-reset-confirm': (1, {400}, lambda n: json_request('POST', {'token': 'invalido'})),
+            'accounts:profile': (5, {200}, authed('GET')),
+        }
+
+    def parse_mix(self, raw, scenarios):
+        if not raw:
+            return {name: weight for name, (weight, _, _) in scenarios.items()}
+        mix = {}
+        for item in raw.split(','):
+            name, _, weight = item.strip().partition('=')
+            if name not in scenarios:
+                raise CommandError(f'Rota desconhecida em --mix: {name}')
+            mix[name] = float(weight or 1)
+        return mix
+
+    def seed_data(self, options):
+        rng = random.Random(options['seed'])
+        today = date.today()
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create([
+            User(username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@{EMAIL_DOMAIN}', password=password, first_name='Carga')
+            for i in range(options['users'])
+        ])
+        users[0].is_staff = True
+        users[0].save(update_fields=['is_staff'])
+
+        # Mesmo gerador do `seed`: tarefas com change_seq e contadores consistentes
+        create_user_tasks(rng, ((user.pk, options['tasks']) for user in users), today, batch_size=1000)
+
+        expires_at = timezone.now() + settings.AUTH_TOKEN_TTL
+        tokens = {user.pk: ExpiringToken.generate_key() for user in users}
+        refresh_tokens = [ExpiringToken.generate_key() for _ in range(max(1000, options['users'] * 20))]
+        ExpiringToken.objects.bulk_create(
+            [ExpiringToken(key=key, user_id=user_id, expires_at=expires_at) for user_id, key in tokens.items()] +
+            [ExpiringToken(key=key, user=rng.choice(users), expires_at=expires_at) for key in refresh_tokens],
+            batch_size=1000,
+        )
+
+        task_ids = {user.pk: [] for user in users}
+        for task_id, owner_id in Task.objects.filter(owner__in=users).values_list('id', 'owner_id'):
+            task_ids[owner_id].append(task_id)
+        return BenchContext(users, tokens, task_ids, tokens[users[0].pk], refresh_tokens, seed=options['seed'])
+
+    def cleanup(self):
+        connections.close_all()
+        User.objects.filter(username__startswith=PREFIX).delete()
+        EmailOutbox.objects.filter(to__endswith=f'@{EMAIL_DOMAIN}').delete()
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def handle(self, *args, **options):
+        if options['server'] == 'asgi':
+            try:
+                import uvicorn  # noqa: F401
+            except ImportError:
+                raise CommandError('uvicorn não está instalado: pip install uvicorn')
+
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = {(run['concurrency'], name): stats for run in json.load(f)['runs']
+                            for name, stats in run['endpoints'].items()}
+
+        routes = self.mounted_routes()
+        if not any(name.startswith('accounts:') for name in routes):
+            self.stdout.write(self.style.WARNING('⚠️  accounts.urls não está no ROOT_URLCONF: rotas ignoradas'))
+
+        if User.objects.filter(username__startswith=PREFIX).exists():
+            self.cleanup()
+        self.stdout.write(f'🔄 Semeando {options["users"]} usuários × {options["tasks"]} tarefas')
+        ctx = self.seed_data(options)
+        connections.close_all()
+
+        scenarios = self.get_scenarios(ctx)
+        mix = self.parse_mix(options['mix'], scenarios)
+        uncovered = sorted(set(routes) - set(scenarios))
+        if uncovered:
+            self.stdout.write(self.style.WARNING(f'⚠️  Rotas sem cenário: {", ".join(uncovered)}'))
+
+        def bind(name):
+            route, factory = routes[name], scenarios[name][2]
+
+            def make_request(n):
+                method, kwargs, body, headers = factory(n)
+                query = kwargs.pop('query', None)
+                path = re.sub(r'<(?:\w+:)?(\w+)>', lambda m: str(kwargs[m.group(1)]), route)
+                return method, f'{path}?{query}' if query else path, body, headers
+            return make_request
+
+        active = [(name, weight, bind(name)) for name, weight in mix.items() if name in routes and weight > 0]
+
+        report = {
+            'commit': self.git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'options': {key: options[key] for key in ('users', 'tasks', 'seconds', 'threads', 'server', 'mix', 'seed')},
+            'runs': [],
+        }
+        regressions = []
+        server = serve(threads=options['threads']) if options['server'] == 'wsgi' else serve_asgi()
+        try:
+            # Mede o custo das rotas, não as respostas 429 do rate limiting
+            with throttling_disabled(not options['keep_throttles']), server as address:
+                for level in levels:
+                    results = run_mix(address, active, level, options['seconds'], seed=options['seed'])
+                    run = {'concurrency': level, 'endpoints': {}}
+                    self.stdout.write(f'\n{level} clientes, {options["seconds"]:.1f}s ({options["server"]})')
+                    self.stdout.write(
+                        f'{"rota":<36} {"req":>7} {"req/s":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"erros":>6} {"Δp95":>7}'
+                    )
+                    for name, _, _ in active:
+                        result, expected = results[name], scenarios[name][1]
+                        stats = {
+                            'path': routes[name],
+                            'requests': result.requests,
+                            'rps': round(result.rps, 2),
+                            'p50_ms': round(result.percentile(50), 2),
+                            'p95_ms': round(result.percentile(95), 2),
+                            'p99_ms': round(result.percentile(99), 2),
+                            'errors': sum(count for status, count in result.statuses.items() if status not in expected),
+                            'statuses': {str(status): count for status, count in sorted(result.statuses.items())},
+                        }
+                        run['endpoints'][name] = stats
+
+                        delta = ''
+                        previous = baseline and baseline.get((level, name))
+                        if previous and previous['p95_ms'] and stats['requests']:
+                            change = (stats['p95_ms'] / previous['p95_ms'] - 1) * 100
+                            delta = f'{change:+.0f}%'
+                            if change > options['regression']:
+                                regressions.append(f'{name} ({level} clientes): p95 {delta}')
+                        line = (
+                            f'{name:<36} {stats["requests"]:>7} {stats["rps"]:>8.1f} {stats["p50_ms"]:>8.1f} '
+                            f'{stats["p95_ms"]:>8.1f} {stats["p99_ms"]:>8.1f} {stats["errors"]:>6} {delta:>7}'
+                        )
+                        self.stdout.write(self.style.WARNING(line) if stats['errors'] else line)
+                    report['runs'].append(run)
+        finally:
+            if not options['keep_data']:
+                self.cleanup()
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f'✅ Resultados gravados em {options["output"]}'))
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(f'❌ Regressão: {regression}'))
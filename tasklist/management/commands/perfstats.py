@@ -0,0 +1,77 @@
+import json
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasklist.perf import load_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Mostra latência, consultas e tamanho de resposta por endpoint (PerformanceMiddleware)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Saída em JSON')
+        parser.add_argument('--reset', action='store_true', help='Apaga as métricas coletadas')
+        parser.add_argument(
+            '--sort',
+            choices=['total', 'requests', 'p99', 'queries'],
+            default='total',
+            help='Ordenação: tempo acumulado, requisições, p99 ou consultas por requisição'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.PERF_STATS_DIR:
+            raise CommandError('PERF_STATS_DIR não está configurado: nenhum processo grava métricas')
+        directory = Path(settings.PERF_STATS_DIR)
+        if options['reset']:
+            shutil.rmtree(directory, ignore_errors=True)
+            self.stdout.write(self.style.SUCCESS('✅ Métricas apagadas'))
+            return
+
+        endpoints, counters = load_snapshots(directory) if directory.exists() else ({}, {})
+        rows = []
+        for name, stats in endpoints.items():
+            total = stats.histograms['total']
+            rows.append({
+                'endpoint': name,
+                'requests': stats.requests,
+                'total_ms': round(total.total, 1),
+                'p50_ms': total.percentile(50),
+                'p95_ms': total.percentile(95),
+                'p99_ms': total.percentile(99),
+                'db_ms_avg': round(stats.histograms['db'].total / stats.requests, 2),
+                'serialize_ms_avg': round(stats.histograms['serialize'].total / stats.requests, 2),
+                'render_ms_avg': round(stats.histograms['render'].total / stats.requests, 2),
+                'queries_avg': round(stats.queries / stats.requests, 2),
+                'bytes_avg': stats.bytes // stats.requests,
+            })
+
+        sort_key = {
+            'total': 'total_ms', 'requests': 'requests', 'p99': 'p99_ms', 'queries': 'queries_avg',
+        }[options['sort']]
+        rows.sort(key=lambda row: row[sort_key], reverse=True)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'endpoints': rows, 'counters': counters}, indent=2))
+            return
+
+        if not rows:
+            self.stdout.write('Nenhuma métrica coletada ainda.')
+            return
+
+        self.stdout.write(
+            f'{"endpoint":<42} {"req":>7} {"total s":>9} {"p50":>7} {"p95":>7} {"p99":>7} '
+            f'{"db ms":>7} {"ser ms":>7} {"rend ms":>8} {"queries":>8} {"bytes":>8}'
+        )
+        for row in rows:
+            self.stdout.write(
+                f'{row["endpoint"]:<42} {row["requests"]:>7} {row["total_ms"] / 1000:>9.2f} '
+                f'{row["p50_ms"]:>7} {row["p95_ms"]:>7} {row["p99_ms"]:>7} '
+                f'{row["db_ms_avg"]:>7} {row["serialize_ms_avg"]:>7} {row["render_ms_avg"]:>8} '
+                f'{row["queries_avg"]:>8} {row["bytes_avg"]:>8}'
+            )
+        for name, value in sorted(counters.items()):
+            self.stdout.write(f'{name}: {value}')
+        self.stdout.write('Percentis em ms (limite superior do bucket do histograma)')
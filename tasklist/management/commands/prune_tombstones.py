@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasklist.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Remove tombstones de sincronização mais antigas que o período de retenção'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help='Dias de retenção das tombstones'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Linhas excluídas por transação')
+        parser.add_argument('--pause', type=float, default=0.0, help='Pausa (s) entre lotes')
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        deleted = prune_tombstones(before, batch_size=options['batch_size'], pause=options['pause'])
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {deleted} tombstones anteriores a {before:%Y-%m-%d %H:%M} removidas')
+        )
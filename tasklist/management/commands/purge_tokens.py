@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasklist.batching import delete_in_batches
+from tasklist.models import ExpiringToken, PasswordResetToken
+
+
+class Command(BaseCommand):
+    help = 'Remove tokens de API e de redefinição de senha expirados em lotes curtos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tokens excluídos por transação')
+        parser.add_argument('--pause', type=float, default=0.05, help='Pausa (s) entre lotes')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        for model, label in ((ExpiringToken, 'tokens de API'), (PasswordResetToken, 'tokens de redefinição de senha')):
+            expired = model.objects.filter(expires_at__lte=now)
+            deleted = delete_in_batches(expired, batch_size=options['batch_size'], pause=options['pause'])
+            self.stdout.write(self.style.SUCCESS(f'✅ {deleted} {label} expirados removidos'))
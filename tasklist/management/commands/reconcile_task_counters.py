@@ -0,0 +1,39 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from tasklist.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores de tarefas por usuário em lotes e informa as divergências'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Usuários por transação')
+        parser.add_argument('--dry-run', action='store_true', help='Só informa, sem corrigir')
+        parser.add_argument('--verbose-drift', action='store_true', help='Lista cada usuário divergente')
+
+    def handle(self, *args, **options):
+        checked = 0
+        drifted = []
+        last_id = 0
+        while True:
+            user_ids = list(
+                User.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not user_ids:
+                break
+            drifted.extend(reconcile(user_ids, dry_run=options['dry_run']))
+            checked += len(user_ids)
+            last_id = user_ids[-1]
+
+        if options['verbose_drift']:
+            for user_id, before, after in drifted:
+                before = 'sem linha' if before is None else f'total={before[0]} concluídas={before[1]}'
+                self.stdout.write(f'  usuário {user_id}: {before} -> total={after[0]} concluídas={after[1]}')
+
+        action = 'encontrados (nada alterado)' if options['dry_run'] else 'corrigidos'
+        style = self.style.WARNING if drifted else self.style.SUCCESS
+        self.stdout.write(style(
+            f'{"⚠️ " if drifted else "✅"} {checked} usuários verificados, '
+            f'{len(drifted)} usuários com divergência {action}'
+        ))
@@ -0,0 +1,193 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import date, timedelta
+from multiprocessing import get_context
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from tasklist.models import ChangeSequence, Task, TaskCounters
+from tasklist.search import FTS_INSERT_TRIGGER, restore_fts_insert_trigger
+
+WORDS = [
+    'Comprar', 'Revisar', 'Enviar', 'Ligar', 'Pagar', 'Agendar', 'Planejar', 'Estudar', 'Organizar',
+    'relatório', 'reunião', 'conta', 'proposta', 'mercado', 'consulta', 'projeto', 'viagem', 'email',
+]
+PRIORITIES = ['low', 'medium', 'high']
+PRIORITY_WEIGHTS = [25, 50, 25]
+
+# Ajustes só da carga: o arquivo continua íntegro, mas um crash no meio pode perder o lote corrente
+SQLITE_LOAD_PRAGMAS = [
+    'PRAGMA synchronous=OFF',
+    'PRAGMA foreign_keys=OFF',
+    'PRAGMA cache_size=-262144',
+    'PRAGMA busy_timeout=600000',
+]
+POSTGRES_LOAD_SETTINGS = ['SET synchronous_commit TO off']
+
+
+def tune_for_load():
+    if connection.in_atomic_block:
+        # O SQLite não aceita mudar o sincronismo dentro de uma transação (ex.: nos testes)
+        return
+    statements = {'sqlite': SQLITE_LOAD_PRAGMAS, 'postgresql': POSTGRES_LOAD_SETTINGS}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+@contextmanager
+def fts_insert_trigger_disabled():
+    """
+    Sem o trigger de INSERT do índice FTS5 (tasklist.search) durante a carga;
+    no fim o trigger volta e o índice é reconstruído de uma vez. Se o processo
+    morrer no meio, `migrate` recria o trigger (restore_fts_insert_trigger).
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    # Um seed anterior interrompido pode ter deixado o trigger de fora
+    restore_fts_insert_trigger(connection.alias)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_INSERT_TRIGGER}')
+    try:
+        yield
+    finally:
+        restore_fts_insert_trigger(connection.alias)
+
+
+def build_tasks(rng, user_id, count, today):
+    tasks = []
+    for seq in range(1, count + 1):
+        due_date = today + timedelta(days=rng.randint(-60, 90)) if rng.random() < 0.7 else None
+        # Vencidas tendem a estar concluídas; as futuras, pendentes
+        done_rate = 0.75 if due_date is not None and due_date < today else 0.25
+        tasks.append(Task(
+            owner_id=user_id,
+            title=f'{rng.choice(WORDS[:9])} {rng.choice(WORDS[9:])}',
+            description=' '.join(rng.choices(WORDS, k=rng.randint(3, 12))) if rng.random() < 0.5 else '',
+            priority=rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0],
+            due_date=due_date,
+            completed=rng.random() < done_rate,
+            change_seq=seq,
+        ))
+    return tasks
+
+
+def create_user_tasks(rng, counts, today, batch_size=None):
+    """
+    Grava as tarefas de cada (user_id, quantidade) em `counts` com os
+    contadores e a sequência de sync já consistentes (change_seq 1..n e
+    ChangeSequence.value = n), como se tivessem passado pela API.
+    """
+    tasks, task_counters, sequences = [], [], []
+    for user_id, count in counts:
+        user_tasks = build_tasks(rng, user_id, count, today)
+        tasks.extend(user_tasks)
+        task_counters.append(TaskCounters(
+            user_id=user_id, total=len(user_tasks), completed=sum(task.completed for task in user_tasks),
+        ))
+        sequences.append(ChangeSequence(user_id=user_id, value=len(user_tasks)))
+    Task.objects.bulk_create(tasks, batch_size=batch_size)
+    TaskCounters.objects.bulk_create(task_counters, batch_size=batch_size)
+    ChangeSequence.objects.bulk_create(sequences, batch_size=batch_size)
+    return tasks
+
+
+def seed_chunk(prefix, start, count, tasks_per_user, password, seed):
+    """Cria os usuários [start, start + count) com suas tarefas, contadores e sequências"""
+    rng = random.Random(seed + start)
+    today = date.today()
+    tune_for_load()
+
+    users = [
+        User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', password=password,
+             first_name=rng.choice(['Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fábio']))
+        for i in range(start, start + count)
+    ]
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        # Quantidade por usuário em torno da média pedida
+        tasks = create_user_tasks(rng, (
+            (user.pk, rng.randint(tasks_per_user // 2, tasks_per_user * 3 // 2)) for user in users
+        ), today)
+    return count, len(tasks)
+
+
+def seed_chunk_in_worker(*args):
+    try:
+        return seed_chunk(*args)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Gera usuários e tarefas sintéticos em massa (bulk_create em lotes, vários processos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Usuários a criar')
+        parser.add_argument('--tasks', type=int, default=100, help='Média de tarefas por usuário')
+        parser.add_argument('--batch-size', type=int, default=50000, help='Tarefas por transação (aprox.)')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Processos que geram e gravam os lotes (1 = no próprio processo)'
+        )
+        parser.add_argument('--prefix', type=str, default='seed-', help='Prefixo dos usernames criados')
+        parser.add_argument('--password', type=str, default='senha-de-seed-123', help='Senha de todos os usuários')
+        parser.add_argument('--seed', type=int, default=0, help='Semente dos sorteios (reprodutibilidade)')
+
+    def handle(self, *args, **options):
+        prefix, total_users = options['prefix'], options['users']
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f'Já existem usuários com o prefixo "{prefix}": use outro --prefix')
+
+        # Um hash só, calculado uma vez: o custo do PBKDF2 não entra na carga
+        password = make_password(options['password'])
+        users_per_chunk = max(1, options['batch_size'] // max(1, options['tasks']))
+        chunks = [
+            (prefix, start, min(users_per_chunk, total_users - start), options['tasks'], password, options['seed'])
+            for start in range(0, total_users, users_per_chunk)
+        ]
+        workers = max(1, min(options['workers'], len(chunks)))
+        self.stdout.write(
+            f'🔄 {total_users} usuários × ~{options["tasks"]} tarefas em {len(chunks)} lotes, {workers} processo(s)'
+        )
+
+        if connection.vendor == 'sqlite':
+            self.stdout.write(
+                '   índice de busca sem o trigger de INSERT durante a carga; '
+                'se o processo for morto, rode `python manage.py migrate` para recriá-lo'
+            )
+        start_time = time.perf_counter()
+        users = tasks = 0
+        with fts_insert_trigger_disabled():
+            if workers == 1:
+                results = (seed_chunk(*chunk) for chunk in chunks)
+            else:
+                # Cada processo abre a própria conexão; as herdadas no fork não podem ser usadas
+                connections.close_all()
+                executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('fork'))
+                futures = [executor.submit(seed_chunk_in_worker, *chunk) for chunk in chunks]
+                results = (future.result() for future in as_completed(futures))
+            try:
+                for created_users, created_tasks in results:
+                    users += created_users
+                    tasks += created_tasks
+                    elapsed = time.perf_counter() - start_time
+                    self.stdout.write(
+                        f'   {users}/{total_users} usuários, {tasks} tarefas ({tasks / elapsed:,.0f} tarefas/s)'
+                    )
+            finally:
+                if workers > 1:
+                    executor.shutdown(cancel_futures=True)
+            load_seconds = time.perf_counter() - start_time
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {users} usuários e {tasks} tarefas em {time.perf_counter() - start_time:.1f}s '
+            f'(carga {load_seconds:.1f}s, {tasks / load_seconds:,.0f} tarefas/s; o restante reconstrói o índice de busca)'
+        ))
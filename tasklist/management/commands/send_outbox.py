@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasklist.mail import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = 'Envia os emails pendentes da outbox usando um pool de threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help='Threads de envio (padrão: EMAIL_OUTBOX_WORKERS)')
+        parser.add_argument('--batch-size', type=int, help='Emails por lote/conexão (padrão: EMAIL_OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--backend', type=str, help='Backend de email alternativo (ex.: locmem, filebased)')
+        parser.add_argument('--once', action='store_true', help='Drena a fila uma vez e encerra')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Espera (s) quando a fila está vazia')
+
+    def handle(self, *args, **options):
+        worker = OutboxWorker(
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            backend=options['backend'],
+        )
+        self.stdout.write(f'📮 Outbox: {worker.workers} threads, lotes de {worker.batch_size}')
+
+        try:
+            while True:
+                sent, failed = worker.drain()
+                if sent or failed:
+                    self.stdout.write(f'📧 {sent} enviados, {failed} falhas')
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.close()
@@ -1,8 +1,13 @@
+import time
+
 from django.core.management.base import BaseCommand
 from django.core.mail import send_mail
 from django.conf import settings
 from decouple import config
 
+from tasklist.mail import OutboxWorker
+from tasklist.models import EmailOutbox
+
 class Command(BaseCommand):
     help = 'Testa o envio de email'
 
@@ -10,12 +15,29 @@ class Command(BaseCommand):
         parser.add_argument(
             '--to',
             type=str,
-            default=config('EMAIL_HOST_USER'),
+            default=config('EMAIL_HOST_USER', default=''),
             help='Email de destino para o teste'
         )
+        parser.add_argument(
+            '--throughput',
+            type=int,
+            default=0,
+            help='Enfileira N emails na outbox e mede a vazão do worker'
+        )
+        parser.add_argument('--workers', type=int, help='Threads do worker no modo de vazão')
+        parser.add_argument('--batch-size', type=int, help='Emails por lote no modo de vazão')
+        parser.add_argument(
+            '--backend',
+            type=str,
+            default='django.core.mail.backends.locmem.EmailBackend',
+            help='Backend usado no modo de vazão (padrão: locmem, nada sai da máquina)'
+        )
 
     def handle(self, *args, **options):
         to_email = options['to']
+
+        if options['throughput']:
+            return self.handle_throughput(to_email, options)
         
         self.stdout.write('🔄 Testando configuração de email...')
         self.stdout.write(f'📧 De: {settings.EMAIL_HOST_USER}')
@@ -52,4 +74,40 @@ Sistema TaskManagement''',
             self.stdout.write('   - Se a senha de aplicativo está correta')
             self.stdout.write('   - Se a verificação em duas etapas está ativa')
             self.stdout.write('   - Se as variáveis de ambiente estão corretas')
-            self.stdout.write('   - Se o arquivo .env está na raiz do projeto')
\ No newline at end of file
+            self.stdout.write('   - Se o arquivo .env está na raiz do projeto')
+
+    def handle_throughput(self, to_email, options):
+        count = options['throughput']
+        self.stdout.write(f'🔄 Enfileirando {count} emails na outbox...')
+
+        entries = EmailOutbox.objects.bulk_create([
+            EmailOutbox(
+                subject=f'Teste de vazão #{i}',
+                to=to_email,
+                body='Email de teste de vazão do TaskManagement.',
+            )
+            for i in range(count)
+        ], batch_size=500)
+        # O worker só enxerga os emails deste teste, nunca a fila real
+        queryset = EmailOutbox.objects.filter(id__in=[entry.id for entry in entries])
+
+        worker = OutboxWorker(
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            backend=options['backend'],
+            queryset=queryset,
+        )
+        start = time.perf_counter()
+        try:
+            sent, failed = worker.drain()
+        finally:
+            worker.close()
+        elapsed = time.perf_counter() - start
+        queryset.delete()
+
+        self.stdout.write(f'📧 Backend: {options["backend"]}')
+        self.stdout.write(f'📧 {worker.workers} threads, lotes de {worker.batch_size}')
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {sent} enviados, {failed} falhas em {elapsed:.2f}s '
+                               f'({sent / elapsed if elapsed else 0:.1f} emails/s)')
+        )
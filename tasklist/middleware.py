@@ -0,0 +1,174 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .perf import current_timer, registry
+
+
+class RequestTimer:
+    """
+    execute_wrapper que conta consultas e soma o tempo gasto no banco; também
+    acumula o tempo de serialização (tasklist.perf.timed_serialization).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+def timed_execute(execute, sql, params, many, context):
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(connection):
+    """Instala timed_execute na conexão, de forma permanente (via connection_created)"""
+    if timed_execute not in connection.execute_wrappers:
+        # No início da lista: execute_wrapper() remove do fim os wrappers que empilha
+        connection.execute_wrappers.insert(0, timed_execute)
+
+
+class PerformanceMiddleware:
+    """
+    Mede cada requisição: tempo total, consultas e tempo de banco, tempo de
+    serialização (serializer.data e RowSerializer), tempo de renderização da
+    resposta (Response.render: bytes JSON/msgpack) e tamanho do corpo.
+
+    Os valores saem no header Server-Timing e alimentam os histogramas de
+    tasklist.perf, consultados com `python manage.py perfstats`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Sob ASGI roda como middleware async, sem forçar views async para uma thread
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        timer, start = self.start(request)
+        token = current_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.finish(request, response, timer, start)
+
+    async def __acall__(self, request):
+        timer, start = self.start(request)
+        token = current_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.finish(request, response, timer, start)
+
+    def start(self, request):
+        request._perf_render = 0.0
+        return RequestTimer(), time.perf_counter()
+
+    def finish(self, request, response, timer, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = timer.seconds * 1000
+        serialize_ms = timer.serialize_seconds * 1000
+        render_ms = request._perf_render * 1000
+        size = 0 if response.streaming else len(response.content)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms:.1f};desc="{timer.count} queries"',
+            f'serialize;dur={serialize_ms:.1f}',
+            f'render;dur={render_ms:.1f}',
+            f'total;dur={total_ms:.1f}',
+        ])
+
+        match = request.resolver_match
+        endpoint = f'{request.method} /{match.route}' if match else f'{request.method} <unresolved>'
+        registry.record(endpoint, total_ms, db_ms, serialize_ms, render_ms, timer.count, size)
+        return response
+
+    def process_template_response(self, request, response):
+        # Respostas do DRF são renderizadas depois da view: mede esse trecho
+        start = time.perf_counter()
+
+        def finished(rendered):
+            request._perf_render = time.perf_counter() - start
+
+        response.add_post_render_callback(finished)
+        return response
+
+
+def accepted_encodings(header):
+    """Codificações aceitas no Accept-Encoding (as com q=0 ficam de fora)"""
+    encodings = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Comprime respostas a partir de RESPONSE_COMPRESSION['MIN_SIZE'] bytes:
+    brotli quando o cliente aceita e a biblioteca está instalada
+    (`pip install brotli`), senão gzip (comportamento do GZipMiddleware,
+    inclusive para respostas em streaming).
+    """
+
+    def process_response(self, request, response):
+        options = settings.RESPONSE_COMPRESSION
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < options['MIN_SIZE']:
+            return response
+
+        encodings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in encodings and not response.streaming:
+            patch_vary_headers(response, ('Accept-Encoding',))
+            compressed = brotli.compress(response.content, quality=options['BROTLI_QUALITY'])
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+            etag = response.get('ETag')
+            if etag and etag.startswith('"'):
+                response.headers['ETag'] = 'W/' + etag
+            response.headers['Content-Encoding'] = 'br'
+            return response
+
+        if 'gzip' not in encodings:
+            patch_vary_headers(response, ('Accept-Encoding',))
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_change_seq(apps, schema_editor):
+    # Tarefas existentes recebem sequências 1..n por dono para que um
+    # cliente sincronizando desde 0 as receba.
+    Task = apps.get_model('tasklist', 'Task')
+    ChangeSequence = apps.get_model('tasklist', 'ChangeSequence')
+
+    owner_ids = Task.objects.values_list('owner_id', flat=True).distinct()
+    for owner_id in owner_ids.iterator():
+        tasks = list(Task.objects.filter(owner_id=owner_id).order_by('id').only('id'))
+        for seq, task in enumerate(tasks, start=1):
+            task.change_seq = seq
+        Task.objects.bulk_update(tasks, ['change_seq'], batch_size=500)
+        ChangeSequence.objects.update_or_create(user_id=owner_id, defaults={'value': len(tasks)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('tasklist', '0002_task'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='change_sequence', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('value', models.BigIntegerField(default=0)),
+                ('horizon', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='change_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'change_seq'], name='task_owner_seq_idx'),
+        ),
+        migrations.AddField(
+            model_name='tasktombstone',
+            name='owner',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['owner', 'change_seq'], name='tombstone_owner_seq_idx'),
+        ),
+        migrations.RunPython(backfill_change_seq, migrations.RunPython.noop),
+    ]
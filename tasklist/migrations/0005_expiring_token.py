@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def copy_drf_tokens(apps, schema_editor):
+    # Sessões existentes continuam válidas por um AUTH_TOKEN_TTL a partir daqui
+    Token = apps.get_model('authtoken', 'Token')
+    ExpiringToken = apps.get_model('tasklist', 'ExpiringToken')
+
+    expires_at = timezone.now() + settings.AUTH_TOKEN_TTL
+    ExpiringToken.objects.bulk_create(
+        (ExpiringToken(key=token.key, user_id=token.user_id, expires_at=expires_at)
+         for token in Token.objects.all().iterator()),
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authtoken', '0003_tokenproxy'),
+        ('tasklist', '0004_email_outbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiringToken',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('last_seen_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='api_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'api_tokens',
+            },
+        ),
+        migrations.RunPython(copy_drf_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasklist', '0005_expiring_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsernameCounter',
+            fields=[
+                ('prefix', models.CharField(max_length=150, primary_key=True, serialize=False)),
+                ('last_suffix', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
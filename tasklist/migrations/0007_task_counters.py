@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_counters(apps, schema_editor):
+    Task = apps.get_model('tasklist', 'Task')
+    TaskCounters = apps.get_model('tasklist', 'TaskCounters')
+
+    counts = Task.objects.values('owner_id').annotate(
+        total=Count('id'), completed=Count('id', filter=Q(completed=True)),
+    ).order_by()
+    TaskCounters.objects.bulk_create(
+        (TaskCounters(user_id=row['owner_id'], total=row['total'], completed=row['completed']) for row in counts),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('tasklist', '0006_username_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounters',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    # Conteúdo externo: o índice não duplica os textos, lê de tasklist_task
+    """
+    CREATE VIRTUAL TABLE tasklist_task_fts USING fts5(
+        title, description, owner_id,
+        content='tasklist_task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER tasklist_task_fts_ai AFTER INSERT ON tasklist_task BEGIN
+        INSERT INTO tasklist_task_fts(rowid, title, description, owner_id)
+        VALUES (new.id, new.title, new.description, new.owner_id);
+    END
+    """,
+    """
+    CREATE TRIGGER tasklist_task_fts_ad AFTER DELETE ON tasklist_task BEGIN
+        INSERT INTO tasklist_task_fts(tasklist_task_fts, rowid, title, description, owner_id)
+        VALUES ('delete', old.id, old.title, old.description, old.owner_id);
+    END
+    """,
+    # Só reindexa quando o texto muda (toggle/prioridade não disparam)
+    """
+    CREATE TRIGGER tasklist_task_fts_au AFTER UPDATE OF title, description, owner_id ON tasklist_task BEGIN
+        INSERT INTO tasklist_task_fts(tasklist_task_fts, rowid, title, description, owner_id)
+        VALUES ('delete', old.id, old.title, old.description, old.owner_id);
+        INSERT INTO tasklist_task_fts(rowid, title, description, owner_id)
+        VALUES (new.id, new.title, new.description, new.owner_id);
+    END
+    """,
+    "INSERT INTO tasklist_task_fts(tasklist_task_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS tasklist_task_fts_au',
+    'DROP TRIGGER IF EXISTS tasklist_task_fts_ad',
+    'DROP TRIGGER IF EXISTS tasklist_task_fts_ai',
+    'DROP TABLE IF EXISTS tasklist_task_fts',
+]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX task_search_idx ON tasklist_task USING GIN ((
+        setweight(to_tsvector('portuguese', title), 'A') ||
+        setweight(to_tsvector('portuguese', description), 'B')
+    ))
+    """,
+]
+
+POSTGRES_BACKWARD = ['DROP INDEX IF EXISTS task_search_idx']
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasklist', '0007_task_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
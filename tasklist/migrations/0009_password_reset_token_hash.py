@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+def discard_plain_tokens(apps, schema_editor):
+    # Tokens antigos guardavam o valor em claro e nunca foram usados pelas views
+    apps.get_model('tasklist', 'PasswordResetToken').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasklist', '0008_task_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(discard_plain_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='passwordresettoken',
+            name='token',
+        ),
+        migrations.RemoveField(
+            model_name='passwordresettoken',
+            name='used',
+        ),
+        migrations.AddField(
+            model_name='passwordresettoken',
+            name='token_hash',
+            field=models.CharField(default='', max_length=64, unique=True),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='passwordresettoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Índice funcional em LOWER(email) de auth_user: a busca de usuários por
+    email sem diferenciar maiúsculas (tasklist.models.users_by_email) deixa
+    de varrer a tabela. A mesma sintaxe vale para SQLite e PostgreSQL.
+    """
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('tasklist', '0009_password_reset_token_hash'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX auth_user_email_lower_idx ON auth_user (LOWER(email))',
+            'DROP INDEX IF EXISTS auth_user_email_lower_idx',
+        ),
+    ]
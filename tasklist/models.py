@@ -1,23 +1,194 @@
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 from django.utils import timezone
-from datetime import timedelta
-import uuid
+from django.conf import settings
+import binascii
+import hashlib
+import os
+import secrets
+
+def users_by_email(email):
+    """
+    Usuários com o email, sem diferenciar maiúsculas. Compara LOWER(email)
+    com LOWER(valor), o que usa o índice auth_user_email_lower_idx
+    (migração 0010); email__iexact varreria a tabela.
+    """
+    return User.objects.alias(email_lower=Lower('email')).filter(email_lower=Lower(Value(email.strip())))
+
 
 class PasswordResetToken(models.Model):
+    """
+    Token de redefinição de senha. Só o SHA-256 do valor enviado por email
+    é gravado, e a busca é pelo índice único desse hash: validar custa uma
+    consulta, qualquer que seja o número de usuários.
+    """
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    token = models.UUIDField(default=uuid.uuid4, unique=True)
+    token_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    @staticmethod
+    def hash_key(key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def issue(cls, user):
+        """Cria um token para o usuário; retorna o valor em claro (só existe no email)"""
+        key = secrets.token_urlsafe(32)
+        cls.objects.create(
+            user=user, token_hash=cls.hash_key(key), expires_at=timezone.now() + settings.PASSWORD_RESET_TOKEN_TTL,
+        )
+        return key
+
+    @classmethod
+    def find(cls, key):
+        """Token válido (não expirado, usuário ativo) com o usuário, numa consulta; ou None"""
+        if not key or not isinstance(key, str):
+            return None
+        return cls.objects.select_related('user').filter(
+            token_hash=cls.hash_key(key), expires_at__gt=timezone.now(), user__is_active=True,
+        ).first()
+
+    def consume(self):
+        """
+        Invalida este token e os demais do usuário. Retorna False se outra
+        requisição já o consumiu: o DELETE condicional decide a corrida.
+        """
+        deleted, _ = PasswordResetToken.objects.filter(pk=self.pk).delete()
+        if not deleted:
+            return False
+        PasswordResetToken.objects.filter(user_id=self.user_id).delete()
+        return True
+
+    class Meta:
+        db_table = 'password_reset_tokens'
+
+class Task(models.Model):
+    PRIORITY_CHOICES = [
+        ('low', 'Baixa'),
+        ('medium', 'Média'),
+        ('high', 'Alta'),
+    ]
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks')
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True, default='')
+    priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium')
+    due_date = models.DateField(null=True, blank=True)
+    completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField()
-    used = models.BooleanField(default=False)
-    
+    updated_at = models.DateTimeField(auto_now=True)
+    # Posição na sequência de alterações do dono (ver ChangeSequence)
+    change_seq = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            # Filtros do TaskList (pendentes/concluídas por vencimento)
+            models.Index(fields=['owner', 'completed', 'due_date'], name='task_owner_done_due_idx'),
+            models.Index(fields=['owner', 'priority'], name='task_owner_priority_idx'),
+            models.Index(fields=['owner', 'change_seq'], name='task_owner_seq_idx'),
+        ]
+
+
+class ChangeSequence(models.Model):
+    """Contador monotônico de alterações por usuário, usado como cursor de sync"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='change_sequence')
+    value = models.BigIntegerField(default=0)
+    # Maior sequência de tombstone já expurgada; cursores abaixo dela exigem resync completo
+    horizon = models.BigIntegerField(default=0)
+
+
+class TaskCounters(models.Model):
+    """Contagens de tarefas por usuário, mantidas nas mesmas transações das escritas"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='task_counters')
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+    @property
+    def pending(self):
+        return self.total - self.completed
+
+
+class TaskTombstone(models.Model):
+    """Registro compacto de exclusão para clientes que sincronizam por delta"""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', db_index=False)
+    task_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'change_seq'], name='tombstone_owner_seq_idx'),
+        ]
+
+
+class EmailOutbox(models.Model):
+    """Fila persistente de emails, drenada pelo comando send_outbox"""
+    STATUS_CHOICES = [
+        ('pending', 'Pendente'),
+        ('sent', 'Enviado'),
+        ('failed', 'Falhou'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    to = models.EmailField()
+    # Renderizado pelo worker; sem template, `body` é enviado como texto puro
+    template = models.CharField(max_length=200, blank=True)
+    context = models.JSONField(default=dict, blank=True)
+    body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # Identifica o worker que reservou o item até next_attempt_at
+    claim = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+
+class ExpiringToken(models.Model):
+    """Token de API com validade; um por login/dispositivo"""
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='api_tokens')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    # Atualizado no máximo a cada AUTH_TOKEN_LAST_SEEN_INTERVAL segundos
+    last_seen_at = models.DateTimeField(null=True, blank=True)
+
     def save(self, *args, **kwargs):
+        if not self.key:
+            self.key = self.generate_key()
         if not self.expires_at:
-            self.expires_at = timezone.now() + timedelta(hours=1)
+            self.expires_at = timezone.now() + settings.AUTH_TOKEN_TTL
         super().save(*args, **kwargs)
-    
-    def is_valid(self):
-        return not self.used and self.expires_at > timezone.now()
-    
+
+    @classmethod
+    def generate_key(cls):
+        return binascii.hexlify(os.urandom(20)).decode()
+
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+    def __str__(self):
+        return self.key
+
     class Meta:
-        db_table = 'password_reset_tokens'
\ No newline at end of file
+        db_table = 'api_tokens'
+
+
+class UsernameCounter(models.Model):
+    """Último sufixo numérico usado por prefixo de username (ana, ana1, ana2...)"""
+    prefix = models.CharField(max_length=150, primary_key=True)
+    last_suffix = models.PositiveBigIntegerField(default=0)
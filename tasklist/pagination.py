@@ -0,0 +1,135 @@
+import base64
+import json
+from datetime import date
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) sobre (campo de ordenação, id).
+
+    Cada página filtra a partir da última linha da anterior em vez de usar
+    OFFSET, então a página N custa o mesmo que a página 1.
+    """
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+
+    # ordering público -> campo do model (None = apenas id decrescente)
+    orderings = {
+        '-id': None,
+        'due_date': 'due_date',
+    }
+    default_ordering = '-id'
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw is None:
+            return self.page_size
+        try:
+            size = int(raw)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: 'Valor inválido.'})
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param, self.default_ordering)
+        if ordering not in self.orderings:
+            raise ValidationError({self.ordering_query_param: 'Ordenação inválida.'})
+        return ordering
+
+    def cursor_fields(self, request):
+        """Campos que precisam ser carregados para montar o próximo cursor"""
+        field = self.orderings[self.get_ordering(request)]
+        return ['id'] if field is None else ['id', field]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        """Versão assíncrona (views ASGI): a página é lida com o ORM async"""
+        return self.finish_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """Queryset ordenado e filtrado pelo cursor, limitado a page_size + 1 linhas"""
+        self.page_size_value = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+        field = self.orderings[self.ordering]
+
+        if field is None:
+            queryset = queryset.order_by('-id')
+        else:
+            # NULLs primeiro em qualquer banco para o cursor ser determinístico
+            queryset = queryset.order_by(F(field).asc(nulls_first=True), 'id')
+
+        cursor = self.decode_cursor(request, field)
+        if cursor is not None:
+            queryset = queryset.filter(self.after(field, cursor))
+
+        return queryset[:self.page_size_value + 1]
+
+    def finish_page(self, rows):
+        field = self.orderings[self.ordering]
+        self.has_next = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        self.next_cursor = self.encode_cursor(field, rows[-1]) if self.has_next else None
+        return rows
+
+    def after(self, field, cursor):
+        last_id = cursor['id']
+        if field is None:
+            return Q(id__lt=last_id)
+
+        value = cursor['v']
+        if value is None:
+            return (Q(**{f'{field}__isnull': True}, id__gt=last_id) |
+                    Q(**{f'{field}__isnull': False}))
+        return Q(**{f'{field}__gt': value}) | Q(**{field: value}, id__gt=last_id)
+
+    def encode_cursor(self, field, row):
+        get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+        payload = {'id': get('id')}
+        if field is not None:
+            value = get(field)
+            payload['v'] = value.isoformat() if isinstance(value, date) else value
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, request, field=None):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            cursor = json.loads(raw)
+            cursor['id'] = int(cursor['id'])
+            if field is not None:
+                # Os campos de ordenação são datas; None marca a faixa dos NULLs
+                value = cursor['v']
+                if value is not None:
+                    cursor['v'] = parse_date(value)
+                    if cursor['v'] is None:
+                        raise ValueError(value)
+        except (ValueError, TypeError, KeyError):
+            raise ValidationError({self.cursor_query_param: 'Cursor inválido.'})
+        return cursor
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.next_cursor,
+            'results': data,
+        })
+
+
+class UserPagination(KeysetPagination):
+    """Usuários mais recentes primeiro; sem ordenações por campos de tarefa"""
+    orderings = {
+        '-id': None,
+    }
@@ -0,0 +1,199 @@
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+
+# Limites superiores (ms) dos buckets; o último bucket recebe o resto
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+# Timer da requisição corrente (PerformanceMiddleware). Sob ASGI as consultas e
+# a serialização rodam em threads do sync_to_async, que herdam o contexto (e não
+# as conexões) do event loop.
+current_timer = ContextVar('perf_request_timer', default=None)
+
+
+@contextmanager
+def timed_serialization():
+    """Soma o trecho ao tempo de serialização da requisição corrente, se houver uma"""
+    timer = current_timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.serialize_seconds += time.perf_counter() - start
+
+
+class Histogram:
+    """Histograma de latências em buckets fixos, somável entre processos"""
+
+    def __init__(self, counts=None, total=0.0, maximum=0.0):
+        self.counts = counts or [0] * (len(BUCKETS_MS) + 1)
+        self.total = total
+        self.maximum = maximum
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def record(self, value):
+        self.counts[bisect_left(BUCKETS_MS, value)] += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+
+    def percentile(self, p):
+        """Limite superior do bucket que contém o percentil `p` (0-100)"""
+        count = self.count
+        if not count:
+            return 0.0
+        threshold = count * p / 100
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= threshold:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.maximum
+        return self.maximum
+
+    def to_dict(self):
+        return {'counts': self.counts, 'total': self.total, 'maximum': self.maximum}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(list(data['counts']), data['total'], data['maximum'])
+
+
+class EndpointStats:
+    PHASES = ('total', 'db', 'serialize', 'render')
+
+    def __init__(self):
+        self.histograms = {phase: Histogram() for phase in self.PHASES}
+        self.requests = 0
+        self.queries = 0
+        self.bytes = 0
+
+    def merge(self, other):
+        for phase in self.PHASES:
+            self.histograms[phase].merge(other.histograms[phase])
+        self.requests += other.requests
+        self.queries += other.queries
+        self.bytes += other.bytes
+
+    def to_dict(self):
+        return {
+            'histograms': {phase: h.to_dict() for phase, h in self.histograms.items()},
+            'requests': self.requests,
+            'queries': self.queries,
+            'bytes': self.bytes,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        # Snapshots de versões anteriores podem não ter todas as fases
+        stats.histograms.update({phase: Histogram.from_dict(h) for phase, h in data['histograms'].items()})
+        stats.requests = data['requests']
+        stats.queries = data['queries']
+        stats.bytes = data['bytes']
+        return stats
+
+
+class Registry:
+    """
+    Métricas em memória do processo, gravadas periodicamente em
+    PERF_STATS_DIR/<pid>.json (se configurado) para o comando perfstats agregar.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.counters = {}
+        self.last_flush = time.monotonic()
+
+    def record(self, endpoint, total_ms, db_ms, serialize_ms, render_ms, queries, size):
+        with self.lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats()
+            stats.histograms['total'].record(total_ms)
+            stats.histograms['db'].record(db_ms)
+            stats.histograms['serialize'].record(serialize_ms)
+            stats.histograms['render'].record(render_ms)
+            stats.requests += 1
+            stats.queries += queries
+            stats.bytes += size
+        self.maybe_flush()
+
+    def incr(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'pid': os.getpid(),
+                'endpoints': {name: stats.to_dict() for name, stats in self.endpoints.items()},
+                'counters': dict(self.counters),
+            }
+
+    def maybe_flush(self):
+        if settings.PERF_STATS_DIR and time.monotonic() - self.last_flush >= settings.PERF_STATS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not settings.PERF_STATS_DIR:
+            return
+        directory = Path(settings.PERF_STATS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.snapshot()))
+        tmp.replace(path)
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+            self.counters.clear()
+
+
+registry = Registry()
+
+
+@atexit.register
+def _flush_on_exit():
+    if registry.endpoints or registry.counters:
+        try:
+            registry.flush()
+        except Exception:
+            pass
+
+
+def load_snapshots(directory=None):
+    """Soma os snapshots de todos os processos em (endpoints, counters)"""
+    endpoints, counters = {}, {}
+    for path in sorted(Path(directory or settings.PERF_STATS_DIR).glob('*.json')):
+        data = json.loads(path.read_text())
+        for name, raw in data['endpoints'].items():
+            stats = EndpointStats.from_dict(raw)
+            if name in endpoints:
+                endpoints[name].merge(stats)
+            else:
+                endpoints[name] = stats
+        for name, value in data['counters'].items():
+            counters[name] = counters.get(name, 0) + value
+    return endpoints, counters
@@ -0,0 +1,62 @@
+"""
+Renderers alternativos ao JSONRenderer do DRF.
+
+ORJSONRenderer produz o mesmo JSON byte a byte, serializado pelo orjson
+(`pip install orjson`); é ativado com JSON_RENDERER=orjson. O
+MessagePackRenderer (`pip install msgpack`) responde a clientes que enviam
+`Accept: application/msgpack` e fica disponível só com a biblioteca instalada.
+
+Tipos que as bibliotecas não conhecem (datas, Decimal, textos lazy) passam
+pelo mesmo encoder do DRF, então o conteúdo é igual ao do JSON padrão.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError('orjson não está instalado: pip install orjson')
+        self.default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        # Datas pelo encoder do DRF, que usa um formato diferente do nativo do orjson
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=self.default, option=option)
+
+        # Mesmo escape do JSONRenderer para U+2028/U+2029 (JSON embutido em JS)
+        if b'\xe2\x80' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError('msgpack não está instalado: pip install msgpack')
+        self.default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.default, use_bin_type=True)
@@ -0,0 +1,84 @@
+"""
+Cache das respostas por usuário (páginas da lista de tarefas, estatísticas).
+
+A chave inclui a versão do usuário (ChangeSequence.value), então qualquer
+escrita de tarefa torna as entradas antigas inalcançáveis em O(1), sem
+varredura; elas saem pelo LRU. O nível local é limitado em entradas e em
+bytes; o nível compartilhado (opcional) é um alias de CACHES. Acertos e
+faltas aparecem em `manage.py perfstats` (response_cache.<escopo>.hit/miss).
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from .etags import query_digest, request_version
+from .lru import LRUCache
+from .perf import registry
+
+
+def estimate_size(value):
+    # Chaves e valores como texto, mais aspas e separadores
+    if isinstance(value, dict):
+        return sum(len(str(key)) + estimate_size(item) + 4 for key, item in value.items()) + 2
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) + 1 for item in value) + 2
+    return len(str(value)) + 2
+
+
+class ResponseCache:
+    def __init__(self):
+        options = settings.TASK_RESPONSE_CACHE
+        self.local = LRUCache(max_size=options['MAX_ENTRIES'], ttl=options['TTL'], max_bytes=options['MAX_BYTES'])
+        self.ttl = options['TTL']
+        self.shared_alias = options.get('SHARED_CACHE')
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    def key(self, request, scope):
+        return f'resp:{scope}:{request.user.pk}:{request_version(request)}:{query_digest(request, scope)}'
+
+    def get(self, key):
+        data = self.local.get(key)
+        if data is None and self.shared is not None:
+            data = self.shared.get(key)
+            if data is not None:
+                self.local.set(key, data, self.size_of(data))
+        return data
+
+    def set(self, key, data):
+        self.local.set(key, data, self.size_of(data))
+        if self.shared is not None:
+            self.shared.set(key, data, self.ttl)
+
+    def size_of(self, data):
+        """
+        Tamanho aproximado do corpo JSON, usado só para o limite em bytes:
+        numa página, a primeira linha estimada vezes o número de linhas, sem
+        serializar a página de novo.
+        """
+        rows = data.get('results') if isinstance(data, dict) else None
+        if not rows:
+            return estimate_size(data)
+        rest = {key: value for key, value in data.items() if key != 'results'}
+        return estimate_size(rows[0]) * len(rows) + estimate_size(rest)
+
+    def clear(self):
+        self.local.clear()
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(request, scope, compute):
+    """Devolve os dados em cache para (usuário, versão, query) ou calcula e guarda"""
+    key = response_cache.key(request, scope)
+    data = response_cache.get(key)
+    if data is not None:
+        registry.incr(f'response_cache.{scope}.hit')
+        return data
+
+    registry.incr(f'response_cache.{scope}.miss')
+    data = compute()
+    response_cache.set(key, data)
+    return data
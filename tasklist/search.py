@@ -0,0 +1,94 @@
+"""
+Busca textual nas tarefas do usuário (título e descrição).
+
+No SQLite usa a tabela FTS5 tasklist_task_fts (conteúdo externo apontando
+para tasklist_task, mantida por triggers); no PostgreSQL, um índice GIN
+sobre o tsvector de título e descrição. Ambos criados pela migração 0008.
+Cada termo casa por prefixo (busca enquanto o usuário digita) e os
+resultados saem ordenados por relevância, com o título pesando mais.
+"""
+import re
+from importlib import import_module
+
+from django.db import connection, connections
+from django.db.models import Q
+
+from .models import Task
+
+MAX_TERMS = 8
+
+# Mesma expressão do índice GIN da migração 0008 (precisa ser idêntica)
+PG_DOCUMENT = (
+    "setweight(to_tsvector('portuguese', title), 'A') || "
+    "setweight(to_tsvector('portuguese', description), 'B')"
+)
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+# Trigger que o `seed` desliga durante a carga (tasklist.management.commands.seed)
+FTS_INSERT_TRIGGER = 'tasklist_task_fts_ai'
+
+
+def restore_fts_insert_trigger(using='default'):
+    """
+    Recria o trigger de INSERT do FTS5 se ele sumiu (ex.: um `seed` morto
+    entre o DROP e a recriação) e reconstrói o índice, que perdeu as tarefas
+    inseridas nesse meio tempo. Retorna True se precisou recriar.
+    Roda no fim de todo `migrate`; sem a tabela FTS5 não faz nada.
+    """
+    db = connections[using]
+    if db.vendor != 'sqlite':
+        return False
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN ('tasklist_task_fts', %s)", [FTS_INSERT_TRIGGER],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if existing != {'tasklist_task_fts'}:
+            return False
+        # Mesma definição da migração que criou o índice
+        migration = import_module('tasklist.migrations.0008_task_search')
+        cursor.execute(migration.SQLITE_FORWARD[1])
+        cursor.execute("INSERT INTO tasklist_task_fts(tasklist_task_fts) VALUES ('rebuild')")
+    return True
+
+
+def search_terms(query):
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def fts5_query(user, terms):
+    # Termos entre aspas (sem sintaxe do FTS5), restritos ao texto: owner_id também
+    # é coluna indexada e um termo numérico casaria com o dono. O dono filtra à parte.
+    words = ' AND '.join(f'"{term}"*' for term in terms)
+    return f'owner_id:"{user.pk}" AND {{title description}}: ({words})'
+
+
+def search_tasks(user, query, limit=20):
+    """Tarefas do usuário que casam com `query`, das mais relevantes para as menos"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'sqlite':
+        return list(Task.objects.raw(
+            'SELECT t.* FROM tasklist_task_fts f JOIN tasklist_task t ON t.id = f.rowid '
+            'WHERE tasklist_task_fts MATCH %s AND t.owner_id = %s '
+            'ORDER BY bm25(tasklist_task_fts, 10.0, 1.0, 0.0), t.id DESC LIMIT %s',
+            [fts5_query(user, terms), user.pk, limit],
+        ))
+
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return list(Task.objects.raw(
+            f'SELECT * FROM tasklist_task '
+            f"WHERE owner_id = %s AND ({PG_DOCUMENT}) @@ to_tsquery('portuguese', %s) "
+            f"ORDER BY ts_rank({PG_DOCUMENT}, to_tsquery('portuguese', %s)) DESC, id DESC LIMIT %s",
+            [user.pk, tsquery, tsquery, limit],
+        ))
+
+    # Outros bancos: sem índice textual, varre só as tarefas do usuário
+    queryset = Task.objects.filter(owner=user)
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    return list(queryset.order_by('-id')[:limit])
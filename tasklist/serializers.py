@@ -0,0 +1,110 @@
+import functools
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from .models import Task
+from .perf import timed_serialization
+
+
+class TimedDataMixin:
+    """`.data` entra no tempo de serialização da requisição (Server-Timing: serialize)"""
+
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
+
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
+
+
+class TaskSerializer(TimedDataMixin, serializers.ModelSerializer):
+    """Serializer de tarefas com projeção opcional de campos (?fields=)"""
+
+    class Meta:
+        model = Task
+        fields = ('id', 'title', 'description', 'priority', 'due_date',
+                  'completed', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'created_at', 'updated_at')
+        list_serializer_class = TimedListSerializer
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def validate_title(self, value):
+        value = value.strip()
+        if not value:
+            raise serializers.ValidationError('O título é obrigatório.')
+        return value
+
+
+class UserSerializer(TimedDataMixin, serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'email', 'first_name', 'last_name')
+        read_only_fields = fields
+        list_serializer_class = TimedListSerializer
+
+
+# Campos cuja representação é o próprio valor lido do banco
+IDENTITY_FIELDS = (serializers.BooleanField, serializers.CharField, serializers.ChoiceField, serializers.IntegerField)
+
+
+class RowSerializer:
+    """
+    Saída de um ModelSerializer, só leitura, compilada uma única vez.
+
+    Os campos do serializer são resolvidos na criação em (nome, coluna,
+    conversão); serializar uma linha é só ler as colunas e aplicar a
+    conversão (datas) quando o valor não é None. Aceita dicts de
+    `.values(*row_serializer.columns)`, sem instanciar models, ou objetos.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class(fields=list(fields)) if fields is not None else serializer_class()
+        self.accessors = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or isinstance(field, (serializers.BaseSerializer, serializers.RelatedField,
+                                                           serializers.SerializerMethodField)):
+                raise ImproperlyConfigured(f'{serializer_class.__name__}.{name} não é uma coluna simples')
+            convert = None if isinstance(field, IDENTITY_FIELDS) else field.to_representation
+            self.accessors.append((name, '__'.join(field.source_attrs), convert))
+        self.columns = [column for _, column, _ in self.accessors]
+
+    def to_representation(self, row):
+        get = row.__getitem__ if isinstance(row, dict) else functools.partial(getattr, row)
+        data = {}
+        for name, column, convert in self.accessors:
+            value = get(column)
+            data[name] = value if convert is None or value is None else convert(value)
+        return data
+
+    def serialize(self, rows):
+        with timed_serialization():
+            return [self.to_representation(row) for row in rows]
+
+    @property
+    def names(self):
+        return [name for name, _, _ in self.accessors]
+
+    def to_values(self, row):
+        """Representações de uma tupla de `.values_list(*columns)`, na ordem dos campos"""
+        return [
+            value if convert is None or value is None else convert(value)
+            for (_, _, convert), value in zip(self.accessors, row)
+        ]
+
+
+@functools.lru_cache(maxsize=64)
+def row_serializer(serializer_class, fields=None):
+    """RowSerializer compartilhado por (serializer, campos); `fields` é uma tupla"""
+    return RowSerializer(serializer_class, fields)
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .authentication import token_cache
+from .availability import taken_index
+from .middleware import install_query_timer
+from .models import ExpiringToken
+from .search import restore_fts_insert_trigger
+
+@receiver(connection_created)
+def time_queries(sender, connection, **kwargs):
+    # Toda conexão, de qualquer thread, soma no timer da requisição (PerformanceMiddleware)
+    install_query_timer(connection)
+
+
+@receiver(post_migrate)
+def repair_search_index(sender, app_config, using, **kwargs):
+    # `migrate` é o caminho de recuperação se um `seed` interrompido deixou o trigger de fora
+    if app_config.label == 'tasklist':
+        restore_fts_insert_trigger(using)
+
+
+@receiver(post_delete, sender=ExpiringToken)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key, user_id=instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance, created, update_fields=None, **kwargs):
+    # Desativação, troca de senha ou dados do perfil: descarta o usuário em cache.
+    # Só last_login (gravado a cada login de sessão) não afeta a autenticação.
+    if not created and update_fields != frozenset({'last_login'}):
+        keys = ExpiringToken.objects.filter(user=instance).values_list('key', flat=True)
+        token_cache.invalidate(*keys, user_id=instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def index_taken_username(sender, instance, update_fields=None, **kwargs):
+    # Novo usuário ou username/email alterado: passa a constar como em uso
+    if update_fields is None or {'username', 'email'} & set(update_fields):
+        taken_index.add(instance.username, instance.email)
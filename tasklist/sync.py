@@ -0,0 +1,76 @@
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
+
+from .models import ChangeSequence, Task, TaskTombstone
+from .batching import delete_in_batches
+
+
+class CursorExpired(Exception):
+    """O cursor do cliente é anterior às tombstones ainda retidas"""
+
+
+def allocate(user, count=1):
+    """
+    Reserva `count` sequências consecutivas do usuário e retorna a primeira.
+
+    Deve ser chamada dentro de transaction.atomic(): o UPDATE trava a linha
+    do contador até o commit, então as transações de um mesmo usuário
+    ficam visíveis na ordem das sequências que receberam.
+    """
+    counter = ChangeSequence.objects.filter(user=user)
+    if not counter.update(value=F('value') + count):
+        _, created = ChangeSequence.objects.get_or_create(user=user, defaults={'value': count})
+        if created:
+            return 1
+        counter.update(value=F('value') + count)
+    return counter.values_list('value', flat=True).get() - count + 1
+
+
+def current_version(user):
+    """Valor atual do contador do usuário (0 antes da primeira alteração)"""
+    return ChangeSequence.objects.filter(user=user).values_list('value', flat=True).first() or 0
+
+
+def changes_since(user, since, limit):
+    """
+    Retorna (tarefas alteradas, ids excluídos, cursor, has_more) após `since`.
+
+    Tarefas e tombstones são lidas pelos índices (owner, change_seq) e
+    intercaladas pela sequência, devolvendo no máximo `limit` alterações.
+    """
+    if since > 0:
+        horizon = ChangeSequence.objects.filter(user=user).values_list('horizon', flat=True).first() or 0
+        if since < horizon:
+            raise CursorExpired()
+
+    tasks = list(
+        Task.objects.filter(owner=user, change_seq__gt=since).order_by('change_seq')[:limit + 1]
+    )
+    tombstones = list(
+        TaskTombstone.objects.filter(owner=user, change_seq__gt=since)
+        .order_by('change_seq').values_list('change_seq', 'task_id')[:limit + 1]
+    )
+
+    merged = sorted(
+        [(task.change_seq, task) for task in tasks] + [(seq, task_id) for seq, task_id in tombstones],
+        key=lambda item: item[0],
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    changed = [item for _, item in merged if isinstance(item, Task)]
+    deleted = [item for _, item in merged if not isinstance(item, Task)]
+    cursor = merged[-1][0] if merged else since
+    return changed, deleted, cursor, has_more
+
+
+def prune_tombstones(before, batch_size=1000, pause=0):
+    """Remove tombstones anteriores a `before`, avançando o horizonte de cada usuário"""
+    expired = TaskTombstone.objects.filter(deleted_at__lt=before)
+
+    with transaction.atomic():
+        for owner_id, max_seq in expired.values_list('owner').annotate(max_seq=Max('change_seq')).order_by():
+            ChangeSequence.objects.filter(user_id=owner_id).update(horizon=Greatest('horizon', max_seq))
+
+    return delete_in_batches(expired, batch_size=batch_size, pause=pause)
@@ -1,3 +1,1379 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib.util import find_spec
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models.signals import post_migrate, post_save
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from taskmanagement.routers import ReadReplicaRouter
+
+from .authentication import TokenCache, recently_seen, token_cache
+from .availability import TakenIndex, email_taken, taken_index, username_taken
+from .bloom import BloomFilter
+from .counters import count_tasks
+from .loadtest import run_load, run_mix, serve
+from .lru import LRUCache
+from .mail import OutboxWorker, enqueue_email
+from .management.commands import loadbench
+from .middleware import RequestTimer
+from .models import (
+    ChangeSequence, EmailOutbox, ExpiringToken, PasswordResetToken, Task, TaskCounters, TaskTombstone, users_by_email,
+)
+from .perf import current_timer, registry
+from .renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+from .response_cache import response_cache
+from .search import FTS_INSERT_TRIGGER, restore_fts_insert_trigger, search_tasks
+from .serializers import RowSerializer, TaskSerializer, UserSerializer, row_serializer
+from .signals import index_taken_username
+from .throttling import reset_store, throttling_disabled
+from .usernames import create_user_with_unique_username, username_base
+
+
+# Custo de hash baixo para os testes não gastarem segundos criando usuários
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class TaskAPITestCase(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        recently_seen.clear()
+        reset_store()
+        taken_index.reset()
+        # Montado aqui, na transação do teste, e não na thread de segundo plano
+        taken_index.build()
+        response_cache.clear()
+        self.user = User.objects.create_user(username='ana', email='ana@exemplo.com', password='senha-forte-123')
+        self.other = User.objects.create_user(username='bruno', email='bruno@exemplo.com', password='senha-forte-123')
+        self.client = APIClient()
+        self.token = ExpiringToken.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+
+class TaskListTests(TaskAPITestCase):
+    def test_create_task(self):
+        response = self.client.post('/api/tasks/create/', {
+            'title': 'Comprar pão', 'priority': 'high', 'due_date': '2025-09-01',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        task = Task.objects.get(pk=response.data['id'])
+        self.assertEqual(task.owner, self.user)
+        self.assertEqual(task.due_date, date(2025, 9, 1))
+
+    def test_create_task_requires_title(self):
+        response = self.client.post('/api/tasks/create/', {'title': '  '}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.data)
+
+    def test_list_is_scoped_to_owner_and_paginated_by_cursor(self):
+        Task.objects.bulk_create(Task(owner=self.user, title=f'T{i}') for i in range(5))
+        Task.objects.create(owner=self.other, title='alheia')
+
+        seen = []
+        url = '/api/tasks/list/?page_size=2'
+        while True:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [task['title'] for task in response.data['results']]
+            if not response.data['next']:
+                break
+            url = f'/api/tasks/list/?page_size=2&cursor={response.data["next"]}'
+
+        self.assertEqual(seen, ['T4', 'T3', 'T2', 'T1', 'T0'])
+
+    def test_due_date_ordering_cursor_handles_nulls(self):
+        for i, due in enumerate([None, date(2025, 1, 2), None, date(2025, 1, 1), date(2025, 1, 2)]):
+            Task.objects.create(owner=self.user, title=f'T{i}', due_date=due)
+
+        seen = []
+        url = '/api/tasks/list/?ordering=due_date&page_size=2'
+        while url:
+            response = self.client.get(url)
+            seen += [task['title'] for task in response.data['results']]
+            cursor = response.data['next']
+            url = cursor and f'/api/tasks/list/?ordering=due_date&page_size=2&cursor={cursor}'
+
+        self.assertEqual(seen, ['T0', 'T2', 'T3', 'T1', 'T4'])
+
+    def test_filters_and_field_projection(self):
+        Task.objects.create(owner=self.user, title='feita', completed=True, priority='low')
+        Task.objects.create(owner=self.user, title='pendente', description='x' * 500, priority='high')
+
+        response = self.client.get('/api/tasks/list/?completed=false&fields=id,title,priority')
+        self.assertEqual(response.data['results'], [
+            {'id': Task.objects.get(title='pendente').id, 'title': 'pendente', 'priority': 'high'},
+        ])
+
+        response = self.client.get('/api/tasks/list/?priority=low')
+        self.assertEqual([t['title'] for t in response.data['results']], ['feita'])
+
+    def test_invalid_parameters_return_400(self):
+        for query in ('fields=senha', 'cursor=@@', 'due_before=ontem', 'ordering=title'):
+            self.assertEqual(self.client.get(f'/api/tasks/list/?{query}').status_code, 400, query)
+
+    def test_impossible_filter_dates_return_400(self):
+        for param in ('due_after', 'due_before'):
+            response = self.client.get('/api/tasks/list/', {param: '2026-02-30'})
+            self.assertEqual(response.status_code, 400, param)
+            self.assertIn(param, response.data)
+
+    def test_malformed_cursor_values_return_400(self):
+        Task.objects.create(owner=self.user, title='t')
+        for payload in ('{"id":1,"v":"xx"}', '{"id":1,"v":5}', '{"id":1,"v":"2030-02-30"}', '{"id":1}', '[1]'):
+            cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+            response = self.client.get(f'/api/tasks/list/?ordering=due_date&cursor={cursor}')
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertIn('cursor', response.data)
+
+    def test_requires_authentication(self):
+        self.assertEqual(APIClient().get('/api/tasks/list/').status_code, 401)
+
+
+class BulkTasksTests(TaskAPITestCase):
+    def test_toggle_parses_completed_as_boolean(self):
+        tasks = [Task.objects.create(owner=self.user, title=f't{i}', completed=True) for i in range(3)]
+        response = self.client.post('/api/tasks/bulk/', {'operations': [
+            {'op': 'toggle', 'id': tasks[0].id, 'completed': 'false'},
+            {'op': 'toggle', 'id': tasks[1].id, 'completed': 0},
+            {'op': 'toggle', 'id': tasks[2].id, 'completed': 'talvez'},
+        ]}, format='json')
+
+        self.assertEqual([r['status'] for r in response.data['results']], ['updated', 'updated', 'error'])
+        self.assertIn('completed', response.data['results'][2]['errors'])
+        self.assertEqual([t.completed for t in Task.objects.order_by('id')], [False, False, True])
+
+    def test_mixed_operations_in_one_request(self):
+        keep = Task.objects.create(owner=self.user, title='manter')
+        done = Task.objects.create(owner=self.user, title='concluir')
+        gone = Task.objects.create(owner=self.user, title='apagar')
+        alien = Task.objects.create(owner=self.other, title='alheia')
+
+        response = self.client.post('/api/tasks/bulk/', {'operations': [
+            {'op': 'create', 'ref': 'tmp-1', 'data': {'title': 'nova', 'priority': 'high'}},
+            {'op': 'update', 'id': keep.id, 'data': {'title': 'mantida', 'due_date': '2025-10-01'}},
+            {'op': 'toggle', 'id': done.id},
+            {'op': 'delete', 'id': gone.id},
+            {'op': 'delete', 'id': alien.id},
+            {'op': 'create', 'data': {'title': ''}},
+            {'op': 'rename'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        statuses = [r['status'] for r in response.data['results']]
+        self.assertEqual(statuses, ['created', 'updated', 'updated', 'deleted', 'not_found', 'error', 'error'])
+
+        created = Task.objects.get(pk=response.data['results'][0]['id'])
+        self.assertEqual((created.title, created.owner, response.data['results'][0]['ref']), ('nova', self.user, 'tmp-1'))
+        keep.refresh_from_db()
+        done.refresh_from_db()
+        self.assertEqual((keep.title, str(keep.due_date)), ('mantida', '2025-10-01'))
+        self.assertTrue(done.completed)
+        self.assertFalse(Task.objects.filter(pk=gone.pk).exists())
+        self.assertTrue(Task.objects.filter(pk=alien.pk).exists())
+
+    def test_large_batch_uses_constant_queries(self):
+        self.client.post('/api/tasks/create/', {'title': 'primeira'}, format='json')
+        operations = [{'op': 'create', 'data': {'title': f'T{i}'}} for i in range(300)]
+        # savepoint + sequência (UPDATE/SELECT) + INSERTs em lotes + contadores + release
+        with self.assertNumQueries(8):
+            response = self.client.post('/api/tasks/bulk/', {'operations': operations}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.filter(owner=self.user).count(), 301)
+
+    def test_rejects_oversized_payload(self):
+        response = self.client.post('/api/tasks/bulk/', {'operations': [{'op': 'delete', 'id': 1}] * 501}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class SyncTests(TaskAPITestCase):
+    def sync(self, since):
+        response = self.client.get(f'/api/tasks/sync/?since={since}')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_returns_only_changes_after_cursor(self):
+        first = self.client.post('/api/tasks/create/', {'title': 'a'}, format='json').data['id']
+        self.client.post('/api/tasks/create/', {'title': 'b'}, format='json')
+
+        data = self.sync(0)
+        self.assertEqual([t['title'] for t in data['changes']], ['a', 'b'])
+        cursor = data['cursor']
+
+        self.assertEqual(self.sync(cursor)['changes'], [])
+
+        self.client.post('/api/tasks/bulk/', {'operations': [
+            {'op': 'toggle', 'id': first},
+            {'op': 'create', 'data': {'title': 'c'}},
+        ]}, format='json')
+        data = self.sync(cursor)
+        self.assertEqual(sorted(t['title'] for t in data['changes']), ['a', 'c'])
+        self.assertEqual(data['deleted'], [])
+
+    def test_deletions_are_reported_as_tombstones(self):
+        task_id = self.client.post('/api/tasks/create/', {'title': 'a'}, format='json').data['id']
+        cursor = self.sync(0)['cursor']
+
+        self.client.post('/api/tasks/bulk/', {'operations': [{'op': 'delete', 'id': task_id}]}, format='json')
+        data = self.sync(cursor)
+        self.assertEqual((data['changes'], data['deleted']), ([], [task_id]))
+
+    def test_limit_and_has_more(self):
+        self.client.post('/api/tasks/bulk/', {'operations': [
+            {'op': 'create', 'data': {'title': f'T{i}'}} for i in range(5)
+        ]}, format='json')
+        response = self.client.get('/api/tasks/sync/?since=0&limit=3')
+        self.assertTrue(response.data['has_more'])
+        response = self.client.get(f'/api/tasks/sync/?since={response.data["cursor"]}&limit=3')
+        self.assertEqual((len(response.data['changes']), response.data['has_more']), (2, False))
+
+    def test_pruned_cursor_requires_full_resync(self):
+        ids = [self.client.post('/api/tasks/create/', {'title': t}, format='json').data['id'] for t in 'ab']
+        cursor = self.sync(0)['cursor']
+        self.client.post('/api/tasks/bulk/', {'operations': [{'op': 'delete', 'id': i} for i in ids]}, format='json')
+
+        call_command('prune_tombstones', days=-1, stdout=StringIO())
+        self.assertFalse(TaskTombstone.objects.exists())
+        response = self.client.get(f'/api/tasks/sync/?since={cursor}')
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(self.sync(0)['changes'], [])
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP indisponível')
+
+
+class EmailOutboxTests(TestCase):
+    def drain(self, backend='django.core.mail.backends.locmem.EmailBackend'):
+        worker = OutboxWorker(workers=2, batch_size=2, backend=backend)
+        try:
+            return worker.drain()
+        finally:
+            worker.close()
+
+    def test_worker_sends_pending_emails(self):
+        for i in range(5):
+            enqueue_email(f'Assunto {i}', f'user{i}@exemplo.com', body='Olá')
+
+        self.assertEqual(self.drain(), (5, 0))
+        self.assertEqual(sorted(m.subject for m in mail.outbox), [f'Assunto {i}' for i in range(5)])
+        self.assertEqual(EmailOutbox.objects.filter(status='sent').count(), 5)
+        self.assertEqual(self.drain(), (0, 0))
+
+    def test_failures_are_retried_with_backoff(self):
+        entry = enqueue_email('Assunto', 'user@exemplo.com', body='Olá')
+
+        self.assertEqual(self.drain('tasklist.tests.FailingEmailBackend'), (0, 1))
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts), ('pending', 1))
+        self.assertGreater(entry.next_attempt_at, timezone.now())
+        self.assertIn('SMTP indisponível', entry.last_error)
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now(), attempts=4)
+        self.drain('tasklist.tests.FailingEmailBackend')
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts), ('failed', 5))
+
+
+class CachedTokenAuthenticationTests(TaskAPITestCase):
+    def test_token_lookup_is_cached(self):
+        self.client.get('/api/tasks/sync/')
+        # Sem o JOIN token/usuário: apenas horizonte, tarefas e tombstones
+        with self.assertNumQueries(2):
+            self.client.get('/api/tasks/sync/')
+
+    def test_deleted_token_is_rejected(self):
+        self.assertEqual(self.client.get('/api/tasks/sync/').status_code, 200)
+        ExpiringToken.objects.filter(user=self.user).delete()
+        self.assertEqual(self.client.get('/api/tasks/sync/').status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api/tasks/sync/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/tasks/sync/').status_code, 401)
+
+    def test_invalidation_reaches_local_entries_of_other_processes(self):
+        options = {'MAX_SIZE': 100, 'TTL': 60, 'SHARED_CACHE': 'default'}
+        with override_settings(TOKEN_AUTH_CACHE=options):
+            here, elsewhere = TokenCache(), TokenCache()
+        cache.clear()
+        here.set(self.token.key, self.user, self.token)
+        # O outro processo passa a ter a entrada no próprio LRU
+        self.assertEqual(elsewhere.get(self.token.key)[0], self.user)
+
+        here.invalidate(self.token.key, user_id=self.user.pk)
+        self.assertIsNone(elsewhere.get(self.token.key))
+        self.assertIsNone(elsewhere.local.get(self.token.key))
+
+        # Entradas gravadas depois da invalidação voltam a valer
+        elsewhere.set(self.token.key, self.user, self.token)
+        self.assertEqual(here.get(self.token.key)[0], self.user)
+
+
+class ExpiringTokenTests(TaskAPITestCase):
+    def test_login_issues_expiring_token(self):
+        response = self.client.post('/api/auth/login/', {'username': 'ana', 'password': 'senha-forte-123'}, format='json')
+        token = ExpiringToken.objects.get(pk=response.data['token'])
+        self.assertEqual(token.user, self.user)
+        self.assertGreater(token.expires_at, timezone.now())
+
+    def test_expired_token_is_rejected_even_when_cached(self):
+        self.assertEqual(self.client.get('/api/tasks/sync/').status_code, 200)
+        later = self.token.expires_at + timedelta(seconds=1)
+        with mock.patch('tasklist.models.timezone.now', return_value=later):
+            self.assertEqual(self.client.get('/api/tasks/sync/').status_code, 401)
+
+    def test_last_seen_is_throttled(self):
+        self.client.get('/api/tasks/sync/')
+        self.assertIsNotNone(ExpiringToken.objects.get(pk=self.token.key).last_seen_at)
+        ExpiringToken.objects.update(last_seen_at=None)
+        self.client.get('/api/tasks/sync/')
+        self.assertIsNone(ExpiringToken.objects.get(pk=self.token.key).last_seen_at)
+
+    def test_refresh_rotates_token(self):
+        response = self.client.post('/api/auth/token/refresh/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/tasks/sync/').status_code, 401)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {response.data["token"]}')
+        self.assertEqual(self.client.get('/api/tasks/sync/').status_code, 200)
+
+    def test_purge_removes_only_expired_tokens(self):
+        for _ in range(3):
+            ExpiringToken.objects.create(user=self.other, expires_at=timezone.now())
+        call_command('purge_tokens', batch_size=2, pause=0, stdout=StringIO())
+        self.assertEqual(list(ExpiringToken.objects.values_list('pk', flat=True)), [self.token.key])
+
+
+class PasswordHasherTests(TaskAPITestCase):
+    def test_login_upgrades_hash_to_configured_cost(self):
+        old = PBKDF2PasswordHasher().encode('senha-forte-123', 'salt1234salt', iterations=2000)
+        User.objects.filter(pk=self.user.pk).update(password=old)
+
+        response = self.client.post('/api/auth/login/', {'username': 'ana', 'password': 'senha-forte-123'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+    def test_legacy_hashes_still_verify_after_profile_change(self):
+        with override_settings(PASSWORD_HASHERS=[
+            'django.contrib.auth.hashers.ScryptPasswordHasher',
+            'tasklist.hashers.TunedPBKDF2PasswordHasher',
+        ]):
+            response = self.client.post('/api/auth/login/', {'username': 'ana', 'password': 'senha-forte-123'}, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('scrypt$'))
+
+    def settings_error(self, **env):
+        """Última linha do stderr ao importar as settings com `env` (vazia se importou)"""
+        result = subprocess.run(
+            [sys.executable, '-c', 'import taskmanagement.settings'],
+            env={**os.environ, **env}, cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        return (result.stderr.strip().splitlines() or [''])[-1]
+
+    def test_invalid_profile_fails_at_startup(self):
+        self.assertIn('ImproperlyConfigured: PASSWORD_HASHER inválido', self.settings_error(PASSWORD_HASHER='bcrypt'))
+        self.assertEqual(self.settings_error(PASSWORD_HASHER='scrypt'), '')
+
+    @skipUnless(find_spec('argon2') is None, 'argon2-cffi instalado')
+    def test_argon2_profile_requires_argon2_cffi(self):
+        self.assertIn('argon2-cffi', self.settings_error(PASSWORD_HASHER='argon2'))
+
+
+class QueryBudgetTests(TaskAPITestCase):
+    """Orçamento de consultas por endpoint: uma regressão aqui falha o teste local"""
+
+    def setUp(self):
+        super().setUp()
+        # Aquece o cache de autenticação e o contador de sequência
+        self.client.post('/api/tasks/create/', {'title': 'aquecimento'}, format='json')
+
+    def test_login(self):
+        # SELECT do usuário + INSERT do token
+        with self.assertNumQueries(2):
+            response = APIClient().post('/api/auth/login/', {'username': 'ana', 'password': 'senha-forte-123'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_login_with_wrong_password(self):
+        with self.assertNumQueries(1):
+            response = APIClient().post('/api/auth/login/', {'username': 'ana', 'password': 'errada'}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_register(self):
+        # Verificação conjunta de username/email + INSERT do usuário + INSERT do token
+        with self.assertNumQueries(3):
+            response = APIClient().post('/api/auth/register/', {
+                'username': 'carla', 'email': 'carla@exemplo.com', 'password': 'senha-forte-123',
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_register_conflict(self):
+        with self.assertNumQueries(1):
+            response = APIClient().post('/api/auth/register/', {
+                'username': 'nova', 'email': 'ana@exemplo.com', 'password': 'senha-forte-123',
+            }, format='json')
+        self.assertEqual(response.data['message'], 'Este email já está cadastrado')
+
+    def test_check_username(self):
+        taken_index.ensure_fresh()
+        # Disponível: respondido pelo Bloom filter, sem consulta
+        with self.assertNumQueries(0):
+            response = APIClient().post('/api/auth/check-username/', {'username': 'livre'}, format='json')
+        self.assertTrue(response.data['available'])
+        # Provável positivo: confirmado no banco
+        with self.assertNumQueries(1):
+            response = APIClient().post('/api/auth/check-username/', {'username': 'ana'}, format='json')
+        self.assertFalse(response.data['available'])
+
+    def test_list_tasks(self):
+        # Versão do usuário (ETag) + a página
+        with self.assertNumQueries(2):
+            self.client.get('/api/tasks/list/?completed=false')
+
+    def test_create_task(self):
+        # savepoint + sequência (UPDATE/SELECT) + INSERT + contadores + release
+        with self.assertNumQueries(6):
+            self.client.post('/api/tasks/create/', {'title': 'nova'}, format='json')
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class UsernameAllocationTests(TestCase):
+    def test_base_is_used_when_free_then_suffixed(self):
+        names = [
+            create_user_with_unique_username('ana', 'senha-forte-123', email=f'ana@dominio{i}.com').username
+            for i in range(3)
+        ]
+        self.assertEqual(names, ['ana', 'ana1', 'ana2'])
+
+    def test_skips_suffix_taken_by_hand(self):
+        User.objects.create_user(username='ana', password='x')
+        User.objects.create_user(username='ana1', password='x')
+        user = create_user_with_unique_username('ana', 'senha-forte-123')
+        self.assertEqual(user.username, 'ana2')
+        self.assertTrue(user.check_password('senha-forte-123'))
+
+    def test_username_base_strips_invalid_characters(self):
+        self.assertEqual(username_base('jo!ão#silva@exemplo.com'), 'joãosilva')
+        self.assertEqual(username_base('!!!@exemplo.com'), 'user')
+
+    def test_register_without_username_derives_it_from_email(self):
+        User.objects.create_user(username='ana', email='ana@outro.com', password='x')
+        response = APIClient().post('/api/auth/register/', {
+            'email': 'ana@exemplo.com', 'password': 'senha-forte-123',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['user']['username'], 'ana1')
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class ConcurrentRegistrationTests(TransactionTestCase):
+    """Cadastros simultâneos com o mesmo prefixo não podem colidir nem falhar"""
+
+    def test_concurrent_registrations_get_distinct_usernames(self):
+        def register(i):
+            try:
+                while True:
+                    try:
+                        return create_user_with_unique_username(
+                            'ana', 'senha-forte-123', email=f'ana@d{i}.com'
+                        ).username
+                    except OperationalError as e:
+                        # O banco de teste em memória (shared cache) recusa com
+                        # "table is locked" em vez de esperar como um arquivo
+                        if 'locked' not in str(e):
+                            raise
+                        time.sleep(0.001)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            names = list(executor.map(register, range(40)))
+
+        self.assertEqual(len(set(names)), 40)
+        self.assertEqual(User.objects.filter(username__startswith='ana').count(), 40)
+
+
+class PerformanceMiddlewareTests(TaskAPITestCase):
+    def test_server_timing_header_reports_queries(self):
+        response = self.client.get('/api/tasks/list/')
+        self.assertRegex(
+            response['Server-Timing'],
+            r'db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+',
+        )
+
+    def test_serializer_work_is_timed_separately_from_rendering(self):
+        Task.objects.bulk_create(Task(owner=self.user, title=f'Tarefa {i}') for i in range(10))
+        timer = RequestTimer()
+        token = current_timer.set(timer)
+        try:
+            TaskSerializer(Task.objects.all(), many=True).data
+            serialized = timer.serialize_seconds
+            self.assertGreater(serialized, 0)
+            row_serializer(TaskSerializer).serialize(Task.objects.values(*row_serializer(TaskSerializer).columns))
+            self.assertGreater(timer.serialize_seconds, serialized)
+        finally:
+            current_timer.reset(token)
+
+    async def test_queries_are_counted_under_asgi(self):
+        # As consultas rodam em threads do sync_to_async, não na do event loop
+        client = AsyncClient(AUTHORIZATION=f'Token {self.token.key}')
+        for path in ('/api/async/tasks/list/', '/api/tasks/list/'):
+            response = await client.get(path)
+            self.assertEqual(response.status_code, 200, path)
+            queries = int(re.search(r'desc="(\d+) queries"', response['Server-Timing']).group(1))
+            self.assertGreater(queries, 0, path)
+
+    def test_perfstats_aggregates_flushed_snapshots(self):
+        registry.reset()
+        for _ in range(3):
+            self.client.get('/api/tasks/list/')
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(PERF_STATS_DIR=directory):
+            registry.flush()
+            out = StringIO()
+            call_command('perfstats', '--json', stdout=out)
+
+        rows = {row['endpoint']: row for row in json.loads(out.getvalue())['endpoints']}
+        self.assertEqual(rows['GET /api/tasks/list/']['requests'], 3)
+        self.assertGreater(rows['GET /api/tasks/list/']['bytes_avg'], 0)
+
+    def test_snapshots_are_not_written_unless_configured(self):
+        # Desligado nos testes; sem diretório, flush não grava nada e perfstats avisa
+        self.assertIsNone(settings.PERF_STATS_DIR)
+        self.client.get('/api/tasks/list/')
+        with mock.patch('pathlib.Path.write_text') as write_text:
+            registry.flush()
+        write_text.assert_not_called()
+        with self.assertRaises(CommandError):
+            call_command('perfstats', stdout=StringIO())
+
+
+class SQLiteTuningTests(TestCase):
+    def test_connection_init_pragmas_are_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)  # MEMORY
+
+    def test_replica_router_keeps_reads_inside_transactions_on_default(self):
+        router = ReadReplicaRouter()
+        self.assertEqual(router.db_for_write(Task), 'default')
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(Task), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'tasklist'))
+
+
+class ReadReplicaRouterTests(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Réplica somente-leitura do banco de testes, como a de SQLITE_READ_REPLICA=1;
+        # espelho da 'default', então não é esvaziada entre os testes
+        connections.settings['replica'] = {
+            **connections['default'].settings_dict,
+            'OPTIONS': {'init_command': 'PRAGMA query_only=ON'},
+            'TEST': {'MIRROR': 'default'},
+        }
+        cls.databases = cls.databases | {'replica'}
+        cls.enterClassContext(override_settings(DATABASE_ROUTERS=['taskmanagement.routers.ReadReplicaRouter']))
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        super().tearDownClass()
+
+    def test_reads_outside_transactions_go_to_replica(self):
+        user = User.objects.create_user(username='ana', password='x')
+        Task.objects.create(owner=user, title='Confirmada')
+
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Confirmada'])
+        self.assertEqual(len(replica_queries), 1)
+        with self.assertRaises(OperationalError):
+            with connections['replica'].cursor() as cursor:
+                cursor.execute('DELETE FROM tasklist_task')
+
+    def test_reads_inside_transactions_see_uncommitted_writes(self):
+        user = User.objects.create_user(username='ana', password='x')
+        with transaction.atomic():
+            Task.objects.create(owner=user, title='Pendente')
+            with CaptureQueriesContext(connections['replica']) as replica_queries:
+                self.assertEqual(Task.objects.get().title, 'Pendente')
+        self.assertEqual(len(replica_queries), 0)
+
+
+class LoadTestHarnessTests(TestCase):
+    def test_serves_app_and_measures_requests(self):
+        with serve(threads=2) as address:
+            result = run_load(address, lambda n: ('GET', '/api/test/', None, None), concurrency=2, seconds=0.2)
+
+        self.assertGreater(result.requests, 0)
+        self.assertEqual(result.statuses, {200: result.requests})
+        self.assertGreater(result.rps, 0)
+
+    def test_mix_records_each_scenario(self):
+        scenarios = [
+            ('test', 3, lambda n: ('GET', '/api/test/', None, None)),
+            ('missing', 1, lambda n: ('GET', '/api/nao-existe/', None, None)),
+        ]
+        with serve(threads=2) as address:
+            results = run_mix(address, scenarios, concurrency=2, seconds=0.3)
+
+        self.assertEqual(set(results['test'].statuses), {200})
+        self.assertEqual(set(results['missing'].statuses), {404})
+        self.assertLessEqual(results['test'].percentile(50), results['test'].percentile(99))
+
+    def test_loadbench_covers_every_mounted_route(self):
+        command = loadbench.Command()
+        routes = command.mounted_routes()
+        self.assertEqual(routes['tasklist:delete_user'], '/api/users/<int:user_id>/delete/')
+        scenarios = command.get_scenarios(loadbench.BenchContext([], {}, {}, 'staff', []))
+        self.assertEqual(set(routes) - set(scenarios), set())
+
+    def test_loadbench_payloads_follow_the_seed(self):
+        users = [User(pk=i, username=f'u{i}', email=f'u{i}@exemplo.com') for i in range(1, 6)]
+        names = ('tasklist:bulk_tasks', 'tasklist:register', 'tasklist:search_tasks', 'tasklist:create_task')
+
+        def payloads(seed):
+            ctx = loadbench.BenchContext(
+                users, {u.pk: f'k{u.pk}' for u in users}, {u.pk: [u.pk * 10, u.pk * 10 + 1] for u in users},
+                'staff', [], seed=seed,
+            )
+            scenarios = loadbench.Command().get_scenarios(ctx)
+            return [scenarios[name][2](n) for n in range(10) for name in names]
+
+        self.assertEqual(payloads(1), payloads(1))
+        self.assertNotEqual(payloads(1), payloads(2))
+
+    def test_loadbench_seed_feeds_the_sync_scenario(self):
+        ctx = loadbench.Command().seed_data({'users': 2, 'tasks': 3, 'seed': 0})
+        user = ctx.users[0]
+        self.assertEqual(ChangeSequence.objects.get(user=user).value, 3)
+        self.assertEqual(TaskCounters.objects.get(user=user).total, 3)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {ctx.tokens[user.pk]}')
+        response = client.get('/api/tasks/sync/?since=0')
+        self.assertEqual(len(response.data['changes']), 3)
+        self.assertEqual(response.data['cursor'], 3)
+
+
+class AsyncViewTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.async_client = AsyncClient(AUTHORIZATION=f'Token {self.token.key}')
+
+    async def test_login_returns_token(self):
+        response = await self.async_client.post(
+            '/api/async/auth/login/', {'username': 'ana', 'password': 'senha-forte-123'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['user']['username'], 'ana')
+        self.assertTrue(await ExpiringToken.objects.filter(pk=data['token']).aexists())
+
+    async def test_login_rejects_wrong_password_and_unknown_user(self):
+        for username in ('ana', 'ninguem'):
+            response = await self.async_client.post(
+                '/api/async/auth/login/', {'username': username, 'password': 'errada'},
+                content_type='application/json',
+            )
+            self.assertEqual(response.status_code, 401)
+
+    async def test_check_username(self):
+        response = await self.async_client.get('/api/async/auth/check-username/', {'username': 'ana'})
+        self.assertFalse(response.json()['available'])
+
+    async def test_list_and_create_tasks(self):
+        response = await self.async_client.post(
+            '/api/async/tasks/create/', {'title': '  Async  '}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['title'], 'Async')
+        task = await Task.objects.aget(pk=response.json()['id'])
+        self.assertEqual(task.change_seq, 1)
+
+        response = await self.async_client.get('/api/async/tasks/list/', {'fields': 'id,title'})
+        self.assertEqual(response.json(), {'next': None, 'results': [{'id': task.id, 'title': 'Async'}]})
+
+    async def test_requires_valid_token(self):
+        response = await AsyncClient().get('/api/async/tasks/list/')
+        self.assertEqual(response.status_code, 401)
+        response = await AsyncClient(AUTHORIZATION='Token invalido').get('/api/async/tasks/list/')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_validation_errors_are_json(self):
+        response = await self.async_client.get('/api/async/tasks/list/', {'due_after': 'ontem'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('due_after', response.json())
+
+
+class ThrottlingTests(TaskAPITestCase):
+    def login(self, username='ana', ip='10.0.0.1'):
+        return self.client.post('/api/auth/login/', {'username': username, 'password': 'errada'},
+                                format='json', REMOTE_ADDR=ip)
+
+    @override_settings(THROTTLE_RATES={'login_ip': '100/min', 'login_identifier': '3/min'})
+    def test_login_is_throttled_per_username_before_hashing(self):
+        for i in range(3):
+            self.assertEqual(self.login(ip=f'10.0.0.{i}').status_code, 401)
+
+        with self.assertNumQueries(0), mock.patch('tasklist.views.authenticate') as authenticate:
+            response = self.login(ip='10.0.0.99')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        authenticate.assert_not_called()
+
+        # Outro usuário do mesmo IP continua liberado
+        self.assertEqual(self.login(username='bruno', ip='10.0.0.99').status_code, 401)
+
+    @override_settings(THROTTLE_RATES={'login_ip': '2/min', 'login_identifier': '100/min'})
+    def test_login_is_throttled_per_ip(self):
+        self.login(username='a')
+        self.login(username='b')
+        self.assertEqual(self.login(username='c').status_code, 429)
+        self.assertEqual(self.login(username='c', ip='10.0.0.2').status_code, 401)
+
+    @override_settings(THROTTLE_RATES={'login_ip': '2/min', 'login_identifier': '100/min'})
+    def test_spoofed_forwarded_for_does_not_bypass_ip_limit(self):
+        for i, username in enumerate('abc'):
+            response = self.client.post('/api/auth/login/', {'username': username, 'password': 'errada'},
+                                        format='json', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'1.2.3.{i}')
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(THROTTLE_RATES={'login_ip': '1/min', 'login_identifier': '100/min'},
+                       REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1})
+    def test_trusted_proxy_uses_last_forwarded_address(self):
+        def login(username, forwarded_for):
+            return self.client.post('/api/auth/login/', {'username': username, 'password': 'errada'},
+                                    format='json', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=forwarded_for)
+
+        self.assertEqual(login('a', '6.6.6.6, 1.2.3.4').status_code, 401)
+        # Só o primeiro item (forjável) muda: mesmo cliente para o proxy
+        self.assertEqual(login('b', '7.7.7.7, 1.2.3.4').status_code, 429)
+        self.assertEqual(login('c', '1.2.3.5').status_code, 401)
+
+    @override_settings(THROTTLE_RATES={'login_ip': '100/min', 'login_identifier': '60/min'})
+    def test_bucket_refills_over_time(self):
+        with mock.patch('tasklist.throttling.time.monotonic', return_value=1000.0):
+            for _ in range(60):
+                self.login()
+            self.assertEqual(self.login().status_code, 429)
+        with mock.patch('tasklist.throttling.time.monotonic', return_value=1001.5):
+            self.assertEqual(self.login().status_code, 401)
+            self.assertEqual(self.login().status_code, 429)
+
+    @override_settings(THROTTLE_RATES={'check_username_ip': '1/min'},
+                       THROTTLE_STORE='default',
+                       CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'throttle-tests'}})
+    def test_cache_store_shares_buckets(self):
+        reset_store()
+        self.assertEqual(self.client.post('/api/auth/check-username/', {'username': 'x'}).status_code, 200)
+        reset_store()  # outro "processo": estado vem do cache, não da memória
+        self.assertEqual(self.client.post('/api/auth/check-username/', {'username': 'y'}).status_code, 429)
+
+    @override_settings(THROTTLE_RATES={'login_ip': '1/min', 'login_identifier': '100/min'})
+    def test_throttling_disabled_for_benchmarks(self):
+        self.assertEqual(self.login(username='a').status_code, 401)
+        with throttling_disabled():
+            for username in 'bcd':
+                self.assertEqual(self.login(username=username).status_code, 401)
+        self.assertEqual(settings.THROTTLE_RATES['login_ip'], '1/min')
+        with throttling_disabled(False):  # limites mantidos, buckets recomeçam cheios
+            self.assertEqual(self.login(username='e').status_code, 401)
+            self.assertEqual(self.login(username='f').status_code, 429)
+
+    @override_settings(THROTTLE_RATES={'password_reset_ip': '100/hour', 'password_reset_identifier': '1/hour'})
+    def test_forgot_password_is_throttled_per_email(self):
+        data = {'email': 'Ana@Exemplo.com'}
+        self.assertEqual(self.client.post('/api/auth/forgot-password/', data).status_code, 200)
+        data = {'email': 'ana@exemplo.com '}
+        self.assertEqual(self.client.post('/api/auth/forgot-password/', data).status_code, 429)
+
+    @override_settings(THROTTLE_RATES={'login_ip': '100/min', 'login_identifier': '1/min'})
+    async def test_async_login_is_throttled(self):
+        client = AsyncClient()
+        body = {'username': 'ana', 'password': 'errada'}
+        response = await client.post('/api/async/auth/login/', body, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+        response = await client.post('/api/async/auth/login/', body, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+
+class AvailabilityIndexTests(TaskAPITestCase):
+    def test_bloom_filter_has_no_false_negatives_and_bounded_error(self):
+        bloom = BloomFilter(10000, 0.01)
+        for i in range(10000):
+            bloom.add(f'user{i}')
+        self.assertTrue(all(f'user{i}' in bloom for i in range(10000)))
+        false_positives = sum(f'other{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives / 10000, 0.02)
+        self.assertLess(bloom.memory_bytes, 10000 * 10 / 8 + 8)
+
+    def test_new_and_renamed_users_are_indexed(self):
+        self.assertTrue(username_taken('ana'))
+        self.assertTrue(email_taken('ANA@exemplo.com'))
+
+        User.objects.create_user(username='carla', email='carla@exemplo.com', password='x')
+        self.bruno = User.objects.get(username='bruno')
+        self.bruno.username = 'bruno2'
+        self.bruno.save(update_fields=['username'])
+        with self.assertNumQueries(2):
+            self.assertTrue(username_taken('carla'))
+            self.assertTrue(username_taken('bruno2'))
+
+    def test_users_from_other_processes_are_picked_up_on_refresh(self):
+        taken_index.ensure_fresh()
+        post_save.disconnect(index_taken_username, sender=User)
+        try:
+            User.objects.create_user(username='outro', password='x')
+        finally:
+            post_save.connect(index_taken_username, sender=User)
+
+        options = {'CAPACITY': 1000, 'ERROR_RATE': 0.01, 'REFRESH_INTERVAL': 0, 'REBUILD_INTERVAL': 3600}
+        with override_settings(AVAILABILITY_INDEX=options):
+            self.assertTrue(username_taken('outro'))
+
+    def test_full_rebuild_picks_up_renames_from_other_processes(self):
+        taken_index.sync()
+        post_save.disconnect(index_taken_username, sender=User)
+        try:
+            User.objects.filter(username='bruno').update(username='bruno3')
+            User.objects.create_user(username='outro', password='x')
+        finally:
+            post_save.connect(index_taken_username, sender=User)
+        # O refresh por id não vê a renomeação; a reconstrução completa, sim
+        taken_index.sync()
+        self.assertFalse(username_taken('bruno3'))
+        taken_index.build()
+        self.assertTrue(username_taken('bruno3'))
+        self.assertTrue(username_taken('outro'))
+
+    def test_falls_back_to_database_until_filter_is_built(self):
+        taken_index.reset()
+        with mock.patch.object(taken_index, 'start_build') as start_build:
+            with self.assertNumQueries(1):
+                self.assertTrue(username_taken('ana'))
+            with self.assertNumQueries(1):
+                self.assertFalse(username_taken('livre'))
+        start_build.assert_called()
+
+    def test_build_runs_in_background_thread(self):
+        index = TakenIndex()
+        with mock.patch.object(index, 'build') as build:
+            index.ensure_fresh()
+            index._build_thread.join()
+        build.assert_called_once()
+        self.assertIsNone(index.filter)
+
+    def test_check_email(self):
+        response = APIClient().post('/api/auth/check-username/', {'email': 'Bruno@Exemplo.com'}, format='json')
+        self.assertFalse(response.data['available'])
+        response = APIClient().post('/api/auth/check-username/', {'email': 'novo@exemplo.com'}, format='json')
+        self.assertTrue(response.data['available'])
+
+
+class ConditionalGetTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.post('/api/tasks/create/', {'title': 'Primeira'}, format='json')
+
+    def test_matching_etag_returns_304_without_list_query(self):
+        response = self.client.get('/api/tasks/list/')
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+
+        with self.assertNumQueries(1), mock.patch('tasklist.views.TaskSerializer') as serializer:
+            response = self.client.get('/api/tasks/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        serializer.assert_not_called()
+
+    def test_task_changes_change_the_etag(self):
+        etag = self.client.get('/api/tasks/list/')['ETag']
+
+        self.client.post('/api/tasks/create/', {'title': 'Segunda'}, format='json')
+        response = self.client.get('/api/tasks/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_user_saves_keep_the_etag(self):
+        # O corpo da lista só tem tarefas: salvar o usuário não escreve no contador
+        etag = self.client.get('/api/tasks/list/')['ETag']
+        self.user.first_name = 'Ana'
+        self.user.set_password('outra-senha-123')
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save()
+        self.assertFalse([q for q in queries.captured_queries if 'changesequence' in q['sql']])
+        self.assertEqual(self.client.get('/api/tasks/list/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_etag_depends_on_query_and_user(self):
+        etag = self.client.get('/api/tasks/list/')['ETag']
+        self.assertNotEqual(self.client.get('/api/tasks/list/?completed=true')['ETag'], etag)
+
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION=f'Token {ExpiringToken.objects.create(user=self.other).key}')
+        response = other.get('/api/tasks/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class ResponseCacheTests(TaskAPITestCase):
+    def test_size_estimate_tracks_json_without_serializing(self):
+        Task.objects.bulk_create(
+            Task(owner=self.user, title=f'Tarefa {i}', description='Descrição ' * i) for i in range(20)
+        )
+        data = self.client.get('/api/tasks/list/').data
+        body = len(JSONRenderer().render(data))
+        with mock.patch('json.dumps') as dumps:
+            size = response_cache.size_of(data)
+        dumps.assert_not_called()
+        self.assertLess(abs(size - body) / body, 0.5)
+
+    def test_repeated_list_is_served_from_cache_until_a_write(self):
+        self.client.post('/api/tasks/create/', {'title': 'Primeira'}, format='json')
+        registry.reset()
+        self.client.get('/api/tasks/list/')
+
+        with self.assertNumQueries(1):  # só a versão do usuário
+            response = self.client.get('/api/tasks/list/')
+        self.assertEqual([task['title'] for task in response.data['results']], ['Primeira'])
+        self.assertEqual(registry.counters['response_cache.tasks.hit'], 1)
+        self.assertEqual(registry.counters['response_cache.tasks.miss'], 1)
+
+        self.client.post('/api/tasks/bulk/', {'operations': [
+            {'op': 'create', 'data': {'title': 'Segunda'}},
+        ]}, format='json')
+        response = self.client.get('/api/tasks/list/')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_entries_are_per_user_and_per_query(self):
+        self.client.post('/api/tasks/create/', {'title': 'Da Ana'}, format='json')
+        self.assertEqual(len(self.client.get('/api/tasks/list/').data['results']), 1)
+        self.assertEqual(len(self.client.get('/api/tasks/list/?completed=true').data['results']), 0)
+
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION=f'Token {ExpiringToken.objects.create(user=self.other).key}')
+        self.assertEqual(other.get('/api/tasks/list/').data['results'], [])
+
+    def test_lru_is_bounded_in_bytes(self):
+        cache = LRUCache(max_size=100, max_bytes=10)
+        cache.set('a', 'x', size=4)
+        cache.set('b', 'y', size=4)
+        cache.set('c', 'z', size=4)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.bytes, 8)
+        cache.set('big', 'w', size=11)
+        self.assertIsNone(cache.get('big'))
+
+
+class TaskCountersTests(TaskAPITestCase):
+    def stats(self):
+        return dict(self.client.get('/api/tasks/stats/').data)
+
+    def test_counters_follow_create_toggle_update_and_delete(self):
+        self.assertEqual(self.stats(), {'total': 0, 'pending': 0, 'completed': 0})
+        first = self.client.post('/api/tasks/create/', {'title': 'A'}, format='json').data['id']
+        self.client.post('/api/tasks/bulk/', {'operations': [
+            {'op': 'create', 'data': {'title': 'B', 'completed': True}},
+            {'op': 'create', 'data': {'title': 'C'}},
+            {'op': 'toggle', 'id': first},
+        ]}, format='json')
+        self.assertEqual(self.stats(), {'total': 3, 'pending': 1, 'completed': 2})
+
+        done = Task.objects.get(owner=self.user, title='B')
+        pending = Task.objects.get(owner=self.user, title='C')
+        self.client.post('/api/tasks/bulk/', {'operations': [
+            {'op': 'update', 'id': pending.id, 'data': {'completed': True}},
+            {'op': 'toggle', 'id': done.id},
+            {'op': 'delete', 'id': done.id},
+        ]}, format='json')
+        self.assertEqual(self.stats(), {'total': 2, 'pending': 0, 'completed': 2})
+
+    def test_stats_reads_one_row(self):
+        self.client.post('/api/tasks/create/', {'title': 'A'}, format='json')
+        with self.assertNumQueries(2):  # versão (ETag) + contadores
+            self.assertEqual(self.stats(), {'total': 1, 'pending': 1, 'completed': 0})
+
+    def test_missing_row_is_initialized_from_real_counts(self):
+        Task.objects.bulk_create([Task(owner=self.user, title='antiga', completed=True)])
+        self.client.post('/api/tasks/create/', {'title': 'nova'}, format='json')
+        self.assertEqual(self.stats(), {'total': 2, 'pending': 1, 'completed': 1})
+
+    def test_reconcile_command_reports_and_fixes_drift(self):
+        self.client.post('/api/tasks/create/', {'title': 'A'}, format='json')
+        TaskCounters.objects.filter(user=self.user).update(total=5)
+        Task.objects.create(owner=self.other, title='sem contador')
+
+        out = StringIO()
+        call_command('reconcile_task_counters', '--dry-run', stdout=out)
+        self.assertIn('2 usuários com divergência', out.getvalue())
+        self.assertEqual(TaskCounters.objects.get(user=self.user).total, 5)
+
+        call_command('reconcile_task_counters', stdout=StringIO())
+        self.assertEqual(TaskCounters.objects.get(user=self.user).total, 1)
+        self.assertEqual(TaskCounters.objects.get(user=self.other).total, 1)
+
+
+class TaskSearchTests(TaskAPITestCase):
+    def search(self, q, **params):
+        return self.client.get('/api/tasks/search/', {'q': q, **params})
+
+    def titles(self, response):
+        return [task['title'] for task in response.data['results']]
+
+    def test_ranked_prefix_search_scoped_to_owner(self):
+        Task.objects.create(owner=self.user, title='Comprar pão', description='na padaria')
+        Task.objects.create(owner=self.user, title='Ligar para a padaria', description='')
+        Task.objects.create(owner=self.user, title='Reunião', description='levar pão de queijo')
+        Task.objects.create(owner=self.other, title='Comprar pão', description='')
+
+        self.assertEqual(self.titles(self.search('pão')), ['Comprar pão', 'Reunião'])
+        # Prefixo enquanto digita, sem acento, título antes da descrição
+        self.assertEqual(self.titles(self.search('padar')), ['Ligar para a padaria', 'Comprar pão'])
+        self.assertEqual(self.titles(self.search('comp pao')), ['Comprar pão'])
+
+    def test_index_follows_updates_and_deletes(self):
+        task = Task.objects.create(owner=self.user, title='Rascunho')
+        self.client.post('/api/tasks/bulk/', {'operations': [
+            {'op': 'update', 'id': task.id, 'data': {'title': 'Relatório final'}},
+        ]}, format='json')
+        self.assertEqual(self.titles(self.search('rascunho')), [])
+        self.assertEqual(self.titles(self.search('relat')), ['Relatório final'])
+
+        self.client.post('/api/tasks/bulk/', {'operations': [{'op': 'delete', 'id': task.id}]}, format='json')
+        self.assertEqual(self.titles(self.search('relat')), [])
+
+    def test_numeric_terms_match_text_not_owner_id(self):
+        Task.objects.create(owner=self.user, title='Pagar conta')
+        Task.objects.create(owner=self.user, title='Relatório 2024', description='')
+        for query in (str(self.user.pk), str(self.user.pk)[0]):
+            self.assertEqual(self.titles(self.search(query)), [], query)
+        self.assertEqual(self.titles(self.search('2024')), ['Relatório 2024'])
+
+    def test_query_syntax_is_not_interpreted(self):
+        Task.objects.create(owner=self.user, title='Pagar conta')
+        self.assertEqual(self.titles(self.search('conta" OR owner_id:*')), [])
+        self.assertEqual(self.titles(self.search('"pagar"')), ['Pagar conta'])
+        self.assertEqual(self.search('').status_code, 400)
+        self.assertEqual(self.search('***').data['results'], [])
+
+
+class WireFormatTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        Task.objects.bulk_create(
+            Task(owner=self.user, title=f'Tarefa {i}', description='Descrição repetida ' * 4) for i in range(30)
+        )
+
+    @skipUnless(orjson, 'orjson não instalado')
+    def test_orjson_renders_same_bytes_as_drf(self):
+        data = self.client.get('/api/tasks/list/').data
+        data['extra'] = {1: Decimal('1.50'), 'quando': timezone.now(), 'texto': 'linha\u2028nova'}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    @skipUnless(msgpack, 'msgpack não instalado')
+    def test_msgpack_selected_by_accept(self):
+        response = self.client.get('/api/tasks/list/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(len(msgpack.unpackb(response.content)['results']), 30)
+        self.assertEqual(MessagePackRenderer().render(None), b'')
+
+    def test_large_responses_are_gzipped(self):
+        response = self.client.get('/api/tasks/list/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))['results']), 30)
+
+        # O ETag continua valendo para o corpo comprimido
+        again = self.client.get('/api/tasks/list/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_small_or_refused_responses_are_not_compressed(self):
+        small = self.client.get('/api/tasks/list/?page_size=1', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+        refused = self.client.get('/api/tasks/list/', HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertFalse(refused.has_header('Content-Encoding'))
+        self.assertEqual(len(refused.json()['results']), 30)
+
+
+class RowSerializerTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        Task.objects.create(owner=self.user, title='Sem prazo', priority='low')
+        Task.objects.create(owner=self.user, title='Ação — “aspas”', description='linha\nnova',
+                            priority='high', due_date=date(2030, 1, 31), completed=True)
+        self.tasks = Task.objects.filter(owner=self.user)
+
+    def assert_parity(self, serializer_class, queryset, fields=None):
+        kwargs = {'fields': fields} if fields is not None else {}
+        expected = serializer_class(queryset, many=True, **kwargs).data
+        rows = row_serializer(serializer_class, tuple(fields) if fields is not None else None)
+
+        from_values = rows.serialize(queryset.values(*rows.columns))
+        self.assertEqual(from_values, expected)
+        self.assertEqual(JSONRenderer().render(from_values), JSONRenderer().render(expected))
+        self.assertEqual(rows.serialize(queryset), expected)
+
+    def test_task_output_matches_model_serializer(self):
+        self.assert_parity(TaskSerializer, self.tasks)
+        self.assert_parity(TaskSerializer, self.tasks, fields=['id', 'title', 'due_date'])
+        with timezone.override('Asia/Tokyo'):
+            self.assert_parity(TaskSerializer, self.tasks)
+
+    def test_user_output_matches_model_serializer(self):
+        self.assert_parity(UserSerializer, User.objects.all())
+
+    def test_list_endpoints_match_model_serializer(self):
+        response = self.client.get('/api/tasks/list/?fields=id,title,completed')
+        self.assertEqual(
+            response.json()['results'],
+            TaskSerializer(self.tasks.order_by('-id'), many=True, fields=['id', 'title', 'completed']).data,
+        )
+
+    def test_rejects_computed_fields(self):
+        class NamedUserSerializer(UserSerializer):
+            name = serializers.SerializerMethodField()
+
+            class Meta(UserSerializer.Meta):
+                fields = UserSerializer.Meta.fields + ('name',)
+
+        with self.assertRaises(ImproperlyConfigured):
+            RowSerializer(NamedUserSerializer)
+
+
+class ListUsersTests(TaskAPITestCase):
+    def test_requires_staff(self):
+        self.assertEqual(self.client.get('/api/users/list/').status_code, 403)
+
+    def test_lists_newest_first_with_cursor(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        first = self.client.get('/api/users/list/?page_size=1')
+        self.assertEqual(first.data['results'], [UserSerializer(self.other).data])
+        second = self.client.get('/api/users/list/', {'page_size': 1, 'cursor': first.data['next']})
+        self.assertEqual(second.data['results'], [UserSerializer(self.user).data])
+        self.assertIsNone(second.data['next'])
+        self.assertEqual(self.client.get('/api/users/list/?ordering=due_date').status_code, 400)
+
+
+class PasswordResetTests(TaskAPITestCase):
+    def request_reset(self, email='ana@exemplo.com'):
+        response = APIClient().post('/api/auth/forgot-password/', {'email': email}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def sent_key(self):
+        body = EmailOutbox.objects.latest('id').body
+        return body.rsplit('token=', 1)[1]
+
+    def confirm(self, key, password='outra-senha-forte-456'):
+        return APIClient().post('/api/auth/reset-password/', {'token': key, 'new_password': password}, format='json')
+
+    def test_reset_flow_stores_only_hash_and_revokes_sessions(self):
+        self.request_reset('ANA@exemplo.com')
+        key = self.sent_key()
+        stored = PasswordResetToken.objects.get()
+        self.assertEqual(stored.token_hash, PasswordResetToken.hash_key(key))
+        self.assertNotIn(key, stored.token_hash)
+
+        response = self.confirm(key)
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('outra-senha-forte-456'))
+        self.assertFalse(ExpiringToken.objects.filter(user=self.user).exists())
+        self.assertEqual(self.client.get('/api/tasks/list/').status_code, 401)
+
+        # Uso único
+        self.assertEqual(self.confirm(key).status_code, 400)
+
+    @skipUnless(connection.vendor == 'sqlite', 'plano de consulta do SQLite')
+    def test_email_lookup_uses_lower_email_index(self):
+        self.assertEqual(list(users_by_email(' ANA@Exemplo.com ')), [self.user])
+        sql, params = users_by_email('ana@exemplo.com').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('auth_user_email_lower_idx', plan)
+
+    def test_unknown_email_gets_same_answer_without_email(self):
+        known = self.request_reset()
+        unknown = self.request_reset('ninguem@exemplo.com')
+        self.assertEqual(known.data, unknown.data)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_rejects_expired_invalid_and_weak(self):
+        key = PasswordResetToken.issue(self.user)
+        self.assertEqual(self.confirm(key, password='123').status_code, 400)
+        self.assertEqual(self.confirm('nao-existe').status_code, 400)
+
+        PasswordResetToken.objects.update(expires_at=timezone.now())
+        self.assertEqual(self.confirm(key).status_code, 400)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('senha-forte-123'))
+
+    def test_lookup_is_one_indexed_query(self):
+        key = PasswordResetToken.issue(self.user)
+        PasswordResetToken.issue(self.other)
+        with self.assertNumQueries(1):
+            token = PasswordResetToken.find(key)
+            self.assertEqual(token.user.username, 'ana')
+        # Consumir descarta também os demais tokens do usuário
+        PasswordResetToken.issue(self.user)
+        self.assertTrue(token.consume())
+        self.assertFalse(token.consume())
+        self.assertEqual(list(PasswordResetToken.objects.values_list('user_id', flat=True)), [self.other.pk])
+
+    def test_purge_removes_expired_reset_tokens(self):
+        for _ in range(3):
+            PasswordResetToken.issue(self.other)
+        PasswordResetToken.objects.update(expires_at=timezone.now())
+        key = PasswordResetToken.issue(self.user)
+        call_command('purge_tokens', batch_size=2, pause=0, stdout=StringIO())
+        self.assertEqual(PasswordResetToken.objects.get().token_hash, PasswordResetToken.hash_key(key))
+
+
+class SeedCommandTests(TestCase):
+    def test_seeds_consistent_users_tasks_and_counters(self):
+        call_command('seed', users=5, tasks=4, workers=1, batch_size=8, prefix='seed-t', stdout=StringIO())
+
+        users = User.objects.filter(username__startswith='seed-t')
+        self.assertEqual(users.count(), 5)
+        self.assertTrue(users[0].check_password('senha-de-seed-123'))
+        for user in users:
+            total = user.tasks.count()
+            self.assertEqual(count_tasks([user.pk]).get(user.pk, (0, 0)),
+                             (user.task_counters.total, user.task_counters.completed))
+            self.assertEqual(ChangeSequence.objects.get(user=user).value, total)
+            self.assertEqual(set(user.tasks.values_list('change_seq', flat=True)), set(range(1, total + 1)))
+
+        # Índice de busca reconstruído e trigger de INSERT restaurado
+        user = users.filter(tasks__isnull=False).first()
+        word = user.tasks.first().title.split()[0]
+        self.assertTrue(search_tasks(user, word))
+        Task.objects.create(owner=user, title='Zebra listrada')
+        self.assertEqual([task.title for task in search_tasks(user, 'zebra')], ['Zebra listrada'])
+
+        with self.assertRaises(CommandError):
+            call_command('seed', users=1, workers=1, prefix='seed-t', stdout=StringIO())
+
+    @skipUnless(connection.vendor == 'sqlite', 'índice FTS5 só existe no SQLite')
+    def test_missing_fts_insert_trigger_is_restored(self):
+        # Como um seed morto entre o DROP e a recriação do trigger
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {FTS_INSERT_TRIGGER}')
+        user = User.objects.create_user('zeca', password='x')
+        Task.objects.create(owner=user, title='Zebra perdida')
+        self.assertEqual(search_tasks(user, 'zebra'), [])
+
+        post_migrate.send(sender=apps.get_app_config('tasklist'), app_config=apps.get_app_config('tasklist'),
+                          verbosity=0, interactive=False, using='default', apps=apps, plan=[])
+        self.assertEqual([task.title for task in search_tasks(user, 'zebra')], ['Zebra perdida'])
+        Task.objects.create(owner=user, title='Zebra nova')
+        self.assertEqual(len(search_tasks(user, 'zebra')), 2)
+        self.assertFalse(restore_fts_insert_trigger())
+
+
+class ExportTests(TaskAPITestCase):
+    def setUp(self):
+        super().setUp()
+        Task.objects.create(owner=self.user, title='Primeira, com vírgula', description='linha\n"aspas"',
+                            due_date=date(2030, 5, 1))
+        Task.objects.create(owner=self.user, title='Segunda', completed=True, priority='high')
+        Task.objects.create(owner=self.other, title='De outro usuário')
+
+    def test_ndjson_streams_own_tasks_like_the_api(self):
+        response = self.client.get('/api/tasks/export/')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        expected = TaskSerializer(Task.objects.filter(owner=self.user).order_by('id'), many=True).data
+        self.assertEqual(lines, expected)
+
+    def test_csv_with_filters_and_projection(self):
+        response = self.client.get('/api/tasks/export/', {'output': 'csv', 'fields': 'id,title,completed'})
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ['id', 'title', 'completed'])
+        self.assertEqual([row[1:] for row in rows[1:]], [['Primeira, com vírgula', 'false'], ['Segunda', 'true']])
+
+        response = self.client.get('/api/tasks/export/', {'output': 'csv', 'completed': 'true'})
+        self.assertEqual(len(b''.join(response.streaming_content).decode().splitlines()), 2)
+        self.assertEqual(self.client.get('/api/tasks/export/?output=xml').status_code, 400)
+
+    def test_invalid_filter_dates_return_400(self):
+        for value in ('ontem', '2026-02-30', '2026-13-01'):
+            response = self.client.get('/api/tasks/export/', {'due_after': value})
+            self.assertEqual(response.status_code, 400, value)
+            self.assertIn('due_after', response.json())
+
+    def test_csv_neutralizes_spreadsheet_formulas(self):
+        for title in ('=HYPERLINK("http://x")', '+1', '-2+3', '@SUM(A1)'):
+            Task.objects.create(owner=self.user, title=title, description=title)
+        response = self.client.get('/api/tasks/export/', {'output': 'csv', 'fields': 'title,description'})
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))[3:]
+        self.assertEqual([row[0] for row in rows], ["'=HYPERLINK(\"http://x\")", "'+1", "'-2+3", "'@SUM(A1)"])
+        self.assertEqual([row[1] for row in rows], [row[0] for row in rows])
+
+        # NDJSON mantém o texto original
+        response = self.client.get('/api/tasks/export/', {'fields': 'title'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(lines[-1]), {'title': '@SUM(A1)'})
+
+    def test_first_row_is_flushed_then_buffered(self):
+        Task.objects.bulk_create(Task(owner=self.user, title=f'Tarefa {i}') for i in range(50))
+        with mock.patch('tasklist.export.FLUSH_BYTES', 1024):
+            chunks = list(self.client.get('/api/tasks/export/').streaming_content)
+        self.assertEqual(chunks[0].count(b'\n'), 1)
+        self.assertGreater(len(chunks), 2)
+        self.assertTrue(all(len(chunk) < 2048 for chunk in chunks))
+        self.assertEqual(b''.join(chunks).count(b'\n'), 52)
+
+    def test_users_export_is_admin_only(self):
+        self.assertEqual(self.client.get('/api/users/list/?output=csv').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/users/list/?output=ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(lines, UserSerializer(User.objects.order_by('id'), many=True).data)
+
+    def test_management_command(self):
+        out = StringIO()
+        call_command('export', 'tasks', '--user', 'ana', '--format', 'csv', '--chunk-size', '1', stdout=out)
+        self.assertEqual(out.getvalue().splitlines()[0], ','.join(TaskSerializer.Meta.fields))
+        self.assertEqual(out.getvalue().count('Segunda'), 1)
+        self.assertNotIn('De outro usuário', out.getvalue())
@@ -0,0 +1,184 @@
+"""
+Rate limiting por token bucket para os endpoints públicos (login,
+check-username, redefinição de senha).
+
+Cada bucket comporta N fichas e é reabastecido continuamente à taxa de
+N por período ('5/min' = até 5 tentativas seguidas, depois uma a cada
+12s). Os throttles do DRF rodam antes da view, então uma requisição
+recusada não chega a calcular hash de senha nem a consultar o banco.
+
+O estado fica em um store plugável (THROTTLE_STORE): na memória do
+processo por padrão, ou num alias de CACHES (ex.: Redis) para dividir
+os limites entre processos.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from .lru import LRUCache
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+def parse_rate(rate):
+    """'5/min' -> (capacidade, fichas por segundo)"""
+    count, period = rate.split('/')
+    return int(count), int(count) / PERIODS[period]
+
+
+def refill(state, capacity, per_second, now):
+    tokens, updated_at = state if state is not None else (capacity, now)
+    return min(capacity, tokens + (now - updated_at) * per_second)
+
+
+class LocalBucketStore:
+    """Buckets na memória do processo (compartilhados entre as threads)"""
+    remote = False
+
+    def __init__(self, max_size=100000):
+        self.buckets = LRUCache(max_size=max_size)
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, per_second):
+        """Retira uma ficha; retorna (permitido, segundos até a próxima ficha)"""
+        now = time.monotonic()
+        with self.lock:
+            tokens = refill(self.buckets.get(key), capacity, per_second, now)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets.set(key, (tokens, now))
+        return allowed, 0 if allowed else (1 - tokens) / per_second
+
+
+class CacheBucketStore:
+    """
+    Buckets num alias de CACHES (Redis em produção, LocMem como substituto local).
+
+    A leitura e a gravação não são atômicas entre processos: sob disputa
+    o limite pode deixar passar algumas requisições a mais, nunca a menos.
+    """
+    remote = True
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def consume(self, key, capacity, per_second):
+        now = time.time()
+        cache_key = f'throttle:{key}'
+        tokens = refill(self.cache.get(cache_key), capacity, per_second, now)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Expira quando o bucket estaria cheio de novo (equivale a não existir)
+        self.cache.set(cache_key, (tokens, now), int((capacity - tokens) / per_second) + 1)
+        return allowed, 0 if allowed else (1 - tokens) / per_second
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        alias = settings.THROTTLE_STORE
+        _store = CacheBucketStore(alias) if alias else LocalBucketStore()
+    return _store
+
+
+def reset_store():
+    """Descarta o store atual; o próximo uso relê THROTTLE_STORE (usado nos testes)"""
+    global _store
+    _store = None
+
+
+@contextmanager
+def throttling_disabled(disabled=True):
+    """
+    Desliga os limites (THROTTLE_RATES vazio) enquanto ativo; usado pelos
+    benchmarks, que medem o custo das rotas e não as respostas 429.
+    Com disabled=False só recomeça com buckets vazios.
+    """
+    original_rates = settings.THROTTLE_RATES
+    if disabled:
+        settings.THROTTLE_RATES = {}
+    reset_store()
+    try:
+        yield
+    finally:
+        settings.THROTTLE_RATES = original_rates
+        reset_store()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttle do DRF com bucket por `scope` + identificação da requisição"""
+    scope = None
+
+    def get_ident_value(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        ident = self.get_ident_value(request)
+        if not ident:
+            return True
+        rate = settings.THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return True
+        capacity, per_second = parse_rate(rate)
+        allowed, self.retry_after = get_store().consume(f'{self.scope}:{ident}', capacity, per_second)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Limite por IP do cliente (respeita NUM_PROXIES do DRF)"""
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class IdentifierThrottle(TokenBucketThrottle):
+    """Limite por identificador enviado no corpo (username, email)"""
+    field = None
+
+    def get_ident_value(self, request):
+        value = request.data.get(self.field) if hasattr(request.data, 'get') else None
+        return value.strip().lower() if isinstance(value, str) else None
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginUsernameThrottle(IdentifierThrottle):
+    scope = 'login_identifier'
+    field = 'username'
+
+
+class LoginEmailThrottle(IdentifierThrottle):
+    scope = 'login_identifier'
+    field = 'email'
+
+
+class CheckUsernameThrottle(IPThrottle):
+    scope = 'check_username_ip'
+
+
+class PasswordResetIPThrottle(IPThrottle):
+    scope = 'password_reset_ip'
+
+
+class PasswordResetEmailThrottle(IdentifierThrottle):
+    scope = 'password_reset_identifier'
+    field = 'email'
+
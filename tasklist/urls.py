@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('test/', views.test_view, name='test'),
@@ -8,6 +8,7 @@ urlpatterns = [
     path('auth/forgot-password/', views.forgot_password_view, name='forgot_password'),
     path('auth/reset-password/', views.reset_password_view, name='reset_password'),
     path('auth/check-username/', views.check_username_view, name='check_username'),
+    path('auth/token/refresh/', views.refresh_token_view, name='refresh_token'),
     
     # ✅ URLs para gerenciamento de usuários
     path('users/create/', views.create_user_view, name='create_user'),
@@ -18,4 +19,16 @@ urlpatterns = [
     # ✅ URLs para gerenciamento de tarefas
     path('tasks/list/', views.list_tasks_view, name='list_tasks'),
     path('tasks/create/', views.create_task_view, name='create_task'),
+    path('tasks/bulk/', views.bulk_tasks_view, name='bulk_tasks'),
+    path('tasks/sync/', views.sync_tasks_view, name='sync_tasks'),
+    path('tasks/stats/', views.task_stats_view, name='task_stats'),
+    path('tasks/search/', views.search_tasks_view, name='search_tasks'),
+    path('tasks/export/', views.export_tasks_view, name='export_tasks'),
+
+    # ✅ Versões async dos endpoints mais acessados (servir via ASGI)
+    path('async/test/', async_views.test_view, name='async_test'),
+    path('async/auth/login/', async_views.login_view, name='async_login'),
+    path('async/auth/check-username/', async_views.check_username_view, name='async_check_username'),
+    path('async/tasks/list/', async_views.list_tasks_view, name='async_list_tasks'),
+    path('async/tasks/create/', async_views.create_task_view, name='async_create_task'),
 ]
\ No newline at end of file
@@ -0,0 +1,59 @@
+import re
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import UsernameCounter
+
+# Espaço reservado para o sufixo numérico dentro dos 150 caracteres do username
+MAX_BASE_LENGTH = 130
+MAX_ATTEMPTS = 10
+
+
+def username_base(email):
+    """Parte local do email, limitada aos caracteres aceitos pelo validador do Django"""
+    base = re.sub(r'[^\w.@+-]', '', email.split('@')[0])[:MAX_BASE_LENGTH]
+    return base or 'user'
+
+
+def next_suffix(prefix):
+    """Reserva o próximo sufixo do prefixo com um UPDATE atômico na chave primária"""
+    with transaction.atomic():
+        counter = UsernameCounter.objects.filter(prefix=prefix)
+        if not counter.update(last_suffix=F('last_suffix') + 1):
+            _, created = UsernameCounter.objects.get_or_create(prefix=prefix, defaults={'last_suffix': 1})
+            if created:
+                return 1
+            counter.update(last_suffix=F('last_suffix') + 1)
+        return counter.values_list('last_suffix', flat=True).get()
+
+
+def create_user_with_unique_username(base, password, **fields):
+    """
+    Cria o usuário com `base` ou, se ocupado, `base` + sufixo do contador.
+
+    Cada tentativa custa buscas pela chave primária/índice único (O(log n));
+    uma colisão concorrente (IntegrityError) apenas consome o próximo sufixo.
+    """
+    if 'email' in fields:
+        fields['email'] = User.objects.normalize_email(fields['email'])
+    user = User(**fields)
+    user.set_password(password)
+
+    candidate = base
+    if User.objects.filter(username=base).exists():
+        candidate = f'{base}{next_suffix(base)}'
+
+    for _ in range(MAX_ATTEMPTS):
+        user.username = candidate
+        try:
+            with transaction.atomic():
+                user.save()
+            return user
+        except IntegrityError:
+            if not User.objects.filter(username=candidate).exists():
+                raise  # violação de outra restrição (ex.: email único)
+            candidate = f'{base}{next_suffix(base)}'
+
+    raise IntegrityError(f'Não foi possível gerar um username livre para "{base}"')
@@ -1,11 +1,34 @@
+from django.conf import settings
 from django.http import JsonResponse
 from django.contrib.auth import authenticate
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.contrib.auth.models import User
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import condition
+from . import counters, sync
+from .availability import email_taken, username_taken
+from .bulk import BulkPayloadError, apply_operations
+from .etags import task_list_etag, task_stats_etag
+from .export import export_response, parse_format
+from .mail import enqueue_email
+from .models import ExpiringToken, PasswordResetToken, Task, users_by_email
+from .pagination import KeysetPagination, UserPagination
+from .response_cache import cached_response
+from .search import search_tasks
+from .serializers import TaskSerializer, UserSerializer, row_serializer
+from .throttling import (
+    CheckUsernameThrottle, LoginIPThrottle, LoginUsernameThrottle,
+    PasswordResetEmailThrottle, PasswordResetIPThrottle,
+)
+from .usernames import create_user_with_unique_username, username_base
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -16,8 +39,18 @@ def test_view(request):
         'method': request.method
     })
 
+def login_payload(user, token):
+    return {
+        'token': token.key,
+        'user': {
+            **row_serializer(UserSerializer).to_representation(user),
+            'name': user.first_name or user.username,
+        }
+    }
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginUsernameThrottle])
 def login_view(request):
     username = request.data.get('username')
     password = request.data.get('password')
@@ -30,18 +63,8 @@ def login_view(request):
     user = authenticate(username=username, password=password)
     
     if user and user.is_active:
-        token, created = Token.objects.get_or_create(user=user)
-        return Response({
-            'token': token.key,
-            'user': {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'name': user.first_name or user.username,
-            }
-        }, status=status.HTTP_200_OK)
+        token = ExpiringToken.objects.create(user=user)
+        return Response(login_payload(user, token), status=status.HTTP_200_OK)
     else:
         return Response({
             'message': 'Credenciais inválidas'
@@ -56,69 +79,141 @@ def register_view(request):
     first_name = request.data.get('first_name', '')
     last_name = request.data.get('last_name', '')
     
-    if not username or not password:
+    # Sem username, ele é gerado a partir do email
+    if not password or not (username or email):
         return Response({
             'message': 'Nome de usuário e senha são obrigatórios'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    if User.objects.filter(username=username).exists():
+    # Username e email verificados numa única consulta
+    conflict = Q(username=username) if username else Q()
+    if email:
+        conflict |= Q(email=email)
+    taken = list(User.objects.filter(conflict).values_list('username', flat=True)[:2])
+
+    if username and username in taken:
         return Response({
             'message': 'Este nome de usuário já existe'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    if email and User.objects.filter(email=email).exists():
+    if taken:
         return Response({
             'message': 'Este email já está cadastrado'
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        user = User.objects.create_user(
-            username=username,
-            email=email or '',
-            password=password,
-            first_name=first_name,
-            last_name=last_name
-        )
+        if username:
+            user = User.objects.create_user(
+                username=username,
+                email=email or '',
+                password=password,
+                first_name=first_name,
+                last_name=last_name
+            )
+        else:
+            user = create_user_with_unique_username(
+                username_base(email),
+                password,
+                email=email,
+                first_name=first_name,
+                last_name=last_name
+            )
         
-        token = Token.objects.create(user=user)
+        token = ExpiringToken.objects.create(user=user)
         
         return Response({
             'message': 'Usuário criado com sucesso',
-            'token': token.key,
-            'user': {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'name': user.first_name or user.username,
-            }
+            **login_payload(user, token),
         }, status=status.HTTP_201_CREATED)
         
+    except IntegrityError:
+        # Outro cadastro levou o mesmo username entre a verificação e o INSERT
+        return Response({
+            'message': 'Este nome de usuário já existe'
+        }, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({
             'message': f'Erro ao criar usuário: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-# ✅ Views básicas (implementar depois)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def refresh_token_view(request):
+    # Rotação: emite um token novo e invalida o usado nesta requisição
+    with transaction.atomic():
+        token = ExpiringToken.objects.create(user=request.user)
+        ExpiringToken.objects.filter(pk=request.auth.pk).delete()
+
+    return Response({
+        'token': token.key,
+        'expires_at': token.expires_at,
+    }, status=status.HTTP_200_OK)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([PasswordResetIPThrottle, PasswordResetEmailThrottle])
 def forgot_password_view(request):
-    return Response({'message': 'Implementar recuperação de senha'})
+    email = (request.data.get('email') or '').strip()
+    if not email:
+        return Response({'message': 'Email obrigatório'}, status=status.HTTP_400_BAD_REQUEST)
+
+    for user in users_by_email(email).filter(is_active=True):
+        # Token e email na mesma transação: o link só sai se o token existir
+        with transaction.atomic():
+            key = PasswordResetToken.issue(user)
+            enqueue_email(
+                'Redefinição de senha',
+                user.email,
+                body=f'Para criar uma nova senha, acesse {settings.FRONTEND_URL}/reset-password?token={key}',
+            )
+
+    # Mesma resposta com ou sem cadastro: não revela quais emails existem
+    return Response({'message': 'Se o email estiver cadastrado, você receberá um link de redefinição'})
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def reset_password_view(request):
-    return Response({'message': 'Implementar reset de senha'})
+    password = request.data.get('new_password')
+    token = PasswordResetToken.find(request.data.get('token'))
+    if token is None:
+        return Response({'message': 'Token inválido ou expirado'}, status=status.HTTP_400_BAD_REQUEST)
+    if not password:
+        return Response({'message': 'Nova senha obrigatória'}, status=status.HTTP_400_BAD_REQUEST)
+
+    user = token.user
+    try:
+        validate_password(password, user)
+    except DjangoValidationError as e:
+        return Response({'new_password': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Hash calculado fora da transação para não segurar o lock de escrita
+    user.set_password(password)
+    with transaction.atomic():
+        if not token.consume():
+            return Response({'message': 'Token inválido ou expirado'}, status=status.HTTP_400_BAD_REQUEST)
+        user.save(update_fields=['password'])
+        # Encerra as sessões abertas com a senha antiga
+        ExpiringToken.objects.filter(user=user).delete()
+
+    return Response({'message': 'Senha redefinida com sucesso'})
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([CheckUsernameThrottle])
 def check_username_view(request):
     username = request.data.get('username')
+    email = request.data.get('email')
+    if email and not username:
+        exists = email_taken(email)
+        return Response({
+            'available': not exists,
+            'message': 'Email disponível' if not exists else 'Email já está em uso'
+        })
     if not username:
         return Response({'message': 'Username obrigatório'}, status=400)
     
-    exists = User.objects.filter(username=username).exists()
+    # Bloom filter primeiro: o caso comum (disponível) não consulta o banco
+    exists = username_taken(username)
     return Response({
         'available': not exists,
         'message': 'Username disponível' if not exists else 'Username já existe'
@@ -131,9 +226,17 @@ def create_user_view(request):
     return Response({'message': 'Implementar criação de usuário'})
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAdminUser])
 def list_users_view(request):
-    return Response({'message': 'Implementar listagem de usuários'})
+    serializer = row_serializer(UserSerializer)
+    output = request.query_params.get('output')
+    if output is not None:
+        # ?output=ndjson|csv: todos os usuários em streaming, sem paginação
+        return export_response(User.objects.order_by('id'), serializer, parse_format(output), 'usuarios')
+
+    paginator = UserPagination()
+    rows = paginator.paginate_queryset(User.objects.values(*serializer.columns), request)
+    return paginator.get_paginated_response(serializer.serialize(rows))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -145,12 +248,135 @@ def change_user_password_view(request, user_id):
 def delete_user_view(request, user_id):
     return Response({'message': 'Implementar exclusão de usuário'})
 
+def _parse_task_fields(request):
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = set(fields) - set(TaskSerializer.Meta.fields)
+    if unknown:
+        raise ValidationError({'fields': f'Campos inválidos: {", ".join(sorted(unknown))}'})
+    return fields
+
+def _filter_tasks(request, queryset):
+    params = request.query_params
+
+    completed = params.get('completed')
+    if completed is not None:
+        queryset = queryset.filter(completed=completed.lower() in ('1', 'true'))
+
+    priority = params.get('priority')
+    if priority:
+        queryset = queryset.filter(priority=priority)
+
+    for param, lookup in (('due_after', 'due_date__gte'), ('due_before', 'due_date__lte')):
+        value = params.get(param)
+        if value:
+            try:
+                parsed = parse_date(value)
+            except ValueError:  # bem formada, mas inexistente (ex.: 2026-02-30)
+                parsed = None
+            if parsed is None:
+                raise ValidationError({param: 'Data inválida, use AAAA-MM-DD.'})
+            queryset = queryset.filter(**{lookup: parsed})
+
+    return queryset
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=task_list_etag)
 def list_tasks_view(request):
-    return Response({'message': 'Implementar listagem de tarefas'})
+    fields = _parse_task_fields(request)
+    queryset = _filter_tasks(request, Task.objects.filter(owner=request.user))
+
+    def page():
+        paginator = KeysetPagination()
+        # Só as colunas pedidas (ex.: sem description na lista mobile), em dicts, sem instanciar Task
+        serializer = row_serializer(TaskSerializer, tuple(fields) if fields is not None else None)
+        rows = paginator.paginate_queryset(
+            queryset.values(*set(serializer.columns) | set(paginator.cursor_fields(request))), request,
+        )
+        return {'next': paginator.next_cursor, 'results': serializer.serialize(rows)}
+
+    return Response(cached_response(request, 'tasks', page))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_tasks_view(request):
+    output = parse_format(request.query_params.get('output', 'ndjson'))
+    fields = _parse_task_fields(request)
+    queryset = _filter_tasks(request, Task.objects.filter(owner=request.user)).order_by('id')
+    serializer = row_serializer(TaskSerializer, tuple(fields) if fields is not None else None)
+    return export_response(queryset, serializer, output, 'tarefas')
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_tasks_view(request):
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        raise ValidationError({'q': 'Informe o texto da busca.'})
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+    except ValueError:
+        raise ValidationError({'limit': 'Valor inválido.'})
+    fields = _parse_task_fields(request)
+
+    tasks = search_tasks(request.user, query, limit)
+    return Response({'results': TaskSerializer(tasks, many=True, fields=fields).data})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condition(etag_func=task_stats_etag)
+def task_stats_view(request):
+    # Uma linha de TaskCounters, mantida junto com as escritas
+    return Response(counters.get_counts(request.user))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_task_view(request):
-    return Response({'message': 'Implementar criação de tarefa'})
\ No newline at end of file
+    serializer = TaskSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        task = serializer.save(owner=request.user, change_seq=sync.allocate(request.user))
+        counters.adjust(request.user, total=1, completed=int(task.completed))
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_tasks_view(request):
+    data = request.data
+    operations = data.get('operations') if hasattr(data, 'get') else data
+    try:
+        results = apply_operations(request.user, operations)
+    except BulkPayloadError as e:
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_tasks_view(request):
+    try:
+        since = int(request.query_params.get('since', 0))
+        limit = min(max(int(request.query_params.get('limit', 500)), 1), 1000)
+    except ValueError:
+        return Response({'message': 'Parâmetros "since" e "limit" devem ser inteiros'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        changed, deleted, cursor, has_more = sync.changes_since(request.user, since, limit)
+    except sync.CursorExpired:
+        # Tombstones já expurgadas: o cliente precisa descartar o cache local
+        return Response({
+            'message': 'Cursor expirado, refaça a sincronização completa',
+            'reset': True,
+        }, status=status.HTTP_410_GONE)
+
+    return Response({
+        'changes': TaskSerializer(changed, many=True).data,
+        'deleted': deleted,
+        'cursor': cursor,
+        'has_more': has_more,
+    })
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'taskmanagement.settings')
 
 application = get_asgi_application()
+
+# Monta o índice de usernames/emails em uso sem esperar a primeira requisição
+from tasklist.availability import taken_index  # noqa: E402
+
+taken_index.start_build()
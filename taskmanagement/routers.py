@@ -0,0 +1,24 @@
+"""
+Roteador de banco para a réplica de leitura do SQLite.
+
+Leituras vão para o alias 'replica' (conexão somente-leitura), exceto
+dentro de uma transação na conexão principal, onde precisam enxergar as
+escritas ainda não confirmadas. Toda escrita e migração fica na 'default'.
+"""
+from django.db import connections
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return 'replica'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -2,8 +2,13 @@
 Django settings for taskmanagement project.
 """
 
+from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 import os
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,6 +36,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primeiro da lista para medir a requisição inteira (Server-Timing + perfstats)
+    'tasklist.middleware.PerformanceMiddleware',
+    # Antes dos demais: comprime o corpo já pronto (RESPONSE_COMPRESSION)
+    'tasklist.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -44,13 +53,100 @@ MIDDLEWARE = [
 # ✅ REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'tasklist.authentication.ExpiringTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Proxies reversos confiáveis à frente da aplicação. Com 0 o IP do rate
+    # limiting vem de REMOTE_ADDR; com N, do N-ésimo item (da direita) do
+    # X-Forwarded-For. Sem o valor o DRF usaria o cabeçalho inteiro, que o
+    # cliente controla e poderia variar para escapar dos limites.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+}
+
+# ✅ Formatos de resposta (tasklist.renderers)
+# JSON_RENDERER=orjson gera o mesmo JSON com o orjson (pip install orjson).
+# Com o msgpack instalado, clientes que enviam Accept: application/msgpack
+# recebem MessagePack. Compare com `python manage.py bench_renderers`.
+JSON_RENDERER = os.getenv('JSON_RENDERER', 'json')
+if JSON_RENDERER == 'orjson' and find_spec('orjson') is None:
+    raise ImproperlyConfigured('JSON_RENDERER=orjson requer `pip install orjson`')
+REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+    'tasklist.renderers.ORJSONRenderer' if JSON_RENDERER == 'orjson' else 'rest_framework.renderers.JSONRenderer',
+    'rest_framework.renderers.BrowsableAPIRenderer',
+] + (['tasklist.renderers.MessagePackRenderer'] if find_spec('msgpack') else [])
+
+# ✅ Compressão das respostas (tasklist.middleware.CompressionMiddleware)
+# Corpos a partir de MIN_SIZE bytes saem em brotli (pip install brotli) ou gzip,
+# conforme o Accept-Encoding; abaixo disso a compressão não compensa.
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': int(os.getenv('RESPONSE_COMPRESSION_MIN_SIZE', 1024)),
+    'BROTLI_QUALITY': 5,
 }
 
+# ✅ Tokens de API com expiração (tasklist.models.ExpiringToken)
+AUTH_TOKEN_TTL = timedelta(days=7)
+# Validade dos links de redefinição de senha (tasklist.models.PasswordResetToken)
+PASSWORD_RESET_TOKEN_TTL = timedelta(hours=1)
+# Intervalo mínimo (s) entre gravações de last_seen_at de um mesmo token
+AUTH_TOKEN_LAST_SEEN_INTERVAL = 300
+
+# ✅ Cache de autenticação por token (tasklist.authentication)
+# SHARED_CACHE: alias em CACHES (ex.: Redis) compartilhado entre processos;
+# com ele, cada acerto local confere a versão do usuário (um GET no cache)
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    'SHARED_CACHE': None,
+}
+
+# ✅ Rate limiting dos endpoints públicos (tasklist.throttling, token bucket)
+# 'N/período': até N requisições seguidas, reabastecidas a N por período.
+# THROTTLE_STORE: alias em CACHES (ex.: Redis) para dividir os limites entre
+# processos; None mantém os buckets na memória de cada processo.
+THROTTLE_STORE = os.getenv('THROTTLE_STORE') or None
+THROTTLE_RATES = {
+    'login_ip': '20/min',
+    'login_identifier': '5/min',
+    'check_username_ip': '60/min',
+    'password_reset_ip': '5/hour',
+    'password_reset_identifier': '3/hour',
+}
+
+# ✅ Cache de respostas por usuário (tasklist.response_cache)
+# Chaves versionadas pelo contador de alterações do usuário: uma escrita
+# invalida as entradas dele sem varredura. SHARED_CACHE: alias em CACHES.
+TASK_RESPONSE_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'MAX_BYTES': 64 * 1024 * 1024,
+    'TTL': 300,
+    'SHARED_CACHE': None,
+}
+
+# ✅ Índice de usernames/emails em uso (tasklist.availability, Bloom filter)
+# Memória fixa ≈ 2 × CAPACITY × 9,6 bits com ERROR_RATE de 1% (≈ 24 MB para
+# 10 milhões de usuários); REFRESH_INTERVAL (s) traz usuários novos de outros
+# processos e REBUILD_INTERVAL (s) refaz o filtro inteiro em segundo plano
+# (renomeações feitas em outros processos).
+AVAILABILITY_INDEX = {
+    'CAPACITY': 10_000_000,
+    'ERROR_RATE': 0.01,
+    'REFRESH_INTERVAL': 5,
+    'REBUILD_INTERVAL': 3600,
+}
+
+# ✅ Métricas por endpoint (tasklist.middleware.PerformanceMiddleware)
+# Com PERF_STATS_DIR definido (ex.: PERF_STATS_DIR=perfstats), cada processo
+# grava seus histogramas lá; veja `manage.py perfstats`. Sem ele, nada é gravado.
+# Nunca grava durante `manage.py test`.
+PERF_STATS_DIR = None if sys.argv[1:2] == ['test'] else os.getenv('PERF_STATS_DIR') or None
+PERF_STATS_FLUSH_INTERVAL = 10
+
+# ✅ Sincronização incremental (/api/tasks/sync/)
+# Clientes com cursor mais antigo que a retenção precisam refazer o sync completo
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
 # ✅ Modelo de usuário customizado (se você implementou)
 # AUTH_USER_MODEL = 'tasklist.CustomUser'  # Descomente se usar modelo customizado
 
@@ -111,6 +207,12 @@ else:
     EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 
 DEFAULT_FROM_EMAIL = 'taskmanagement@exemplo.com'
+
+# ✅ Outbox de emails (enviada por `python manage.py send_outbox`)
+EMAIL_OUTBOX_WORKERS = 4
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = 30
 FRONTEND_URL = 'http://localhost:8081'
 
 ROOT_URLCONF = 'taskmanagement.urls'
@@ -134,12 +236,94 @@ TEMPLATES = [
 WSGI_APPLICATION = 'taskmanagement.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
+# ✅ Ajustes do SQLite aplicados a cada nova conexão (compare com `manage.py bench_sqlite`):
+# WAL deixa leitores e o escritor trabalharem em paralelo, synchronous=NORMAL é
+# seguro com WAL, e mmap/cache reduzem leituras de disco.
+SQLITE_INIT_COMMAND = ';'.join([
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-32000',
+    'PRAGMA temp_store=MEMORY',
+])
+
+# ✅ Perfil de banco escolhido por variável de ambiente:
+#   sqlite    (padrão, desenvolvimento) arquivo local com os ajustes acima
+#   postgres  PostgreSQL com pool de conexões no processo (psycopg[pool])
+#   pgbouncer PostgreSQL atrás de um PgBouncer em modo transaction (pool no servidor)
+# Para testar localmente com um Postgres descartável:
+#   docker run --rm -e POSTGRES_PASSWORD=postgres -p 5432:5432 postgres:16
+#   DATABASE_PROFILE=postgres python manage.py migrate
+# Compare os perfis com `python manage.py bench_connections`.
+DATABASE_PROFILE = os.getenv('DATABASE_PROFILE', 'sqlite')
+
+# Conexões persistentes (segundos; 0 fecha ao fim de cada requisição) com
+# verificação de saúde antes de reutilizar uma conexão antiga
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+
+if DATABASE_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': SQLITE_INIT_COMMAND,
+                # busy_timeout (s): espera o lock de escrita em vez de "database is locked"
+                'timeout': 20,
+                # BEGIN IMMEDIATE: a transação pega o lock de escrita no início e não
+                # falha ao promover uma leitura para escrita no meio do caminho
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+elif DATABASE_PROFILE in ('postgres', 'pgbouncer'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'taskmanagement'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'postgres'),
+            'HOST': os.getenv('POSTGRES_HOST', '127.0.0.1'),
+            'PORT': os.getenv('POSTGRES_PORT', '6432' if DATABASE_PROFILE == 'pgbouncer' else '5432'),
+            'OPTIONS': {},
+        }
+    }
+    if DATABASE_PROFILE == 'postgres':
+        # Pool do psycopg: conexões abertas uma vez e emprestadas por requisição
+        # (o Django exige CONN_MAX_AGE=0 com pool; o pool faz a verificação de saúde)
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        }
+    else:
+        # PgBouncer em modo transaction: o pool fica no servidor, o Django mantém
+        # a conexão com o PgBouncer e não pode usar cursores do lado do servidor
+        DATABASES['default'].update({
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': True,
+        })
+else:
+    raise ValueError(f'DATABASE_PROFILE inválido: {DATABASE_PROFILE!r} (use sqlite, postgres ou pgbouncer)')
+
+# ✅ Réplica de leitura opcional: conexão somente-leitura ao mesmo arquivo
+# (com WAL, leituras não esperam escritas). Ative com SQLITE_READ_REPLICA=1.
+if DATABASE_PROFILE == 'sqlite' and os.getenv('SQLITE_READ_REPLICA') == '1':
+    DATABASES['replica'] = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': f"file:{BASE_DIR / 'db.sqlite3'}?mode=ro",
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': 'PRAGMA query_only=ON;' + SQLITE_INIT_COMMAND.replace('PRAGMA journal_mode=WAL;', ''),
+            'timeout': 20,
+        },
+        'TEST': {'MIRROR': 'default'},
     }
-}
+    DATABASE_ROUTERS = ['taskmanagement.routers.ReadReplicaRouter']
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -157,6 +341,34 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# ✅ Hash de senhas
+# PASSWORD_HASHER escolhe o algoritmo preferido (pbkdf2, scrypt ou argon2*);
+# os demais continuam aceitos e o hash é migrado no próximo login.
+# * argon2 requer `pip install argon2-cffi`.
+# Use `python manage.py bench_hashers` para comparar logins/s por core.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'tasklist.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+if PASSWORD_HASHER not in PASSWORD_HASHER_PROFILES:
+    raise ImproperlyConfigured(
+        f'PASSWORD_HASHER inválido: {PASSWORD_HASHER!r} (use {", ".join(PASSWORD_HASHER_PROFILES)})'
+    )
+if PASSWORD_HASHER == 'argon2' and find_spec('argon2') is None:
+    raise ImproperlyConfigured('PASSWORD_HASHER=argon2 requer `pip install argon2-cffi`')
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_PROFILES.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+# None mantém o padrão do Django para a versão instalada
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 0)) or None
+# Threads que calculam hashes de senha para as views async (/api/async/):
+# limita quantos logins disputam CPU ao mesmo tempo sem travar o event loop
+PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', 0)) or min(4, os.cpu_count() or 1)
+
 # Internationalization
 LANGUAGE_CODE = 'pt-br'
 TIME_ZONE = 'America/Sao_Paulo'